@@ -3,16 +3,22 @@ from flask import Flask
 from flask_jwt_extended import JWTManager
 from app.routes import init_routes
 from app.config import init_config
+from app.services.metrics import init_metrics
+from app.services.profiling import init_profiling
+from app.services.http_cache import init_compression
 
 def create_app():
     #temperary name of project
     app = Flask("Food Insecurity Co-op")
     CORS(app, resources={r"/*": {"origins": "*", "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"]}})
     
-    # Initialize JWT
-    app.config['JWT_SECRET_KEY'] = 'your-secret-key-change-in-production'
+    init_config(app)
+    init_metrics(app)
+    init_profiling(app)
+    init_compression(app)
+
+    # Initialize JWT (secret is loaded from the environment by init_config)
     jwt = JWTManager(app)
     
-    init_config(app)
     init_routes(app)
     return app
\ No newline at end of file
@@ -1,18 +1,77 @@
 from flask_pymongo import PyMongo
 from dotenv import load_dotenv
 import os
+from datetime import timedelta
+from app.services.json_provider import MongoJSONProvider
+from app.services.metrics import mongo_command_listener
 
 load_dotenv()
 
+# Only used by the development server when JWT_SECRET_KEY is missing
+DEV_JWT_SECRET_KEY = "dev-only-insecure-jwt-secret"
+
+# Environment variable -> MongoClient option, with the type to parse it as
+MONGO_CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": ("maxPoolSize", int),
+    "MONGO_MIN_POOL_SIZE": ("minPoolSize", int),
+    "MONGO_MAX_IDLE_TIME_MS": ("maxIdleTimeMS", int),
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": ("waitQueueTimeoutMS", int),
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": ("serverSelectionTimeoutMS", int),
+    "MONGO_CONNECT_TIMEOUT_MS": ("connectTimeoutMS", int),
+    "MONGO_READ_PREFERENCE": ("readPreference", str),
+    "MONGO_COMPRESSORS": ("compressors", str),
+}
+
+
+def get_mongo_client_options():
+    """Build MongoClient keyword arguments from the MONGO_* environment variables."""
+    options = {}
+    for env_name, (option, cast) in MONGO_CLIENT_OPTIONS.items():
+        value = os.getenv(env_name)
+        if value:
+            options[option] = cast(value)
+    return options
+
+
+def init_mongo(app):
+    """
+    Create the Mongo client for this process.
+    The client is created with connect=False so no sockets or monitor threads
+    exist until the first query; that keeps it safe to build in the gunicorn
+    master and re-create in each worker after fork.
+    """
+    old_mongo = getattr(app, "mongo", None)
+
+    mongo = PyMongo(
+        app,
+        connect=False,
+        event_listeners=[mongo_command_listener],
+        **get_mongo_client_options(),
+    )
+    app.mongo = mongo
+    app.db = mongo.cx["test"]
+    # PyMongo.init_app installs Flask-PyMongo's BSONProvider ({"$oid": ...} output);
+    # put ours back so ids and dates stay plain strings, including after a post_fork re-init
+    app.json = MongoJSONProvider(app)
+
+    if old_mongo is not None:
+        old_mongo.cx.close()
+    return mongo
+
+
 def init_config(app):
     app.config["MONGO_URI"] = os.getenv("URI")
 
-    mongo = PyMongo(app)
-    app.mongo = mongo 
-    app.db = mongo.cx["test"]
-    try:
-        mongo.cx.admin.command("ping")
-        print("MongoDB connected")
+    # JWT settings
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+    if not app.config["JWT_SECRET_KEY"]:
+        if os.getenv("FLASK_DEBUG", "").lower() not in ("1", "true"):
+            raise RuntimeError("JWT_SECRET_KEY is not set; add it to the environment or server/.env")
+        # Development server only (run.py); tokens signed with it are worthless elsewhere
+        print("JWT_SECRET_KEY is not set - using an insecure development secret")
+        app.config["JWT_SECRET_KEY"] = DEV_JWT_SECRET_KEY
+    app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "15")))
+    app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "30")))
 
-    except Exception as e:
-        print(f"Mongo DB Connection Failed: {e}")
+    # Connectivity is reported by GET /health instead of a blocking startup ping
+    init_mongo(app)
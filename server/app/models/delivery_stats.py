@@ -0,0 +1,156 @@
+"""
+Push notification delivery analytics.
+Each fan-out (one stream batch or one shift reminder) is recorded in an hourly
+bucket document per pantry that holds running counters plus a capped list of
+recent fan-outs. Fleet-wide totals and the active device count live in a single
+counters document that is updated incrementally, so stats reads never scan.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime, timedelta
+from pymongo.errors import OperationFailure
+import os
+
+_indexes_ensured = False
+
+TOTALS_ID = "totals"
+INDEX_OPTIONS_CONFLICT = 85
+# Recent fan-outs kept in full per hourly bucket; counters keep counting past this
+MAX_FANOUTS_PER_BUCKET = 100
+
+
+def bucket_start(moment):
+    """Start of the hour a moment falls in."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def retention_seconds():
+    return int(float(os.getenv("DELIVERY_STATS_RETENTION_DAYS", "90")) * 24 * 60 * 60)
+
+
+class DeliveryStatsModel:
+    """Model for time-bucketed delivery records and incremental counters."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.buckets = mongo.cx["test"]["notification_deliveries"]
+        self.counters = mongo.cx["test"]["notification_counters"]
+        if not _indexes_ensured:
+            self.buckets.create_index([("pantry_id", 1), ("bucket", 1)], unique=True)
+            self._ensure_retention(mongo.cx["test"])
+            _indexes_ensured = True
+
+    def _ensure_retention(self, db):
+        """
+        Buckets expire on their own once they leave the retention window. The TTL index is
+        created once; a changed DELIVERY_STATS_RETENTION_DAYS is applied to it with collMod.
+        """
+        seconds = retention_seconds()
+        try:
+            try:
+                self.buckets.create_index("bucket", expireAfterSeconds=seconds)
+            except OperationFailure as e:
+                if e.code != INDEX_OPTIONS_CONFLICT:
+                    raise
+                db.command(
+                    "collMod",
+                    self.buckets.name,
+                    index={"keyPattern": {"bucket": 1}, "expireAfterSeconds": seconds},
+                )
+                print(f"Delivery stats retention changed to {seconds} seconds")
+        except OperationFailure as e:
+            # Stats keep recording under the old retention rather than failing device routes
+            print(f"Could not apply delivery stats retention: {e}")
+
+    def record_fanout(self, pantry_id, message_id, kind, results, now=None):
+        """
+        Record one fan-out's outcome in its hourly bucket and the fleet totals.
+
+        Args:
+            pantry_id: Pantry the notification was for (string)
+            message_id: Id of the stream batch or reminder assignment
+            kind: "stream" or "shift_reminder"
+            results: Result dict from send_bulk_notifications
+        """
+        now = now or datetime.utcnow()
+        sent = results.get("success_count", 0)
+        failed = results.get("failure_count", 0)
+        duration_ms = results.get("duration_ms", 0)
+        reasons = results.get("reasons", {})
+
+        increments = {"fanouts": 1, "sent": sent, "failed": failed, "duration_ms": duration_ms}
+        for reason, count in reasons.items():
+            increments[f"reasons.{reason}"] = count
+
+        self.buckets.update_one(
+            {"pantry_id": str(pantry_id), "bucket": bucket_start(now)},
+            {
+                "$inc": increments,
+                "$push": {"recent": {
+                    "$each": [{
+                        "message_id": str(message_id),
+                        "kind": kind,
+                        "at": now,
+                        "sent": sent,
+                        "failed": failed,
+                        "duration_ms": duration_ms,
+                        "reasons": reasons,
+                    }],
+                    "$slice": -MAX_FANOUTS_PER_BUCKET,
+                }},
+            },
+            upsert=True,
+        )
+        self.counters.update_one(
+            {"_id": TOTALS_ID},
+            {"$inc": increments, "$set": {"last_fanout_at": now}},
+            upsert=True,
+        )
+
+    def adjust_active_devices(self, delta):
+        """Apply a change to the active device counter."""
+        if delta:
+            self.counters.update_one({"_id": TOTALS_ID}, {"$inc": {"active_devices": delta}}, upsert=True)
+
+    def set_active_devices(self, count):
+        """Overwrite the active device counter (used to seed or reconcile it)."""
+        self.counters.update_one({"_id": TOTALS_ID}, {"$set": {"active_devices": count}}, upsert=True)
+
+    def get_totals(self):
+        return self.counters.find_one({"_id": TOTALS_ID}, {"_id": 0}) or {}
+
+    def get_buckets(self, since, pantry_id=None, include_recent=False):
+        """Hourly buckets from since onward, oldest first."""
+        query = {"bucket": {"$gte": bucket_start(since)}}
+        if pantry_id:
+            query["pantry_id"] = str(pantry_id)
+        projection = {"_id": 0} if include_recent else {"_id": 0, "recent": 0}
+        return list(self.buckets.find(query, projection).sort("bucket", 1))
+
+    def summarize(self, hours=24, pantry_id=None, include_recent=False):
+        """
+        Delivery stats for the last hours, combined from the hourly buckets.
+
+        Returns:
+            dict: {"totals": {...}, "window": {...}, "hourly": [...]}
+        """
+        since = datetime.utcnow() - timedelta(hours=hours)
+        buckets = self.get_buckets(since, pantry_id, include_recent)
+
+        hourly = {}
+        window = {"fanouts": 0, "sent": 0, "failed": 0, "duration_ms": 0, "reasons": {}}
+        for bucket in buckets:
+            hour = hourly.setdefault(bucket["bucket"], {"bucket": bucket["bucket"], "fanouts": 0, "sent": 0, "failed": 0})
+            for field in ("fanouts", "sent", "failed"):
+                hour[field] += bucket.get(field, 0)
+                window[field] += bucket.get(field, 0)
+            window["duration_ms"] += bucket.get("duration_ms", 0)
+            for reason, count in bucket.get("reasons", {}).items():
+                window["reasons"][reason] = window["reasons"].get(reason, 0) + count
+            if include_recent:
+                hour.setdefault("recent", []).extend(bucket.get("recent", []))
+
+        attempted = window["sent"] + window["failed"]
+        window["success_rate"] = window["sent"] / attempted if attempted else None
+        window["avg_fanout_ms"] = window["duration_ms"] / window["fanouts"] if window["fanouts"] else None
+        return {"totals": self.get_totals(), "window": window, "hourly": list(hourly.values())}
@@ -3,25 +3,86 @@ Device Token model for storing APNs device tokens.
 Tokens are stored separately from users to support:
 - Multiple devices per user
 - Anonymous users who still want notifications
-- Easy cleanup of invalid tokens
+- Easy cleanup of invalid tokens (a TTL index removes deactivated tokens)
+
+A device whose subscriptions are null has never chosen pantries and receives
+every pantry's stream notifications; the first subscribe or unsubscribe turns
+that into an explicit list. Clients that do not call /device/subscribe yet keep
+getting all announcements.
 """
 
 from flask_pymongo import PyMongo
-from datetime import datetime
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+import os
+
+from app.models.delivery_stats import DeliveryStatsModel
+
+_indexes_ensured = False
+
+# Deactivated tokens are deleted by MongoDB this long after deactivated_at
+INACTIVE_TOKEN_TTL_SECONDS = 30 * 24 * 60 * 60
+
+
+class DeviceTokenDocument:
+    """Fixed layout of a device token document; every token is stored with exactly these fields."""
+    
+    __slots__ = ("device_token", "username", "active", "subscriptions", "unread_count", "created_at", "updated_at")
+    
+    def __init__(self, device_token, username=None, now=None):
+        now = now or datetime.utcnow()
+        self.device_token = device_token
+        self.username = username
+        self.active = True
+        self.subscriptions = None  # every pantry until the device subscribes
+        self.unread_count = 0
+        self.created_at = now
+        self.updated_at = now
+    
+    def to_document(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+def touch_window():
+    """Re-registering an unchanged token within this window does not write."""
+    return timedelta(hours=float(os.getenv("DEVICE_TOUCH_WINDOW_HOURS", "24")))
 
 
 class DeviceTokenModel:
     """Model for managing APNs device tokens."""
     
     def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
         self.collection = mongo.cx["test"]["device_tokens"]
-        # Ensure index on device_token for fast lookups and uniqueness
-        self.collection.create_index("device_token", unique=True)
+        self.stats = DeliveryStatsModel(mongo)
+        # Only create indexes once per process rather than on every request
+        if not _indexes_ensured:
+            # Ensure index on device_token for fast lookups and uniqueness
+            self.collection.create_index("device_token", unique=True)
+            # Multikey index so a pantry's subscribers are found without scanning every device
+            self.collection.create_index([("subscriptions", 1), ("active", 1)])
+            # Deactivated tokens expire on their own; active ones never carry deactivated_at
+            self.collection.create_index(
+                "deactivated_at",
+                expireAfterSeconds=INACTIVE_TOKEN_TTL_SECONDS,
+                partialFilterExpression={"active": False},
+            )
+            # Tokens registered with an empty list before null meant "every pantry" never chose
+            # any; only subscribe/unsubscribe set subscriptions_updated_at
+            self.collection.update_many(
+                {"subscriptions": {"$size": 0}, "subscriptions_updated_at": {"$exists": False}},
+                {"$set": {"subscriptions": None}},
+            )
+            # The active device counter is maintained incrementally; seed it once if missing
+            if "active_devices" not in self.stats.get_totals():
+                self.stats.set_active_devices(self.collection.count_documents({"active": True}))
+            _indexes_ensured = True
     
     def register_token(self, device_token, username=None):
         """
         Register a device token, optionally associated with a user.
-        Uses upsert to handle both new registrations and updates.
+        Launches that re-register an unchanged token inside the touch window cause no write.
         
         Args:
             device_token: The APNs device token string
@@ -31,29 +92,84 @@ class DeviceTokenModel:
             bool: True if successful
         """
         try:
-            now = datetime.utcnow()
-            
-            result = self.collection.update_one(
-                {"device_token": device_token},
-                {
-                    "$set": {
-                        "device_token": device_token,
-                        "username": username,
-                        "updated_at": now,
-                        "active": True,
-                    },
-                    "$setOnInsert": {
-                        "created_at": now,
-                    }
-                },
-                upsert=True
-            )
-            
+            self.register_tokens([(device_token, username)])
             return True
         except Exception as e:
             print(f"Error registering device token: {e}")
             return False
     
+    def register_tokens(self, registrations):
+        """
+        Register many device tokens with a few batched writes.
+        Existing tokens are only written when their user or active flag changed, when they
+        have unread stream messages, or when they were last touched longer ago than the touch
+        window; unknown tokens are inserted. The app registers on every launch, so registering
+        also clears the unread count used for the badge.
+        
+        Args:
+            registrations: Iterable of (device_token, username) pairs
+            
+        Returns:
+            dict: {"inserted": int, "updated": int, "unchanged": int}
+        """
+        now = datetime.utcnow()
+        stale_before = now - touch_window()
+        latest = {}
+        for device_token, username in registrations:
+            latest[device_token] = username
+        if not latest:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        
+        # Reactivations are written separately so the active device counter stays exact
+        reactivations = [
+            UpdateOne(
+                {"device_token": device_token, "active": {"$ne": True}},
+                {
+                    "$set": {"username": username, "active": True, "updated_at": now, "unread_count": 0},
+                    "$unset": {"deactivated_at": ""},
+                },
+            )
+            for device_token, username in latest.items()
+        ]
+        reactivated = self.collection.bulk_write(reactivations, ordered=False).modified_count
+        
+        refreshes = [
+            UpdateOne(
+                {
+                    "device_token": device_token,
+                    "active": True,
+                    "$or": [
+                        {"username": {"$ne": username}},
+                        {"unread_count": {"$gt": 0}},
+                        {"updated_at": {"$lt": stale_before}},
+                    ],
+                },
+                {"$set": {"username": username, "updated_at": now, "unread_count": 0}},
+            )
+            for device_token, username in latest.items()
+        ]
+        updated = reactivated + self.collection.bulk_write(refreshes, ordered=False).modified_count
+        
+        existing = {
+            t["device_token"]
+            for t in self.collection.find({"device_token": {"$in": list(latest)}}, {"device_token": 1, "_id": 0})
+        }
+        new_documents = [
+            DeviceTokenDocument(device_token, username, now).to_document()
+            for device_token, username in latest.items()
+            if device_token not in existing
+        ]
+        inserted = 0
+        if new_documents:
+            try:
+                inserted = len(self.collection.insert_many(new_documents, ordered=False).inserted_ids)
+            except BulkWriteError as e:
+                # Another request registered some of the same tokens first
+                inserted = e.details.get("nInserted", 0)
+        
+        self.stats.adjust_active_devices(reactivated + inserted)
+        return {"inserted": inserted, "updated": updated, "unchanged": len(latest) - inserted - updated}
+    
     def unregister_token(self, device_token):
         """
         Remove a device token from the database.
@@ -64,8 +180,12 @@ class DeviceTokenModel:
         Returns:
             bool: True if token was found and removed
         """
-        result = self.collection.delete_one({"device_token": device_token})
-        return result.deleted_count > 0
+        removed = self.collection.find_one_and_delete({"device_token": device_token}, {"active": 1})
+        if removed is None:
+            return False
+        if removed.get("active"):
+            self.stats.adjust_active_devices(-1)
+        return True
     
     def deactivate_token(self, device_token):
         """
@@ -76,12 +196,14 @@ class DeviceTokenModel:
             device_token: The APNs device token to deactivate
             
         Returns:
-            bool: True if token was found and updated
+            bool: True if an active token was found and deactivated
         """
         result = self.collection.update_one(
-            {"device_token": device_token},
+            {"device_token": device_token, "active": True},
             {"$set": {"active": False, "deactivated_at": datetime.utcnow()}}
         )
+        if result.modified_count:
+            self.stats.adjust_active_devices(-1)
         return result.modified_count > 0
     
     def get_all_active_tokens(self):
@@ -113,6 +235,103 @@ class DeviceTokenModel:
         )
         return [t["device_token"] for t in tokens]
     
+    @staticmethod
+    def _pantry_subscribers_filter(pantry_id):
+        # Devices subscribed to the pantry, plus those that never chose (null or missing)
+        return {"$or": [{"subscriptions": str(pantry_id)}, {"subscriptions": None}], "active": True}
+    
+    def get_tokens_for_pantry(self, pantry_id):
+        """
+        Get active device tokens subscribed to a pantry (including devices on the all-pantries default).
+        
+        Args:
+            pantry_id: The pantry id (string)
+            
+        Returns:
+            list: List of device token strings
+        """
+        tokens = self.collection.find(
+            self._pantry_subscribers_filter(pantry_id),
+            {"device_token": 1, "_id": 0}
+        )
+        return [t["device_token"] for t in tokens]
+    
+    def increment_unread_for_pantry(self, pantry_id, count):
+        """
+        Add count unread announcements to every active subscriber of a pantry and
+        return {device_token: unread count} to use as the notification badge.
+        """
+        query = self._pantry_subscribers_filter(pantry_id)
+        self.collection.update_many(query, {"$inc": {"unread_count": count}})
+        tokens = self.collection.find(query, {"device_token": 1, "unread_count": 1, "_id": 0})
+        return {t["device_token"]: t.get("unread_count", count) for t in tokens}
+    
+    def reset_unread(self, device_token):
+        """Clear a device's unread count (the user opened their announcements)."""
+        result = self.collection.update_one(
+            {"device_token": device_token},
+            {"$set": {"unread_count": 0}}
+        )
+        return result.matched_count > 0
+    
+    def _subscription_filter(self, device_token=None, username=None):
+        if device_token:
+            return {"device_token": device_token}
+        return {"username": username, "active": True}
+    
+    def _start_explicit_subscriptions(self, query):
+        # Devices on the all-pantries default get an empty list to add to or pull from
+        self.collection.update_many({**query, "subscriptions": None}, {"$set": {"subscriptions": []}})
+    
+    def subscribe(self, pantry_ids, device_token=None, username=None):
+        """
+        Subscribe a device (or every device of a user) to several pantries at once.
+        
+        Returns:
+            int: Number of device documents matched
+        """
+        query = self._subscription_filter(device_token, username)
+        self._start_explicit_subscriptions(query)
+        result = self.collection.update_many(
+            query,
+            {
+                "$addToSet": {"subscriptions": {"$each": [str(p) for p in pantry_ids]}},
+                "$set": {"subscriptions_updated_at": datetime.utcnow()},
+            }
+        )
+        return result.matched_count
+    
+    def unsubscribe(self, pantry_ids, device_token=None, username=None):
+        """
+        Unsubscribe a device (or every device of a user) from several pantries at once.
+        
+        Returns:
+            int: Number of device documents matched
+        """
+        query = self._subscription_filter(device_token, username)
+        self._start_explicit_subscriptions(query)
+        result = self.collection.update_many(
+            query,
+            {
+                "$pullAll": {"subscriptions": [str(p) for p in pantry_ids]},
+                "$set": {"subscriptions_updated_at": datetime.utcnow()},
+            }
+        )
+        return result.matched_count
+    
+    def get_subscriptions(self, device_token):
+        """
+        Get the pantry ids a device is subscribed to, or None if the device is unknown.
+        
+        Returns:
+            dict: {"pantry_ids": [...], "all_pantries": bool}
+        """
+        token = self.collection.find_one({"device_token": device_token}, {"subscriptions": 1, "_id": 0})
+        if token is None:
+            return None
+        subscriptions = token.get("subscriptions")
+        return {"pantry_ids": subscriptions or [], "all_pantries": subscriptions is None}
+    
     def update_token_user(self, device_token, username):
         """
         Associate a device token with a user (e.g., after login).
@@ -131,24 +350,11 @@ class DeviceTokenModel:
         return result.modified_count > 0
     
     def get_token_count(self):
-        """Get the count of active device tokens."""
-        return self.collection.count_documents({"active": True})
+        """Get the count of active device tokens from the incrementally maintained counter."""
+        return self.stats.get_totals().get("active_devices", 0)
     
-    def cleanup_old_inactive_tokens(self, days=30):
-        """
-        Remove tokens that have been inactive for more than specified days.
-        
-        Args:
-            days: Number of days after which to remove inactive tokens
-            
-        Returns:
-            int: Number of tokens removed
-        """
-        from datetime import timedelta
-        cutoff = datetime.utcnow() - timedelta(days=days)
-        
-        result = self.collection.delete_many({
-            "active": False,
-            "deactivated_at": {"$lt": cutoff}
-        })
-        return result.deleted_count
+    def recount_tokens(self):
+        """Recount active tokens with a collection scan and reset the counter. Returns the count."""
+        count = self.collection.count_documents({"active": True})
+        self.stats.set_active_devices(count)
+        return count
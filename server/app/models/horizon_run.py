@@ -0,0 +1,64 @@
+"""
+Schedule horizon generation checkpoints.
+One document per run (identified by its date range) records the last pantry
+chunk that finished, so an interrupted run resumes where it stopped.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime
+
+_indexes_ensured = False
+
+# Checkpoints are only useful for a few days after their run
+CHECKPOINT_TTL_SECONDS = 14 * 24 * 60 * 60
+
+
+class HorizonRunModel:
+    """Model for horizon generation run checkpoints."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.collection = mongo.cx["test"]["schedule_horizon_runs"]
+        if not _indexes_ensured:
+            self.collection.create_index("updated_at", expireAfterSeconds=CHECKPOINT_TTL_SECONDS)
+            _indexes_ensured = True
+
+    def start(self, run_id, from_date, to_date, restart=False):
+        """
+        Open a run or return the existing checkpoint for it.
+
+        Returns:
+            dict: The run document (last_pantry_id is None for a fresh run)
+        """
+        now = datetime.utcnow()
+        if restart:
+            self.collection.delete_one({"_id": run_id})
+        self.collection.update_one(
+            {"_id": run_id},
+            {"$setOnInsert": {
+                "from_date": from_date,
+                "to_date": to_date,
+                "last_pantry_id": None,
+                "pantries": 0,
+                "generated": 0,
+                "failed": 0,
+                "started_at": now,
+                "completed_at": None,
+            }, "$set": {"updated_at": now}},
+            upsert=True,
+        )
+        return self.collection.find_one({"_id": run_id})
+
+    def checkpoint(self, run_id, last_pantry_id, pantries, generated, failed):
+        """Record that every pantry up to last_pantry_id is done and add the chunk's totals."""
+        self.collection.update_one(
+            {"_id": run_id},
+            {
+                "$set": {"last_pantry_id": last_pantry_id, "updated_at": datetime.utcnow()},
+                "$inc": {"pantries": pantries, "generated": generated, "failed": failed},
+            },
+        )
+
+    def complete(self, run_id):
+        now = datetime.utcnow()
+        self.collection.update_one({"_id": run_id}, {"$set": {"completed_at": now, "updated_at": now}})
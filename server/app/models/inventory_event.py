@@ -0,0 +1,98 @@
+"""
+Inventory change log.
+Every inventory write appends an event to a time-series collection (meta =
+pantry and item), giving pantries a consumption history and feeding the
+low-stock alert consumer. Events are append-only and expire after
+INVENTORY_EVENT_RETENTION_DAYS.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime
+import os
+
+_collection_ensured = False
+
+COLLECTION_NAME = "inventory_events"
+
+
+def retention_seconds():
+    return int(float(os.getenv("INVENTORY_EVENT_RETENTION_DAYS", "365")) * 24 * 60 * 60)
+
+
+def _ensure_collection(db):
+    """Create the time-series collection if it does not exist yet."""
+    if COLLECTION_NAME in db.list_collection_names():
+        return
+    try:
+        db.create_collection(
+            COLLECTION_NAME,
+            timeseries={"timeField": "at", "metaField": "meta", "granularity": "hours"},
+            expireAfterSeconds=retention_seconds(),
+        )
+    except Exception as e:
+        # Another worker created it first, or the server does not support time-series
+        # collections; events then go to a regular collection
+        print(f"Inventory events use an existing or regular collection: {e}")
+
+
+class InventoryEventModel:
+    """Model for the append-only inventory event stream."""
+
+    def __init__(self, mongo: PyMongo):
+        global _collection_ensured
+        db = mongo.cx["test"]
+        self.collection = db[COLLECTION_NAME]
+        if not _collection_ensured:
+            _ensure_collection(db)
+            self.collection.create_index([("meta.pantry_id", 1), ("meta.item", 1), ("at", 1)])
+            # The alert consumer reads the stream in time order
+            self.collection.create_index("at")
+            _collection_ensured = True
+
+    def record(self, pantry_id, item, kind, current=None, full=None, previous=None, at=None):
+        """
+        Append one inventory change.
+
+        Args:
+            kind: "add", "update" or "delete"
+            current/full: Quantities after the change
+            previous: Quantity before the change (for the consumption delta)
+        """
+        event = {
+            "at": at or datetime.utcnow(),
+            "meta": {"pantry_id": str(pantry_id), "item": item},
+            "kind": kind,
+            "current": current,
+            "full": full,
+        }
+        if isinstance(previous, (int, float)) and isinstance(current, (int, float)):
+            event["delta"] = current - previous
+        self.collection.insert_one(event)
+
+    def read_after(self, after, until, limit=5000):
+        """Events (with _id) with after < at <= until in time order (after may be None for the beginning)."""
+        query = {"at": {"$lte": until}}
+        if after is not None:
+            query["at"]["$gt"] = after
+        return list(self.collection.find(query).sort([("at", 1), ("_id", 1)]).limit(limit))
+
+    def series(self, pantry_id, since):
+        """(at, item, current) of a pantry's quantity changes since a time, oldest first."""
+        events = self.collection.find(
+            {"meta.pantry_id": str(pantry_id), "at": {"$gte": since}, "kind": {"$in": ["add", "update"]}},
+            {"_id": 0, "at": 1, "meta.item": 1, "current": 1},
+        ).sort("at", 1)
+        return [(e["at"], e["meta"]["item"], e.get("current")) for e in events]
+
+    def history(self, pantry_id, item=None, since=None, until=None, limit=1000):
+        """A pantry's events (optionally for one item) in time order."""
+        query = {"meta.pantry_id": str(pantry_id)}
+        if item:
+            query["meta.item"] = item
+        if since or until:
+            query["at"] = {}
+            if since:
+                query["at"]["$gte"] = since
+            if until:
+                query["at"]["$lte"] = until
+        return list(self.collection.find(query, {"_id": 0}).sort("at", 1).limit(limit))
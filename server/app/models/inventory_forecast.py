@@ -0,0 +1,27 @@
+"""
+Cached stock depletion forecasts.
+One document per pantry holds the last forecast and the inventory_revision it
+was computed from; it is reused by every API worker until the pantry's
+inventory is written again.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime
+
+
+class InventoryForecastModel:
+    """Model for per-pantry forecast cache documents."""
+
+    def __init__(self, mongo: PyMongo):
+        self.collection = mongo.cx["test"]["inventory_forecasts"]
+
+    def get(self, pantry_id, revision):
+        """The cached forecast for this inventory revision, or None."""
+        return self.collection.find_one({"_id": str(pantry_id), "revision": revision}, {"_id": 0})
+
+    def save(self, pantry_id, revision, forecast):
+        self.collection.replace_one(
+            {"_id": str(pantry_id)},
+            dict(forecast, revision=revision, saved_at=datetime.utcnow()),
+            upsert=True,
+        )
@@ -0,0 +1,60 @@
+"""
+Per-item inventory state maintained by the low-stock alert consumer.
+One document per (pantry, item) holds the latest quantities, the smoothed
+consumption rate and whether a low-stock alert is currently raised. The
+consumer's position in the event stream is kept in the same collection.
+"""
+
+from flask_pymongo import PyMongo
+from pymongo import UpdateOne
+
+_indexes_ensured = False
+
+CHECKPOINT_ID = "consumer:checkpoint"
+
+
+def item_key(pantry_id, item):
+    return f"{pantry_id}:{item}"
+
+
+class InventoryStatsModel:
+    """Model for per-item consumption state and the consumer checkpoint."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.collection = mongo.cx["test"]["inventory_item_stats"]
+        if not _indexes_ensured:
+            self.collection.create_index("pantry_id")
+            _indexes_ensured = True
+
+    def get_checkpoint(self):
+        """(last_at, recent) where recent lists {"id", "at"} of the events processed near last_at."""
+        doc = self.collection.find_one({"_id": CHECKPOINT_ID})
+        if not doc:
+            return None, []
+        return doc.get("last_at"), doc.get("recent", [])
+
+    def set_checkpoint(self, last_at, recent):
+        self.collection.update_one(
+            {"_id": CHECKPOINT_ID}, {"$set": {"last_at": last_at, "recent": recent}}, upsert=True
+        )
+
+    def get_states(self, keys):
+        """{item key: state} for the given keys."""
+        return {doc["_id"]: doc for doc in self.collection.find({"_id": {"$in": list(keys)}})}
+
+    def save_states(self, states):
+        """Write changed states with one bulk write."""
+        operations = [
+            UpdateOne({"_id": key}, {"$set": {k: v for k, v in state.items() if k != "_id"}}, upsert=True)
+            for key, state in states.items()
+        ]
+        if operations:
+            self.collection.bulk_write(operations, ordered=False)
+
+    def delete_state(self, key):
+        self.collection.delete_one({"_id": key})
+
+    def get_pantry_states(self, pantry_id):
+        """Consumption state of every item of a pantry."""
+        return list(self.collection.find({"pantry_id": str(pantry_id)}, {"_id": 0}).sort("item", 1))
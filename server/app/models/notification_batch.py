@@ -0,0 +1,64 @@
+"""
+Pending stream notification batches.
+Stream posts for a pantry inside the coalescing window are collected in one
+document per pantry, shared by every API worker, and sent as a single
+notification when the window closes.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+
+_indexes_ensured = False
+
+
+class NotificationBatchModel:
+    """Model for per-pantry pending notification batches."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.collection = mongo.cx["test"]["notification_batches"]
+        if not _indexes_ensured:
+            self.collection.create_index("pantry_id", unique=True)
+            self.collection.create_index("flush_at")
+            _indexes_ensured = True
+
+    def add_message(self, pantry_id, pantry_name, message, window_seconds):
+        """
+        Append a message to the pantry's open batch, opening one if needed.
+
+        Returns:
+            tuple: (opened_new_batch: bool, flush_at: datetime)
+        """
+        now = datetime.utcnow()
+        batch = self.collection.find_one_and_update(
+            {"pantry_id": str(pantry_id)},
+            {
+                "$push": {"messages": {"message": message, "posted_at": now}},
+                "$set": {"pantry_name": pantry_name},
+                "$setOnInsert": {"created_at": now, "flush_at": now + timedelta(seconds=window_seconds)},
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        opened = len(batch.get("messages", [])) == 1
+        return opened, batch["flush_at"]
+
+    def pop_batch(self, pantry_id):
+        """Atomically remove and return the pantry's batch if its window has closed."""
+        return self.collection.find_one_and_delete(
+            {"pantry_id": str(pantry_id), "flush_at": {"$lte": datetime.utcnow()}}
+        )
+
+    def pop_due_batches(self, limit=100):
+        """Atomically remove and return up to limit batches whose window has closed."""
+        batches = []
+        while len(batches) < limit:
+            batch = self.collection.find_one_and_delete(
+                {"flush_at": {"$lte": datetime.utcnow()}},
+                sort=[("flush_at", 1)],
+            )
+            if batch is None:
+                break
+            batches.append(batch)
+        return batches
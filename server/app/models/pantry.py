@@ -1,8 +1,14 @@
 from flask_pymongo import PyMongo
-from datetime import datetime, timedelta
+import re
+from datetime import datetime
+from pymongo import ReturnDocument, UpdateOne
+
+from app.models.inventory_event import InventoryEventModel
+from app.services.schedule_rules import build_schedule, compile_plan
 
 class pantry_model: 
     def __init__(self, mongo: PyMongo):
+        self.mongo = mongo
         self.collection = mongo.cx["test"]["pantries"]
     
     def get_user_week_schedule(self, username: str, from_date: str, to_date: str):
@@ -60,6 +66,47 @@ class pantry_model:
         
         return results
     
+    def get_scheduled_usernames_by_date(self, date_keys):
+        """
+        Collect who is scheduled anywhere on each of the given dates, in one query.
+        Returns {date_key: {lowercase usernames}}.
+        """
+        projection = {f"schedules.{date_key}": 1 for date_key in date_keys}
+        projection["_id"] = 0
+        scheduled = {date_key: set() for date_key in date_keys}
+
+        for pantry in self.collection.find({}, projection):
+            schedules = pantry.get("schedules", {})
+            if not isinstance(schedules, dict):
+                continue
+            for date_key, day_schedule in schedules.items():
+                if not isinstance(day_schedule, dict):
+                    continue
+                names = scheduled[date_key]
+                for shift in day_schedule.get("shifts", []):
+                    for vol in shift.get("volunteers", []):
+                        if vol.get("username"):
+                            names.add(vol["username"].lower())
+                for vol in day_schedule.get("general_volunteers", []):
+                    if vol.get("username"):
+                        names.add(vol["username"].lower())
+        return scheduled
+
+    def iter_schedules_for_dates(self, date_keys):
+        """
+        Yield (pantry_id, pantry_name, {date_key: schedule}) for every pantry, reading only
+        the given days of each pantry's schedules.
+        """
+        projection = {f"schedules.{date_key}": 1 for date_key in date_keys}
+        projection["name"] = 1
+        for pantry in self.collection.find({}, projection):
+            schedules = pantry.get("schedules") or {}
+            if not isinstance(schedules, dict) or not schedules:
+                continue
+            days = {k: v for k, v in schedules.items() if isinstance(v, dict)}
+            if days:
+                yield pantry["_id"], pantry.get("name", "Unknown Pantry"), days
+
     def check_user_scheduled_on_date(self, username: str, date_key: str, exclude_pantry_id=None):
         """
         Check if a user is already scheduled at any pantry on a given date.
@@ -127,8 +174,34 @@ class pantry_model:
         return str(result.inserted_id)
 
     def update_pantry(self, pantry_id, update_data):
-        result = self.collection.update_one({"_id": pantry_id}, {"$set": update_data})
+        if "stock" not in update_data:
+            return self.collection.update_one({"_id": pantry_id}, {"$set": update_data})
+        # A replaced stock list is logged as per-item events, like the inventory routes
+        for _ in range(5):
+            pantry = self.collection.find_one({"_id": pantry_id}, {"stock": 1, "_id": 0})
+            previous_stock = (pantry or {}).get("stock")
+            # Only apply while the stock still holds what was read, so the logged changes are exact
+            result = self.collection.update_one({"_id": pantry_id, "stock": previous_stock}, {"$set": update_data})
+            if result.matched_count > 0:
+                self._record_stock_diff(pantry_id, previous_stock or [], update_data["stock"] or [])
+            if pantry is None or result.matched_count > 0:
+                break
         return result
+
+    def _record_stock_diff(self, pantry_id, previous_stock, new_stock):
+        """Record add, update and delete events for the items that differ between two stock lists."""
+        before = {item.get("name"): item for item in previous_stock if isinstance(item, dict)}
+        after = {item.get("name"): item for item in new_stock if isinstance(item, dict)}
+        for name, item in after.items():
+            old = before.get(name)
+            if old is None:
+                self._record_inventory_change(pantry_id, name, "add", item.get("current"), item.get("full"))
+            elif old.get("current") != item.get("current") or old.get("full") != item.get("full"):
+                self._record_inventory_change(
+                    pantry_id, name, "update", item.get("current"), item.get("full"), old.get("current")
+                )
+        for name in before.keys() - after.keys():
+            self._record_inventory_change(pantry_id, name, "delete")
     
     def get_stock(self, pantry_id):
         return (
@@ -154,9 +227,17 @@ class pantry_model:
         # Use a simple projection; convert ObjectId to string at the route level
         return self.collection.find_one(
             {"username": username},
-            {"username": 1, "password": 1, "_id": {"$toString": "$_id"}},
+            {"username": 1, "password": 1, "_id": 1},
         )
     
+    def _record_inventory_change(self, pantry_id, item_name, kind, current=None, full=None, previous=None):
+        """Log an applied stock change, then bump inventory_revision (the forecast cache key)."""
+        try:
+            InventoryEventModel(self.mongo).record(pantry_id, item_name, kind, current, full, previous)
+        finally:
+            # Bumped last, so a forecast cached under the new revision includes this event
+            self.collection.update_one({"_id": pantry_id}, {"$inc": {"inventory_revision": 1}})
+
     def add_inventory_item(self, pantry_id, item):
         """Add a new inventory item to the pantry"""
         # Use upsert to create the stock array if it doesn't exist
@@ -175,24 +256,51 @@ class pantry_model:
                     {"_id": pantry_id},
                     {"$set": {"stock": [item]}}
                 )
+        if result.modified_count > 0:
+            self._record_inventory_change(pantry_id, item.get("name"), "add", item.get("current"), item.get("full"))
         return result.modified_count > 0
     
     def update_inventory_item(self, pantry_id, item_name, new_quantities):
-        """Update an inventory item's quantities"""
-        result = self.collection.update_one(
-            {"_id": pantry_id, "stock.name": item_name},
-            {"$set": {"stock.$.current": new_quantities["current"], "stock.$.full": new_quantities["full"]}}
-        )
-        return result.modified_count > 0
+        """Update an inventory item's quantities and append the change to the inventory event log"""
+        current, full = new_quantities["current"], new_quantities["full"]
+        for _ in range(5):
+            pantry = self.collection.find_one({"_id": pantry_id, "stock.name": item_name}, {"stock": 1, "_id": 0})
+            if pantry is None:
+                return False
+            previous = next((s for s in pantry.get("stock", []) if s.get("name") == item_name), {})
+            if previous.get("current") == current and previous.get("full") == full:
+                # Nothing changed: no write, no event and cached forecasts stay valid
+                return True
+            # Only apply while the item still holds what was read, so the logged delta is exact
+            result = self.collection.update_one(
+                {
+                    "_id": pantry_id,
+                    "stock": {"$elemMatch": {"name": item_name, "current": previous.get("current"), "full": previous.get("full")}},
+                },
+                {"$set": {"stock.$.current": current, "stock.$.full": full}},
+            )
+            if result.matched_count > 0:
+                self._record_inventory_change(pantry_id, item_name, "update", current, full, previous.get("current"))
+                return True
+        return False
     
     def delete_inventory_item(self, pantry_id, item_name):
         """Remove an inventory item from the pantry"""
         result = self.collection.update_one(
-            {"_id": pantry_id},
+            {"_id": pantry_id, "stock.name": item_name},
             {"$pull": {"stock": {"name": item_name}}}
         )
+        if result.modified_count > 0:
+            self._record_inventory_change(pantry_id, item_name, "delete")
         return result.modified_count > 0
     
+    def get_inventory_and_revision(self, pantry_id):
+        """Return (stock, inventory_revision), or (None, None) if the pantry does not exist"""
+        pantry = self.collection.find_one({"_id": pantry_id}, {"stock": 1, "inventory_revision": 1, "_id": 0})
+        if pantry is None:
+            return None, None
+        return pantry.get("stock", []), pantry.get("inventory_revision", 0)
+    
     def get_all_inventory(self, pantry_id):
         """Get all inventory items for a pantry"""
         pantry = self.collection.find_one(
@@ -282,51 +390,16 @@ class pantry_model:
         if not pantry_doc:
             return None
         
-        settings = pantry_doc.get("schedule_settings", {})
-        
-        # Check if scheduling is enabled and default schedule should be used
-        if not settings.get("schedulingEnabled", True):
-            return None
-        if not settings.get("useDefaultSchedule", False):
-            return None
-        
-        # Check if date is an open day
+        # Open days, recurring rules, exclusions and holidays are resolved by the rule engine
         try:
-            date_obj = datetime.strptime(date_key, "%Y-%m-%d")
-            day_of_week = date_obj.weekday()  # 0=Monday, 6=Sunday
-            # Convert to JS format (0=Sunday, 6=Saturday)
-            js_day_of_week = (day_of_week + 1) % 7
+            template = compile_plan(pantry_doc.get("schedule_settings", {})).template_for(date_key)
         except ValueError:
             return None
-        
-        open_days = settings.get("openDays", [1, 2, 3, 4, 5])  # Default Mon-Fri
-        if js_day_of_week not in open_days:
-            return None
-        
-        # Check if date is excluded
-        excluded_dates = settings.get("excludedDates", [])
-        if date_key in excluded_dates:
-            return None
-        
-        # Get default schedule template
-        default_schedule = settings.get("defaultSchedule", [])
-        if not default_schedule:
+        if not template:
             return None
         
         # Create schedule from template (deep copy, clear volunteers)
-        new_shifts = []
-        for i, shift in enumerate(default_schedule):
-            new_shifts.append({
-                "id": shift.get("id", i + 1),
-                "time": shift.get("time", ""),
-                "shift": shift.get("shift", ""),
-                "volunteers": []  # Start with no volunteers
-            })
-        
-        new_schedule = {
-            "shifts": new_shifts,
-            "general_volunteers": []
-        }
+        new_schedule = build_schedule(template)
         
         # Use $setOnInsert pattern for idempotent generation
         # This only sets the value if the field doesn't exist
@@ -353,48 +426,93 @@ class pantry_model:
     def ensure_schedules_for_range(self, pantry_id, from_date: str, to_date: str):
         """
         Ensure schedules exist for all eligible days in a date range.
-        Only generates missing schedules from the default template.
+        Only generates missing schedules from the pantry's templates and rules.
         """
-        pantry = self.collection.find_one(
-            {"_id": pantry_id},
-            {"schedules": 1, "schedule_settings": 1}
-        )
-        
+        pantry = self.collection.find_one({"_id": pantry_id}, {"schedule_settings": 1, "_id": 0})
         if not pantry:
             return 0
         
-        settings = pantry.get("schedule_settings", {})
-        if not settings.get("schedulingEnabled", True):
+        plan = compile_plan(pantry.get("schedule_settings", {}))
+        if not plan.enabled:
             return 0
-        if not settings.get("useDefaultSchedule", False):
+        return self.generate_schedules(pantry_id, plan.expand(from_date, to_date))
+
+    def iter_auto_schedule_pantries(self, after_id=None, batch_size=500):
+        """Cursor over (_id, schedule_settings) of pantries that generate schedules from templates, in _id order."""
+        query = {
+            "schedule_settings.useDefaultSchedule": True,
+            "schedule_settings.schedulingEnabled": {"$ne": False},
+        }
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        return self.collection.find(query, {"schedule_settings": 1}, batch_size=batch_size).sort("_id", 1)
+
+    def generate_schedules(self, pantry_id, planned_days):
+        """
+        Write the missing days of an expanded plan with one bulk write.
+        Each day is only set if it does not exist yet, so existing schedules are never overwritten.
+
+        Args:
+            planned_days: Iterable of (date_key, template) from SchedulePlan.expand
+
+        Returns:
+            int: Number of days generated
+        """
+        planned = dict(planned_days)
+        if not planned:
             return 0
         
-        existing_schedules = pantry.get("schedules", {})
-        if not isinstance(existing_schedules, dict):
-            existing_schedules = {}
+        projection = {f"schedules.{date_key}": 1 for date_key in planned}
+        projection["_id"] = 0
+        existing = (self.collection.find_one({"_id": pantry_id}, projection) or {}).get("schedules") or {}
         
-        generated_count = 0
-        current_date = datetime.strptime(from_date, "%Y-%m-%d")
-        end_date = datetime.strptime(to_date, "%Y-%m-%d")
-        
-        while current_date <= end_date:
-            date_key = current_date.strftime("%Y-%m-%d")
-            
-            # Skip if already exists
-            if date_key not in existing_schedules:
-                result = self._auto_generate_schedule(pantry_id, date_key, pantry)
-                if result:
-                    generated_count += 1
-            
-            current_date += timedelta(days=1)
-        
-        return generated_count
+        operations = [
+            UpdateOne(
+                {"_id": pantry_id, f"schedules.{date_key}": {"$exists": False}},
+                {"$set": {f"schedules.{date_key}": build_schedule(template)}}
+            )
+            for date_key, template in planned.items()
+            if date_key not in existing
+        ]
+        if not operations:
+            return 0
+        return self.collection.bulk_write(operations, ordered=False).modified_count
 
-    def save_schedule_for_date(self, pantry_id, date_key: str, schedule_data):
+    def get_schedules_for_dates(self, pantry_id, date_keys):
+        """
+        Return {date_key: schedule} for the given dates in one read (missing days are omitted),
+        normalizing the legacy array format.
+        """
+        projection = {f"schedules.{date_key}": 1 for date_key in date_keys}
+        projection["_id"] = 0
+        pantry = self.collection.find_one({"_id": pantry_id}, projection)
+        if pantry is None:
+            return None
+
+        schedules = {}
+        for date_key, day_schedule in (pantry.get("schedules") or {}).items():
+            if isinstance(day_schedule, list):
+                day_schedule = {"shifts": day_schedule, "general_volunteers": []}
+            if isinstance(day_schedule, dict):
+                schedules[date_key] = day_schedule
+        return schedules
+
+    @staticmethod
+    def _revision_filter(expected_revision):
+        # Documents written before revisions existed count as revision 0
+        if expected_revision == 0:
+            return {"$in": [None, 0]}
+        return expected_revision
+
+    def save_schedule_for_date(self, pantry_id, date_key: str, schedule_data, expected_revision=None):
         """
         Save schedule for a specific date key (YYYY-MM-DD).
         Accepts new format: { shifts: [...], general_volunteers: [...] }
         Or legacy format: [...] (array of shifts)
+
+        Every save bumps the day's revision. If expected_revision is given the write only
+        applies when the stored revision still matches it.
+        Returns ("ok", new_revision), ("not_found", None) or ("conflict", current_schedule).
         """
         # Handle legacy format (array of shifts)
         if isinstance(schedule_data, list):
@@ -402,12 +520,124 @@ class pantry_model:
                 "shifts": schedule_data,
                 "general_volunteers": []
             }
-        
+        schedule_data = {k: v for k, v in schedule_data.items() if k != "revision"}
+
+        revision_field = f"schedules.{date_key}.revision"
+        # A save without expected_revision is based on the revision it reads; if another
+        # write lands in between it re-reads rather than overwrite the new revision
+        for _ in range(5):
+            if expected_revision is not None:
+                revision_match = self._revision_filter(expected_revision)
+                new_revision = expected_revision + 1
+            else:
+                pantry = self.collection.find_one({"_id": pantry_id}, {revision_field: 1, "_id": 0})
+                if pantry is None:
+                    return "not_found", None
+                day_schedule = (pantry.get("schedules") or {}).get(date_key)
+                revision_match = day_schedule.get("revision") if isinstance(day_schedule, dict) else None
+                base = revision_match if isinstance(revision_match, (int, float)) and not isinstance(revision_match, bool) else 0
+                new_revision = base + 1
+
+            result = self.collection.update_one(
+                {"_id": pantry_id, revision_field: revision_match},
+                {"$set": {f"schedules.{date_key}": {**schedule_data, "revision": new_revision}}},
+            )
+            if result.matched_count > 0:
+                return "ok", new_revision
+            if expected_revision is not None:
+                break
+
+        if self.collection.count_documents({"_id": pantry_id}, limit=1) == 0:
+            return "not_found", None
+        return "conflict", self.get_schedule_for_date(pantry_id, date_key, auto_generate=False)
+
+    @staticmethod
+    def _shift_id_values(shift_id):
+        """Shift ids come from the client as numbers but arrive in URLs as strings; match either."""
+        values = [shift_id]
+        if isinstance(shift_id, str) and shift_id.lstrip("-").isdigit():
+            values.append(int(shift_id))
+        return values
+
+    def _find_shift(self, pantry_id, date_key: str, shift_id):
+        pantry = self.collection.find_one({"_id": pantry_id}, {f"schedules.{date_key}": 1, "_id": 0})
+        if pantry is None:
+            return None, "not_found"
+        day_schedule = (pantry.get("schedules") or {}).get(date_key)
+        if not isinstance(day_schedule, dict):
+            return None, "shift_not_found"
+        for shift in day_schedule.get("shifts", []):
+            if shift.get("id") in self._shift_id_values(shift_id):
+                return shift, "ok"
+        return None, "shift_not_found"
+
+    @staticmethod
+    def _username_pattern(username: str):
+        """Case-insensitive exact match for a username, like the user and volunteer lookups."""
+        return re.compile(f"^{re.escape(username)}$", re.IGNORECASE)
+
+    def add_volunteer_to_shift(self, pantry_id, date_key: str, shift_id, volunteer: dict):
+        """
+        Atomically sign a volunteer up for one shift.
+        The update only applies if the shift exists, the volunteer is not already on it and
+        the shift is below its (optional) capacity, so concurrent signups cannot overbook.
+        Returns "ok", "not_found", "shift_not_found", "already_signed_up" or "full".
+        """
+        shift, status = self._find_shift(pantry_id, date_key, shift_id)
+        if shift is None and status == "shift_not_found":
+            # The day may not have been generated from the default template yet
+            self.get_schedule_for_date(pantry_id, date_key)
+            shift, status = self._find_shift(pantry_id, date_key, shift_id)
+        if shift is None:
+            return status
+
+        capacity = shift.get("capacity")
+        if capacity is not None and int(capacity) <= 0:
+            return "full"
+
+        shift_ids = self._shift_id_values(shift_id)
+        username = volunteer["username"]
+        shift_match = {"id": {"$in": shift_ids}, "volunteers.username": {"$not": self._username_pattern(username)}}
+        if capacity is not None:
+            # Guard on the capacity we read and on the slot past it still being empty
+            shift_match["capacity"] = capacity
+            shift_match[f"volunteers.{int(capacity) - 1}"] = {"$exists": False}
+
         result = self.collection.update_one(
-            {"_id": pantry_id},
-            {"$set": {f"schedules.{date_key}": schedule_data}}
+            {"_id": pantry_id, f"schedules.{date_key}.shifts": {"$elemMatch": shift_match}},
+            {
+                "$addToSet": {f"schedules.{date_key}.shifts.$[s].volunteers": volunteer},
+                "$inc": {f"schedules.{date_key}.revision": 1},
+            },
+            array_filters=[{"s.id": {"$in": shift_ids}}],
         )
-        return result.matched_count > 0
+        if result.modified_count > 0:
+            return "ok"
+
+        # Work out why the conditional update did not apply
+        shift, status = self._find_shift(pantry_id, date_key, shift_id)
+        if shift is None:
+            return status
+        if any(str(v.get("username", "")).lower() == username.lower() for v in shift.get("volunteers", [])):
+            return "already_signed_up"
+        return "full"
+
+    def remove_volunteer_from_shift(self, pantry_id, date_key: str, shift_id, username: str):
+        """Atomically withdraw a volunteer from one shift. Returns True if they were removed."""
+        shift_ids = self._shift_id_values(shift_id)
+        pattern = self._username_pattern(username)
+        result = self.collection.update_one(
+            {
+                "_id": pantry_id,
+                f"schedules.{date_key}.shifts": {"$elemMatch": {"id": {"$in": shift_ids}, "volunteers.username": pattern}},
+            },
+            {
+                "$pull": {f"schedules.{date_key}.shifts.$[s].volunteers": {"username": pattern}},
+                "$inc": {f"schedules.{date_key}.revision": 1},
+            },
+            array_filters=[{"s.id": {"$in": shift_ids}}],
+        )
+        return result.modified_count > 0
 
     def delete_schedule_for_date(self, pantry_id, date_key: str):
         """Delete schedule for a specific date key (YYYY-MM-DD)."""
@@ -417,29 +647,61 @@ class pantry_model:
         )
         return result.matched_count > 0
 
-    def cleanup_past_schedules(self, pantry_id, today_key: str) -> int:
-        """Unset any schedules with a key older than today_key (YYYY-MM-DD). Returns number removed."""
-        pantry = self.collection.find_one({"_id": pantry_id}, {"schedules": 1})
+    def get_past_schedules(self, pantry_id, today_key: str):
+        """Return {date_key: schedule} for days before today_key (YYYY-MM-DD), filtered on the server."""
+        pantry = next(self.collection.aggregate([
+            {"$match": {"_id": pantry_id, "schedules": {"$type": "object"}}},
+            {"$project": {"_id": 0, "past": {"$filter": {
+                "input": {"$objectToArray": "$schedules"},
+                "as": "day",
+                "cond": {"$lt": ["$$day.k", today_key]},
+            }}}},
+        ]), None)
         if not pantry:
+            return {}
+        return {day["k"]: day["v"] for day in pantry["past"]}
+
+    def unset_schedules(self, pantry_id, days):
+        """
+        Remove days from the pantry's schedules, each only if it is unchanged since it was read.
+        A day with a revision must still have it; older days without one must still match the
+        content read. Days edited in between are left in place.
+
+        Args:
+            days: {date_key: schedule as returned by get_past_schedules}
+
+        Returns:
+            int: Number of days removed
+        """
+        operations = []
+        for date_key, day_schedule in days.items():
+            revision = day_schedule.get("revision") if isinstance(day_schedule, dict) else None
+            if isinstance(revision, (int, float)) and not isinstance(revision, bool):
+                match = {f"schedules.{date_key}.revision": revision}
+            else:
+                match = {f"schedules.{date_key}": day_schedule}
+            operations.append(UpdateOne({"_id": pantry_id, **match}, {"$unset": {f"schedules.{date_key}": ""}}))
+        if not operations:
             return 0
-        schedules = pantry.get("schedules")
-        if not isinstance(schedules, dict):
-            return 0
-        to_remove = [k for k in schedules.keys() if isinstance(k, str) and k < today_key]
-        if not to_remove:
-            return 0
-        unset_spec = {f"schedules.{k}": "" for k in to_remove}
-        self.collection.update_one({"_id": pantry_id}, {"$unset": unset_spec})
-        return len(to_remove)
+        return self.collection.bulk_write(operations, ordered=False).modified_count
+
+    def get_pantry_ids_with_schedules(self):
+        """Ids of pantries that have any schedule days stored."""
+        return [p["_id"] for p in self.collection.find({"schedules": {"$type": "object"}}, {"_id": 1})]
     
     def get_schedule_settings(self, pantry_id):
         """Get volunteer schedule settings for a pantry"""
+        return self.get_schedule_settings_and_revision(pantry_id)[0]
+
+    def get_schedule_settings_and_revision(self, pantry_id):
+        """Get volunteer schedule settings for a pantry along with their revision number"""
         pantry = self.collection.find_one(
             {"_id": pantry_id},
-            {"schedule_settings": 1, "_id": 0}
+            {"schedule_settings": 1, "schedule_settings_revision": 1, "_id": 0}
         )
+        revision = (pantry or {}).get("schedule_settings_revision", 0)
         if pantry and "schedule_settings" in pantry:
-            return pantry["schedule_settings"]
+            return pantry["schedule_settings"], revision
         # Return default settings if none exist
         return {
             "schedulingEnabled": True,
@@ -448,15 +710,29 @@ class pantry_model:
             "excludedDates": [],
             "useDefaultSchedule": False,
             "defaultSchedule": []
-        }
+        }, revision
     
-    def save_schedule_settings(self, pantry_id, settings):
-        """Save volunteer schedule settings for a pantry"""
-        result = self.collection.update_one(
-            {"_id": pantry_id},
-            {"$set": {"schedule_settings": settings}}
+    def save_schedule_settings(self, pantry_id, settings, expected_revision=None):
+        """
+        Save volunteer schedule settings for a pantry.
+        Returns ("ok", new_revision), ("not_found", None) or ("conflict", (settings, revision)).
+        """
+        query = {"_id": pantry_id}
+        if expected_revision is not None:
+            query["schedule_settings_revision"] = self._revision_filter(expected_revision)
+
+        pantry = self.collection.find_one_and_update(
+            query,
+            {"$set": {"schedule_settings": settings}, "$inc": {"schedule_settings_revision": 1}},
+            projection={"schedule_settings_revision": 1, "_id": 0},
+            return_document=ReturnDocument.AFTER,
         )
-        return result.matched_count > 0
+        if pantry is not None:
+            return "ok", pantry["schedule_settings_revision"]
+
+        if expected_revision is None or self.collection.count_documents({"_id": pantry_id}, limit=1) == 0:
+            return "not_found", None
+        return "conflict", self.get_schedule_settings_and_revision(pantry_id)
     
     def get_pantries(self):
         """Swift stream view functionality - includes schedule_settings for volunteer scheduling"""
@@ -498,7 +774,7 @@ class pantry_model:
                 },
                 {
                     "$project":{
-                        "_id": {"$toString": "$_id"},
+                        "_id": 1, # serialized to a string by the app's JSON provider
                         "name":1,
                         "address":1,
                         "email":1,
@@ -0,0 +1,106 @@
+"""
+Archived volunteer schedules.
+Past days are moved out of the pantry documents into one compact document per
+(pantry, month), and per-volunteer hours for each (pantry, month) are kept in a
+rollup collection indexed by username, so history reports never read the live
+pantry documents.
+"""
+
+from flask_pymongo import PyMongo
+from pymongo import DeleteMany, UpdateOne
+
+_indexes_ensured = False
+
+
+class ScheduleArchiveModel:
+    """Model for the monthly schedule archive and the volunteer hours rollup."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.archive = mongo.cx["test"]["schedule_archive"]
+        self.hours = mongo.cx["test"]["volunteer_hours"]
+        if not _indexes_ensured:
+            self.archive.create_index([("pantry_id", 1), ("month", 1)], unique=True)
+            # Serves reports over a range of months across every pantry
+            self.archive.create_index("month")
+            self.hours.create_index([("pantry_id", 1), ("month", 1), ("username", 1)], unique=True)
+            # Serves "hours for a volunteer over a range of months"
+            self.hours.create_index([("username", 1), ("month", 1)])
+            self.hours.create_index("month")
+            _indexes_ensured = True
+
+    def archive_days(self, pantry_id, days_by_month):
+        """
+        Store compact days in their month documents with one bulk write.
+
+        Args:
+            days_by_month: {"YYYY-MM": {date_key: compact day}}
+        """
+        operations = [
+            UpdateOne(
+                {"pantry_id": pantry_id, "month": month},
+                {"$set": {f"days.{date_key}": day for date_key, day in days.items()}},
+                upsert=True,
+            )
+            for month, days in days_by_month.items()
+            if days
+        ]
+        if operations:
+            self.archive.bulk_write(operations, ordered=False)
+
+    def get_months(self, pantry_id, months):
+        """Archived month documents of a pantry, keyed by month."""
+        return {
+            doc["month"]: doc
+            for doc in self.archive.find({"pantry_id": pantry_id, "month": {"$in": list(months)}}, {"_id": 0})
+        }
+
+    def replace_month_hours(self, pantry_id, month, totals):
+        """
+        Overwrite the hours rollup of one (pantry, month).
+
+        Args:
+            totals: {username: {"hours": float, "shifts": int, "general_days": int}}
+        """
+        operations = [
+            UpdateOne(
+                {"pantry_id": pantry_id, "month": month, "username": username},
+                {"$set": values},
+                upsert=True,
+            )
+            for username, values in totals.items()
+        ]
+        # Volunteers no longer on any archived day of the month
+        operations.append(DeleteMany({"pantry_id": pantry_id, "month": month, "username": {"$nin": list(totals)}}))
+        self.hours.bulk_write(operations, ordered=False)
+
+    def get_volunteer_hours(self, username, from_month, to_month):
+        """Per (pantry, month) hours rows for a volunteer, read from the username index."""
+        return list(self.hours.find(
+            {"username": username.lower(), "month": {"$gte": from_month, "$lte": to_month}},
+            {"_id": 0},
+        ).sort("month", 1))
+
+    def sum_hours(self, from_month, to_month, pantry_id=None, username=None, max_time_ms=None):
+        """
+        Rollup totals per (volunteer, pantry) over a range of whole months.
+
+        Returns:
+            list: [{"_id": {"username", "pantry_id"}, "hours", "shifts", "general_days"}, ...]
+        """
+        match = {"month": {"$gte": from_month, "$lte": to_month}}
+        if pantry_id is not None:
+            match["pantry_id"] = pantry_id
+        if username:
+            match["username"] = username.lower()
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {"username": "$username", "pantry_id": "$pantry_id"},
+                "hours": {"$sum": "$hours"},
+                "shifts": {"$sum": "$shifts"},
+                "general_days": {"$sum": "$general_days"},
+            }},
+        ]
+        options = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+        return list(self.hours.aggregate(pipeline, **options))
@@ -0,0 +1,51 @@
+"""
+Shift reminder markers.
+One document per (pantry, date, shift, username) assignment records that its
+reminder was claimed/sent, which makes the reminder scheduler idempotent.
+"""
+
+from flask_pymongo import PyMongo
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+
+_indexes_ensured = False
+
+
+class ShiftReminderModel:
+    """Model for shift reminder sent-markers."""
+
+    def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
+        self.collection = mongo.cx["test"]["shift_reminders"]
+        if not _indexes_ensured:
+            self.collection.create_index("assignment_key", unique=True)
+            # Markers are only needed until the shift has passed
+            self.collection.create_index("expires_at", expireAfterSeconds=0)
+            _indexes_ensured = True
+
+    @staticmethod
+    def assignment_key(pantry_id, date_key, shift_id, username):
+        return f"{pantry_id}:{date_key}:{shift_id}:{username.lower()}"
+
+    def claim(self, assignment_key, expires_at):
+        """
+        Claim an assignment for reminding. Returns False if it was already claimed,
+        so two scheduler processes can never both send the same reminder.
+        """
+        try:
+            self.collection.insert_one({
+                "assignment_key": assignment_key,
+                "status": "sending",
+                "claimed_at": datetime.utcnow(),
+                "expires_at": expires_at,
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+
+    def mark_result(self, assignment_key, sent, error=None):
+        """Record whether the reminder reached at least one device."""
+        self.collection.update_one(
+            {"assignment_key": assignment_key},
+            {"$set": {"status": "sent" if sent else "failed", "error": error, "finished_at": datetime.utcnow()}}
+        )
@@ -24,10 +24,7 @@ class UserModel:
         return str(result.inserted_id)
     def find_user_by_username(self, username):
         # Case-insensitive username lookup using regex
-        user = self.collection.find_one({"username": {"$regex": f"^{username}$", "$options": "i"}})
-        if user:
-            user['_id'] = str(user['_id'])
-        return user
+        return self.collection.find_one({"username": {"$regex": f"^{username}$", "$options": "i"}})
     
     def delete_user_by_username(self, username):
         # Case-insensitive username deletion: first find user, then delete by exact username
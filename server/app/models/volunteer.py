@@ -1,28 +1,152 @@
 from flask_pymongo import PyMongo
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.collation import Collation
+from pymongo.errors import BulkWriteError, OperationFailure
+import re
+
+# Weekday numbering follows the JS convention used by schedule_settings (0=Sunday, 6=Saturday)
+DAY_ALIASES = {
+    "sunday": 0, "sun": 0,
+    "monday": 1, "mon": 1,
+    "tuesday": 2, "tue": 2, "tues": 2,
+    "wednesday": 3, "wed": 3,
+    "thursday": 4, "thu": 4, "thur": 4, "thurs": 4,
+    "friday": 5, "fri": 5,
+    "saturday": 6, "sat": 6,
+}
+DAY_GROUPS = {
+    "weekday": [1, 2, 3, 4, 5], "weekdays": [1, 2, 3, 4, 5],
+    "weekend": [0, 6], "weekends": [0, 6],
+    "any": list(range(7)), "anytime": list(range(7)), "everyday": list(range(7)), "daily": list(range(7)),
+}
+
+# Fields returned by the paginated listing unless the caller asks for specific ones
+LIST_FIELDS = ["username", "first_name", "last_name", "email", "phone_number", "zipcode", "roles", "availability", "verified"]
+ALLOWED_LIST_FIELDS = set(LIST_FIELDS) | {"date_of_birth", "emergency_name", "emergency_number", "availability_days", "role_tags"}
+
+# Compound indexes backing the listing filters; _id last so cursor pagination stays index-ordered
+LIST_INDEXES = [
+    [("zipcode", 1), ("_id", 1)],
+    [("role_tags", 1), ("_id", 1)],
+    [("availability_days", 1), ("_id", 1)],
+    [("verified", 1), ("_id", 1)],
+]
+# Usernames are unique ignoring case; lookups pass the same collation so they can use the index
+USERNAME_COLLATION = Collation(locale="en", strength=2)
+DUPLICATE_KEY_ERROR = 11000
+_indexes_ensured = False
+
+
+def parse_availability_days(availability):
+    """Turn free-text availability ("Mon, Wed evenings", "weekends") into sorted weekday numbers."""
+    if isinstance(availability, list):
+        availability = " ".join(str(a) for a in availability)
+    if not isinstance(availability, str):
+        return []
+    days = set()
+    for word in re.findall(r"[a-z]+", availability.lower()):
+        if word in DAY_ALIASES:
+            days.add(DAY_ALIASES[word])
+        elif word in DAY_GROUPS:
+            days.update(DAY_GROUPS[word])
+    return sorted(days)
+
+
+def parse_roles(roles):
+    """Turn roles (comma separated text or a list) into lowercase tags."""
+    if isinstance(roles, str):
+        roles = roles.split(",")
+    if not isinstance(roles, list):
+        return []
+    return sorted({str(r).strip().lower() for r in roles if str(r).strip()})
+
+
+def availability_mask(days):
+    """Pack weekday numbers into a 7-bit mask (bit 0 = Sunday)."""
+    mask = 0
+    for day in days:
+        mask |= 1 << day
+    return mask
+
+
+def with_search_fields(volunteer_data):
+    """Add the derived fields the listing filters on, based on availability and roles."""
+    if "availability" in volunteer_data:
+        volunteer_data["availability_days"] = parse_availability_days(volunteer_data["availability"])
+        volunteer_data["availability_mask"] = availability_mask(volunteer_data["availability_days"])
+    if "roles" in volunteer_data:
+        volunteer_data["role_tags"] = parse_roles(volunteer_data["roles"])
+    return volunteer_data
+
 
 class volunteer_model:
     def __init__(self, mongo: PyMongo):
+        global _indexes_ensured
         self.collection = mongo.cx["test"]["volunteers"]
+        # Only create indexes once per process rather than on every request
+        if not _indexes_ensured:
+            for keys in LIST_INDEXES:
+                self.collection.create_index(keys)
+            try:
+                self.collection.create_index("username", unique=True, collation=USERNAME_COLLATION)
+            except OperationFailure as e:
+                # Existing case-insensitive duplicates have to be merged before the index can be built
+                print(f"Could not create the unique volunteer username index: {e}")
+            _indexes_ensured = True
 
     def create_volunteer(self, username, first_name, last_name, date_of_birth, email, phone_number, zipcode, roles, availability, emergency_name, emergency_number, verified):
         volunteer_data = {
             "username": username,
             "first_name": first_name,
-            "last_name": last_name, 
+            "last_name": last_name,
             "date_of_birth": date_of_birth,
             "email": email,
-            "phone_number": phone_number, 
+            "phone_number": phone_number,
             "zipcode": zipcode,
             "roles": roles,
             "availability": availability,
-            "emergency_name": emergency_name, 
+            "emergency_name": emergency_name,
             "emergency_number": emergency_number,
             "verified": verified,
         }
-        result = self.collection.insert_one(volunteer_data)
+        result = self.collection.insert_one(with_search_fields(volunteer_data))
         return str(result.inserted_id)
-    
+
+    def existing_usernames(self, usernames):
+        """Return the lowercase usernames from the list that already exist (case-insensitive)."""
+        found = self.collection.find(
+            {"username": {"$in": list(usernames)}},
+            {"username": 1, "_id": 0},
+            collation=USERNAME_COLLATION,
+        )
+        return {v["username"].lower() for v in found}
+
+    def insert_volunteers(self, documents):
+        """
+        Insert many volunteers with one unordered write.
+
+        Returns:
+            tuple: (inserted_count, duplicate_count, [(index in documents, error message), ...])
+            where duplicates are usernames inserted concurrently by another writer
+        """
+        try:
+            result = self.collection.insert_many(documents, ordered=False)
+            return len(result.inserted_ids), 0, []
+        except BulkWriteError as e:
+            details = e.details
+            write_errors = details.get("writeErrors", [])
+            duplicates = sum(1 for err in write_errors if err.get("code") == DUPLICATE_KEY_ERROR)
+            errors = [
+                (err["index"], err.get("errmsg", "Write error"))
+                for err in write_errors if err.get("code") != DUPLICATE_KEY_ERROR
+            ]
+            return details.get("nInserted", 0), duplicates, errors
+
+    def export_cursor(self, batch_size=1000):
+        """Cursor over every volunteer for streaming exports."""
+        return self.collection.find({}, batch_size=batch_size).sort("_id", 1)
+
     def find_volunteer_by_id(self, id):
         return list(
             self.collection.aggregate(
@@ -39,25 +163,94 @@ class volunteer_model:
                 ]
             )
         )
-    
+
     def get_volunteers(self):
-        volunteers = list(self.collection.find())
-        # Convert ObjectId to string for JSON serialization
-        for volunteer in volunteers:
-            volunteer['_id'] = str(volunteer['_id'])
-        return volunteers
-    
+        # ObjectIds are serialized by the app's JSON provider
+        return list(self.collection.find())
+
+    def list_volunteers(self, limit=50, after_id=None, zipcode=None, role=None, verified=None, day=None, fields=None):
+        """
+        Return one page of volunteers matching the filters, ordered by _id.
+
+        Args:
+            limit: Maximum volunteers to return
+            after_id: ObjectId cursor; only volunteers after it are returned
+            zipcode: Exact zipcode match
+            role: Role tag (case-insensitive)
+            verified: True/False
+            day: Weekday number (0=Sunday) the volunteer is available
+            fields: Fields to return (defaults to LIST_FIELDS)
+
+        Returns:
+            tuple: (volunteers, next_cursor or None)
+        """
+        query = {}
+        if after_id is not None:
+            query["_id"] = {"$gt": after_id}
+        if zipcode:
+            query["zipcode"] = zipcode
+        if role:
+            query["role_tags"] = role.strip().lower()
+        if verified is not None:
+            # verified has been stored both as a bool and as "True"/"False" strings
+            query["verified"] = {"$in": [True, "True", "true"]} if verified else {"$in": [False, "False", "false"]}
+        if day is not None:
+            query["availability_days"] = day
+
+        projection = {field: 1 for field in (fields or LIST_FIELDS)}
+        # Fetch one extra document to know whether another page exists
+        volunteers = list(self.collection.find(query, projection).sort("_id", 1).limit(limit + 1))
+
+        next_cursor = None
+        if len(volunteers) > limit:
+            volunteers = volunteers[:limit]
+            next_cursor = str(volunteers[-1]["_id"])
+        return volunteers, next_cursor
+
+    def get_matching_profiles(self, verified_only=True):
+        """Return the compact volunteer fields the shift matching engine needs."""
+        query = {"verified": {"$in": [True, "True", "true"]}} if verified_only else {}
+        return list(self.collection.find(
+            query,
+            {"username": 1, "first_name": 1, "last_name": 1, "zipcode": 1, "role_tags": 1,
+             "availability_days": 1, "availability_mask": 1, "availability": 1, "roles": 1, "_id": 0},
+        ))
+
+    def backfill_search_fields(self):
+        """Populate availability_days/availability_mask/role_tags on volunteers created before they existed."""
+        updated = 0
+        batch = []
+        missing = self.collection.find(
+            {"$or": [
+                {"availability_days": {"$exists": False}},
+                {"availability_mask": {"$exists": False}},
+                {"role_tags": {"$exists": False}},
+            ]},
+            {"availability": 1, "roles": 1},
+        )
+        for volunteer in missing:
+            days = parse_availability_days(volunteer.get("availability"))
+            fields = {
+                "availability_days": days,
+                "availability_mask": availability_mask(days),
+                "role_tags": parse_roles(volunteer.get("roles")),
+            }
+            batch.append(UpdateOne({"_id": volunteer["_id"]}, {"$set": fields}))
+            if len(batch) >= 500:
+                updated += self.collection.bulk_write(batch, ordered=False).modified_count
+                batch = []
+        if batch:
+            updated += self.collection.bulk_write(batch, ordered=False).modified_count
+        return updated
+
     def update_volunteer(self, volunteer_id, update_data):
-        result = self.collection.update_one({"_id": ObjectId(volunteer_id)}, {"$set": update_data})
+        result = self.collection.update_one({"_id": ObjectId(volunteer_id)}, {"$set": with_search_fields(update_data)})
         return result
 
     def delete_volunteer(self, volunteer_id):
         result = self.collection.delete_one({"_id": ObjectId(volunteer_id)})
         return result
-    
+
     def find_volunteer_by_username(self, username):
         """Find a volunteer by username (case-insensitive)"""
-        volunteer = self.collection.find_one({"username": {"$regex": f"^{username}$", "$options": "i"}})
-        if volunteer:
-            volunteer['_id'] = str(volunteer['_id'])
-        return volunteer 
\ No newline at end of file
+        return self.collection.find_one({"username": {"$regex": f"^{username}$", "$options": "i"}})
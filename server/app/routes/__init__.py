@@ -4,6 +4,10 @@ from .user_routes import user_routes
 from .pantry_routes import pantry_routes
 from .auth_routes import auth_routes
 from .device_routes import device_routes
+from .health_routes import health_routes
+from .metrics_routes import metrics_routes
+from .profiling_routes import profiling_routes
+from .report_routes import report_routes
 
 def init_routes(app):
     app.register_blueprint(volunteer_routes, url_prefix="/volunteer")
@@ -11,4 +15,8 @@ def init_routes(app):
     app.register_blueprint(user_routes, url_prefix="/user")
     app.register_blueprint(pantry_routes, url_prefix="/pantry")
     app.register_blueprint(auth_routes, url_prefix="/auth")
-    app.register_blueprint(device_routes, url_prefix="/device")
\ No newline at end of file
+    app.register_blueprint(device_routes, url_prefix="/device")
+    app.register_blueprint(health_routes, url_prefix="/health")
+    app.register_blueprint(metrics_routes, url_prefix="/metrics")
+    app.register_blueprint(profiling_routes, url_prefix="/profiling")
+    app.register_blueprint(report_routes, url_prefix="/reports")
\ No newline at end of file
@@ -3,10 +3,9 @@ from flask_bcrypt import Bcrypt
 from app.models.user import UserModel
 from flask_jwt_extended import (
     create_access_token,
-    jwt_required,
-    get_jwt_identity,
     create_refresh_token,
 )
+from app.services.auth_cache import cached_jwt_required, get_current_claims
 
 auth_routes = Blueprint("auth_routes", __name__)
 
@@ -35,9 +34,17 @@ def log_in():
         if is_valid and user_database["username"].lower() == username.lower():
             user_database.pop("password", None) 
 
+            # Tokens carry the identity and user id so protected endpoints
+            # never need to look the user up again
+            claims = {"user_id": str(user_database["_id"]), "role": "user"}
+            access_token = create_access_token(identity=user_database["username"], additional_claims=claims)
+            refresh_token = create_refresh_token(identity=user_database["username"], additional_claims=claims)
+
             return jsonify(
                 {
                     "user_database": user_database,
+                    "access_token": access_token,
+                    "refresh_token": refresh_token,
                 }
             ), 200
         else:
@@ -51,18 +58,35 @@ def log_out():
     return jsonify({"message": "List will be here"})
 
 @auth_routes.route("/refresh/", methods=["POST"])
-@jwt_required(refresh=True) #ensures only refresh tokens can be used
+@cached_jwt_required(refresh=True) #ensures only refresh tokens can be used
 def refresh():
     try:
-        # get the identity from the refresh token
-        user_id = get_jwt_identity()
+        # get the identity and user claims from the refresh token
+        claims = get_current_claims()
+        # Only refresh tokens issued by user login carry these; pantry tokens must use /pantry_login/refresh
+        if claims.get("role") != "user" or not claims.get("user_id"):
+            return jsonify({"error": "Refresh token was not issued by user login"}), 401
+        extra_claims = {"user_id": claims["user_id"], "role": "user"}
 
         #create a new access token
-        new_access_token = create_access_token(identity=user_id)
+        new_access_token = create_access_token(identity=claims["sub"], additional_claims=extra_claims)
 
         return jsonify({"access_token": new_access_token}), 200
     except Exception as error:
         return jsonify({"error": str(error)}), 400
 
+@auth_routes.route("/me", methods=["GET"])
+@cached_jwt_required()
+def me():
+    """Return the logged in user's identity straight from the token claims (no DB lookup)"""
+    claims = get_current_claims()
+    return jsonify(
+        {
+            "username": claims.get("sub"),
+            "user_id": claims.get("user_id"),
+            "role": claims.get("role"),
+        }
+    ), 200
+
         
         
@@ -3,10 +3,14 @@ Routes for managing device tokens for push notifications.
 """
 
 from flask import Blueprint, jsonify, current_app, request
+from app.models.delivery_stats import DeliveryStatsModel
 from app.models.device_token import DeviceTokenModel
+from app.services.admin_auth import admin_token_required
 
 device_routes = Blueprint("device_routes", __name__)
 
+MAX_BATCH_REGISTRATIONS = 500
+
 
 @device_routes.route("/register", methods=["POST"])
 def register_device():
@@ -45,6 +49,41 @@ def register_device():
         return jsonify({"message": "Error registering device", "error": str(e)}), 400
 
 
+@device_routes.route("/register-batch", methods=["POST"])
+def register_devices():
+    """
+    Register many device tokens in one request.
+    
+    Body:
+        devices: List of {"device_token": ..., "username": ...} (required, at most 500)
+        
+    Returns:
+        200: {"inserted": int, "updated": int, "unchanged": int}
+        400: Missing or invalid devices
+    """
+    try:
+        data = request.get_json() or {}
+        devices = data.get("devices")
+        
+        if not isinstance(devices, list) or not devices:
+            return jsonify({"message": "devices must be a non-empty list"}), 400
+        if len(devices) > MAX_BATCH_REGISTRATIONS:
+            return jsonify({"message": f"At most {MAX_BATCH_REGISTRATIONS} devices per request"}), 400
+        
+        registrations = []
+        for device in devices:
+            device_token = device.get("device_token") if isinstance(device, dict) else None
+            if not isinstance(device_token, str) or len(device_token) < 32:
+                return jsonify({"message": "Invalid device token format", "device": device}), 400
+            registrations.append((device_token, device.get("username")))
+        
+        model = DeviceTokenModel(current_app.mongo)
+        return jsonify(model.register_tokens(registrations)), 200
+            
+    except Exception as e:
+        return jsonify({"message": "Error registering devices", "error": str(e)}), 400
+
+
 @device_routes.route("/unregister", methods=["POST"])
 def unregister_device():
     """
@@ -114,13 +153,143 @@ def update_device_user():
         return jsonify({"message": "Error updating device user", "error": str(e)}), 400
 
 
+def _subscription_request():
+    """Parse a subscribe/unsubscribe body; returns (pantry_ids, device_token, username, error)."""
+    data = request.get_json() or {}
+    device_token = data.get("device_token")
+    username = data.get("username")
+    pantry_ids = data.get("pantry_ids")
+    if isinstance(data.get("pantry_id"), str):
+        pantry_ids = [data["pantry_id"]]
+    
+    if not device_token and not username:
+        return None, None, None, "device_token or username is required"
+    if not isinstance(pantry_ids, list) or not pantry_ids or not all(isinstance(p, str) for p in pantry_ids):
+        return None, None, None, "pantry_ids must be a non-empty list of pantry ids"
+    return pantry_ids, device_token, username, None
+
+
+@device_routes.route("/subscribe", methods=["POST"])
+def subscribe_device():
+    """
+    Subscribe a device (or all of a user's devices) to stream notifications from pantries.
+    
+    Body:
+        device_token: The APNs device token (or username to apply to all of the user's devices)
+        pantry_ids: List of pantry ids to subscribe to
+        
+    Returns:
+        200: Subscriptions updated
+        400: Missing fields
+        404: No matching device
+    """
+    try:
+        pantry_ids, device_token, username, error = _subscription_request()
+        if error:
+            return jsonify({"message": error}), 400
+        
+        model = DeviceTokenModel(current_app.mongo)
+        matched = model.subscribe(pantry_ids, device_token, username)
+        
+        if matched:
+            return jsonify({"message": "Subscribed successfully", "devices": matched}), 200
+        else:
+            return jsonify({"message": "Device not found"}), 404
+            
+    except Exception as e:
+        return jsonify({"message": "Error subscribing device", "error": str(e)}), 400
+
+
+@device_routes.route("/unsubscribe", methods=["POST"])
+def unsubscribe_device():
+    """
+    Unsubscribe a device (or all of a user's devices) from pantries.
+    
+    Body:
+        device_token: The APNs device token (or username to apply to all of the user's devices)
+        pantry_ids: List of pantry ids to unsubscribe from
+        
+    Returns:
+        200: Subscriptions updated
+        400: Missing fields
+        404: No matching device
+    """
+    try:
+        pantry_ids, device_token, username, error = _subscription_request()
+        if error:
+            return jsonify({"message": error}), 400
+        
+        model = DeviceTokenModel(current_app.mongo)
+        matched = model.unsubscribe(pantry_ids, device_token, username)
+        
+        if matched:
+            return jsonify({"message": "Unsubscribed successfully", "devices": matched}), 200
+        else:
+            return jsonify({"message": "Device not found"}), 404
+            
+    except Exception as e:
+        return jsonify({"message": "Error unsubscribing device", "error": str(e)}), 400
+
+
+@device_routes.route("/subscriptions", methods=["GET"])
+def get_device_subscriptions():
+    """
+    List the pantries a device is subscribed to.
+    
+    Query:
+        device_token: The APNs device token
+        
+    Returns:
+        200: {"pantry_ids": [...], "all_pantries": bool} (all_pantries until the device subscribes)
+        404: Device not found
+    """
+    try:
+        device_token = request.args.get("device_token")
+        if not device_token:
+            return jsonify({"message": "device_token is required"}), 400
+        
+        model = DeviceTokenModel(current_app.mongo)
+        subscriptions = model.get_subscriptions(device_token)
+        if subscriptions is None:
+            return jsonify({"message": "Device token not found"}), 404
+        return jsonify(subscriptions), 200
+    except Exception as e:
+        return jsonify({"message": "Error getting subscriptions", "error": str(e)}), 400
+
+
+@device_routes.route("/mark-read", methods=["POST"])
+def mark_device_read():
+    """
+    Reset a device's unread announcement count (used for the app badge).
+    
+    Body:
+        device_token: The APNs device token
+        
+    Returns:
+        200: Count reset
+        404: Device not found
+    """
+    try:
+        data = request.get_json() or {}
+        device_token = data.get("device_token")
+        if not device_token:
+            return jsonify({"message": "device_token is required"}), 400
+        
+        model = DeviceTokenModel(current_app.mongo)
+        if model.reset_unread(device_token):
+            return jsonify({"message": "Unread count reset"}), 200
+        return jsonify({"message": "Device token not found"}), 404
+    except Exception as e:
+        return jsonify({"message": "Error resetting unread count", "error": str(e)}), 400
+
+
 @device_routes.route("/count", methods=["GET"])
 def get_device_count():
     """
     Get the count of registered devices (for admin/debugging).
     
     Returns:
-        200: Count of active device tokens
+        200: Count of active device tokens (maintained incrementally, no collection scan)
     """
     try:
         model = DeviceTokenModel(current_app.mongo)
@@ -128,3 +297,42 @@ def get_device_count():
         return jsonify({"count": count}), 200
     except Exception as e:
         return jsonify({"message": "Error getting device count", "error": str(e)}), 400
+
+
+@device_routes.route("/stats", methods=["GET"])
+@admin_token_required
+def get_delivery_stats():
+    """
+    Get push delivery stats and the active device count from the precomputed counters.
+    
+    Query:
+        hours: Window to summarize (default 24, at most 24 * 90)
+        pantry_id: Optional pantry to restrict the window to
+        recent: "true" to include the recent fan-outs of each hour
+        
+    Returns:
+        200: {"totals": {...}, "window": {...}, "hourly": [...]}
+    """
+    try:
+        hours = min(max(int(request.args.get("hours", 24)), 1), 24 * 90)
+        include_recent = request.args.get("recent", "").lower() == "true"
+        stats = DeliveryStatsModel(current_app.mongo)
+        return jsonify(stats.summarize(hours, request.args.get("pantry_id"), include_recent)), 200
+    except Exception as e:
+        return jsonify({"message": "Error getting delivery stats", "error": str(e)}), 400
+
+
+@device_routes.route("/stats/recount", methods=["POST"])
+@admin_token_required
+def recount_devices():
+    """
+    Recount active devices with a collection scan and reset the counter (admin repair).
+    
+    Returns:
+        200: {"count": int}
+    """
+    try:
+        model = DeviceTokenModel(current_app.mongo)
+        return jsonify({"count": model.recount_tokens()}), 200
+    except Exception as e:
+        return jsonify({"message": "Error recounting devices", "error": str(e)}), 400
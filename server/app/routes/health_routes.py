@@ -0,0 +1,60 @@
+"""
+Health check routes.
+The Mongo ping runs in a background thread so the endpoint always answers
+immediately with the most recent known status.
+"""
+
+import threading
+import time
+
+from flask import Blueprint, jsonify, current_app
+
+health_routes = Blueprint("health_routes", __name__)
+
+# How long a ping result is trusted before a new background ping is started
+PING_INTERVAL_SECONDS = 10
+
+_status = {"mongo": "unknown", "error": None, "checked_at": None}
+_status_lock = threading.Lock()
+_ping_in_progress = False
+
+
+def _ping_mongo(mongo):
+    global _ping_in_progress
+    try:
+        mongo.cx.admin.command("ping")
+        result = {"mongo": "up", "error": None}
+    except Exception as e:
+        result = {"mongo": "down", "error": str(e)}
+    with _status_lock:
+        _status.update(result)
+        _status["checked_at"] = time.time()
+        _ping_in_progress = False
+
+
+def _refresh_status_if_stale(mongo):
+    global _ping_in_progress
+    with _status_lock:
+        checked_at = _status["checked_at"]
+        is_stale = checked_at is None or time.time() - checked_at > PING_INTERVAL_SECONDS
+        if not is_stale or _ping_in_progress:
+            return
+        _ping_in_progress = True
+    threading.Thread(target=_ping_mongo, args=(mongo,), daemon=True).start()
+
+
+@health_routes.route("/", methods=["GET"], strict_slashes=False)
+def health():
+    """
+    Report process and database health without blocking on Mongo.
+
+    Returns:
+        200: Process is up; "mongo" is "up", "down" or "unknown" (first check still running)
+        503: Last Mongo ping failed
+    """
+    _refresh_status_if_stale(current_app.mongo)
+    with _status_lock:
+        status = dict(_status)
+
+    status["status"] = "ok" if status["mongo"] != "down" else "degraded"
+    return jsonify(status), 503 if status["mongo"] == "down" else 200
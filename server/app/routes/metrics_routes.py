@@ -0,0 +1,14 @@
+"""
+Prometheus scrape endpoint for request and MongoDB timing histograms.
+"""
+
+from flask import Blueprint, Response
+from app.services.metrics import render_metrics
+
+metrics_routes = Blueprint("metrics_routes", __name__)
+
+
+@metrics_routes.route("/", methods=["GET"], strict_slashes=False)
+def get_metrics():
+    """Return all collected metrics in the Prometheus text exposition format."""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
@@ -1,13 +1,42 @@
 from flask import Blueprint, jsonify, current_app, request
 from app.models.pantry import pantry_model
-from app.models.device_token import DeviceTokenModel
-from app.services.push_notifications import send_stream_notification
+from app.models.volunteer import volunteer_model
+from app.models.inventory_event import InventoryEventModel
+from app.models.inventory_stats import InventoryStatsModel
+from app.services.inventory_alerts import days_until_empty
+from app.services.forecasting import get_pantry_forecast
+from app.services.notification_batching import queue_stream_notification
+from app.services.http_cache import cached_response
+from app.services.shift_matching import date_range, match_volunteers
+from app.services.schedule_rules import validate_settings
 from bson import ObjectId
 from flask_bcrypt import Bcrypt
 from datetime import datetime, timedelta
 
 pantry_routes = Blueprint("pantry_routes", __name__)
 
+def _expected_revision(data):
+    """
+    Read the revision a write is based on from the If-Match header or 'expected_revision' in the body.
+    If-Match: * (any current revision) and no value at all both mean an unconditional write.
+    Returns (revision, error) where revision is None for unconditional writes.
+    """
+    if_match = (request.headers.get("If-Match") or "").strip()
+    if if_match == "*":
+        return None, None
+    if if_match:
+        # ETags look like "3" (possibly weak or with an encoding suffix such as "3-gzip")
+        value = if_match.removeprefix("W/").strip('"').split("-")[0]
+        if not value.isdigit():
+            return None, "If-Match must be a revision ETag such as \"3\" or *"
+        return int(value), None
+    value = data.get("expected_revision")
+    if value is None:
+        return None, None
+    if isinstance(value, bool) or not (isinstance(value, int) or (isinstance(value, str) and value.isdigit())):
+        return None, "'expected_revision' must be a non-negative integer"
+    return int(value), None
+
 @pantry_routes.route("/create", methods=["POST"])
 def create_pantry():
     try: 
@@ -116,6 +145,7 @@ def get_stock(pantry_id):
     #to remove the stock list object being in a list from the aggregate method which returns a list
 
 @pantry_routes.route("/info/<string:pantry_id>", methods=["GET"])
+@cached_response("public, no-cache")
 def get_pantry_info(pantry_id):
     """Get pantry information (name, address, email, phone)"""
     try:
@@ -151,18 +181,9 @@ def post_stream(pantry_id):
         if updated_stream is None:
             return jsonify({"message": "Pantry not found"}), 404
         
-        # Send push notifications to all registered devices
+        # Notify the devices subscribed to this pantry; bursts of posts are coalesced into one push
         try:
-            device_model = DeviceTokenModel(current_app.mongo)
-            device_tokens = device_model.get_all_active_tokens()
-            
-            if device_tokens:
-                notification_results = send_stream_notification(
-                    pantry_name=pantry_name,
-                    message=message,
-                    device_tokens=device_tokens
-                )
-                print(f"Push notifications sent: {notification_results['success_count']} success, {notification_results['failure_count']} failed")
+            queue_stream_notification(current_app.mongo, pantry_id, pantry_name, message)
         except Exception as notif_error:
             # Log but don't fail the request if notifications fail
             print(f"Error sending push notifications: {notif_error}")
@@ -185,6 +206,7 @@ def delete_stream_item(pantry_id, index):
 
 # Inventory management routes
 @pantry_routes.route("/<string:pantry_id>/inventory", methods=["GET"])
+@cached_response("public, no-cache")
 def get_inventory(pantry_id):
     """Get all inventory items for a pantry"""
     try:
@@ -197,6 +219,47 @@ def get_inventory(pantry_id):
     except Exception as e:
         return jsonify({"message": "Error getting inventory", "error": str(e)}), 400
 
+@pantry_routes.route("/<string:pantry_id>/inventory/history", methods=["GET"])
+def get_inventory_history(pantry_id):
+    """
+    Inventory change events for a pantry, oldest first.
+    Query: item (optional), from/to (YYYY-MM-DD, optional), limit (default 1000, max 5000)
+    """
+    try:
+        since = datetime.strptime(request.args["from"], "%Y-%m-%d") if request.args.get("from") else None
+        until = datetime.strptime(request.args["to"], "%Y-%m-%d") + timedelta(days=1) if request.args.get("to") else None
+        limit = min(max(int(request.args.get("limit", 1000)), 1), 5000)
+    except ValueError:
+        return jsonify({"message": "from/to must be YYYY-MM-DD and limit an integer"}), 400
+    try:
+        events = InventoryEventModel(current_app.mongo).history(pantry_id, request.args.get("item"), since, until, limit)
+        return jsonify({"events": events}), 200
+    except Exception as e:
+        return jsonify({"message": "Error getting inventory history", "error": str(e)}), 400
+
+@pantry_routes.route("/<string:pantry_id>/inventory/trends", methods=["GET"])
+def get_inventory_trends(pantry_id):
+    """Per-item consumption rate (units/day), stock ratio and low-stock alert state"""
+    try:
+        items = InventoryStatsModel(current_app.mongo).get_pantry_states(pantry_id)
+        for item in items:
+            item["days_until_empty"] = days_until_empty(item)
+        return jsonify({"items": items}), 200
+    except Exception as e:
+        return jsonify({"message": "Error getting inventory trends", "error": str(e)}), 400
+
+@pantry_routes.route("/<string:pantry_id>/inventory/forecast", methods=["GET"])
+@cached_response("private, no-cache")
+def get_inventory_forecast(pantry_id):
+    """Days until empty per item, cached until the pantry's inventory is written again"""
+    try:
+        forecast = get_pantry_forecast(current_app.mongo, ObjectId(pantry_id))
+        if forecast is None:
+            return jsonify({"message": "Pantry not found"}), 404
+        return jsonify(forecast), 200
+    except Exception as e:
+        return jsonify({"message": "Error forecasting inventory", "error": str(e)}), 400
+
 @pantry_routes.route("/<string:pantry_id>/inventory", methods=["POST"])
 def add_inventory_item(pantry_id):
     """Add a new inventory item to the pantry"""
@@ -269,12 +332,8 @@ def get_schedule_for_date(pantry_id):
             return jsonify({"message": "Missing 'date' query parameter (YYYY-MM-DD)"}), 400
         pantry_id_obj = ObjectId(pantry_id)
         model = pantry_model(current_app.mongo)
-        # Lazy cleanup of past schedules
+        # Past days are archived by the horizon worker, not on the request path
         today_key = datetime.utcnow().strftime("%Y-%m-%d")
-        try:
-            model.cleanup_past_schedules(pantry_id_obj, today_key)
-        except Exception:
-            pass
         
         # Ensure schedules exist for the next 7 days (lazy generation)
         try:
@@ -285,7 +344,10 @@ def get_schedule_for_date(pantry_id):
             pass
         
         schedule = model.get_schedule_for_date(pantry_id_obj, date_key)
-        return jsonify({"date": date_key, "schedule": schedule}), 200
+        revision = schedule.get("revision", 0)
+        response = jsonify({"date": date_key, "schedule": schedule, "revision": revision})
+        response.set_etag(str(revision))
+        return response, 200
     except Exception as e:
         return jsonify({"message": "Error getting schedule", "error": str(e)}), 400
 
@@ -294,6 +356,9 @@ def put_schedule_for_date(pantry_id, date_key):
     """
     Replace volunteer schedule for date_key (YYYY-MM-DD). 
     Body: { schedule: { shifts: [...], general_volunteers: [...] } } or legacy { schedule: [...] }
+    Send If-Match: "<revision>" or expected_revision in the body to only save if nobody else
+    changed the day since it was read; a stale revision returns 409 with the current schedule
+    and a malformed one returns 400. If-Match: * saves unconditionally.
     """
     try:
         data = request.get_json() or {}
@@ -305,20 +370,25 @@ def put_schedule_for_date(pantry_id, date_key):
         if not isinstance(schedule, (list, dict)):
             return jsonify({"message": "'schedule' must be an array or object"}), 400
         
+        expected_revision, error = _expected_revision(data)
+        if error:
+            return jsonify({"message": error}), 400
+
         pantry_id_obj = ObjectId(pantry_id)
         model = pantry_model(current_app.mongo)
         
-        # Lazy cleanup of past schedules prior to save
-        today_key = datetime.utcnow().strftime("%Y-%m-%d")
-        try:
-            model.cleanup_past_schedules(pantry_id_obj, today_key)
-        except Exception:
-            pass
-        
-        ok = model.save_schedule_for_date(pantry_id_obj, date_key, schedule)
-        if not ok:
+        status, result = model.save_schedule_for_date(pantry_id_obj, date_key, schedule, expected_revision)
+        if status == "not_found":
             return jsonify({"message": "Pantry not found"}), 404
-        return jsonify({"message": "Schedule saved"}), 200
+        if status == "conflict":
+            return jsonify({
+                "message": "Schedule was changed by someone else",
+                "schedule": result,
+                "revision": result.get("revision", 0),
+            }), 409
+        response = jsonify({"message": "Schedule saved", "revision": result})
+        response.set_etag(str(result))
+        return response, 200
     except Exception as e:
         return jsonify({"message": "Error saving schedule", "error": str(e)}), 400
 
@@ -335,6 +405,58 @@ def delete_schedule_for_date(pantry_id, date_key):
     except Exception as e:
         return jsonify({"message": "Error deleting schedule", "error": str(e)}), 400
 
+@pantry_routes.route("/<string:pantry_id>/schedule/<string:date_key>/shifts/<string:shift_id>/volunteers", methods=["POST"])
+def sign_up_for_shift(pantry_id, date_key, shift_id):
+    """
+    Sign a volunteer up for a single shift with one atomic write.
+    Body: { username, name (optional), email (optional) }
+    """
+    try:
+        data = request.get_json() or {}
+        username = data.get("username")
+        if not username or not isinstance(username, str):
+            return jsonify({"message": "'username' is required"}), 400
+
+        volunteer = {
+            "name": data.get("name", ""),
+            "email": data.get("email", ""),
+            "username": username,
+        }
+        model = pantry_model(current_app.mongo)
+        status = model.add_volunteer_to_shift(ObjectId(pantry_id), date_key, shift_id, volunteer)
+
+        if status == "ok":
+            return jsonify({"message": "Signed up for shift"}), 201
+        if status == "not_found":
+            return jsonify({"message": "Pantry not found"}), 404
+        if status == "shift_not_found":
+            return jsonify({"message": "Shift not found"}), 404
+        if status == "already_signed_up":
+            return jsonify({"message": "Already signed up for this shift"}), 409
+        return jsonify({"message": "Shift is full"}), 409
+    except Exception as e:
+        return jsonify({"message": "Error signing up for shift", "error": str(e)}), 400
+
+@pantry_routes.route("/<string:pantry_id>/schedule/<string:date_key>/shifts/<string:shift_id>/volunteers", methods=["DELETE"])
+def withdraw_from_shift(pantry_id, date_key, shift_id):
+    """
+    Remove a volunteer from a single shift with one atomic write.
+    Body or query: { username }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        username = data.get("username") or request.args.get("username")
+        if not username:
+            return jsonify({"message": "'username' is required"}), 400
+
+        model = pantry_model(current_app.mongo)
+        removed = model.remove_volunteer_from_shift(ObjectId(pantry_id), date_key, shift_id, username)
+        if not removed:
+            return jsonify({"message": "Volunteer is not signed up for this shift"}), 404
+        return jsonify({"message": "Withdrawn from shift"}), 200
+    except Exception as e:
+        return jsonify({"message": "Error withdrawing from shift", "error": str(e)}), 400
+
 @pantry_routes.route("/user-schedule/<string:username>", methods=["GET"])
 def get_user_week_schedule(username):
     """
@@ -372,34 +494,105 @@ def check_user_conflict():
         return jsonify(result), 200
     except Exception as e:
         return jsonify({"message": "Error checking user conflict", "error": str(e)}), 400
+@pantry_routes.route("/<string:pantry_id>/shift-matches", methods=["GET"])
+def get_shift_matches(pantry_id):
+    """
+    Rank candidate volunteers for each open shift of a pantry over a date range.
+    Query params: from, to (YYYY-MM-DD, default today..+7 days, max 31 days),
+    limit (candidates per shift, default 10), verified_only (default true)
+    Returns: { matches: [{date, shift_id, shift, time, assigned, capacity, candidates: [...]}] }
+    """
+    try:
+        today = datetime.utcnow()
+        from_date = request.args.get("from", today.strftime("%Y-%m-%d"))
+        to_date = request.args.get("to", (today + timedelta(days=7)).strftime("%Y-%m-%d"))
+        limit = min(max(int(request.args.get("limit", 10)), 1), 50)
+        verified_only = request.args.get("verified_only", "true").lower() != "false"
+
+        date_keys = date_range(from_date, to_date)
+        if not date_keys:
+            return jsonify({"message": "'from' must not be after 'to'"}), 400
+        if len(date_keys) > 31:
+            return jsonify({"message": "Date range is limited to 31 days"}), 400
+
+        pantry_id_obj = ObjectId(pantry_id)
+        model = pantry_model(current_app.mongo)
+        pantry_info = model.get_pantry_info(pantry_id_obj)
+        if not pantry_info:
+            return jsonify({"message": "Pantry not found"}), 404
+
+        # Make sure template days exist so they can be staffed
+        try:
+            model.ensure_schedules_for_range(pantry_id_obj, date_keys[0], date_keys[-1])
+        except Exception:
+            pass
+
+        schedules = model.get_schedules_for_dates(pantry_id_obj, date_keys)
+        scheduled_by_date = model.get_scheduled_usernames_by_date(date_keys)
+        profiles = volunteer_model(current_app.mongo).get_matching_profiles(verified_only)
+
+        matches = match_volunteers(
+            profiles,
+            schedules or {},
+            scheduled_by_date,
+            date_keys,
+            pantry_address=pantry_info.get("address"),
+            limit=limit,
+        )
+        return jsonify({"matches": matches}), 200
+    except Exception as e:
+        return jsonify({"message": "Error matching volunteers", "error": str(e)}), 400
+
 @pantry_routes.route("/<string:pantry_id>/schedule-settings", methods=["GET"])
 def get_schedule_settings(pantry_id):
     """Get volunteer schedule settings for a pantry"""
     try:
         pantry_id = ObjectId(pantry_id)
         model = pantry_model(current_app.mongo)
-        settings = model.get_schedule_settings(pantry_id)
-        return jsonify({"settings": settings}), 200
+        settings, revision = model.get_schedule_settings_and_revision(pantry_id)
+        response = jsonify({"settings": settings, "revision": revision})
+        response.set_etag(str(revision))
+        return response, 200
     except Exception as e:
         return jsonify({"message": "Error getting schedule settings", "error": str(e)}), 400
 
 @pantry_routes.route("/<string:pantry_id>/schedule-settings", methods=["PUT"])
 def save_schedule_settings(pantry_id):
-    """Save volunteer schedule settings for a pantry"""
+    """
+    Save volunteer schedule settings for a pantry.
+    Send If-Match: "<revision>" or expected_revision in the body for a conditional save;
+    a stale revision returns 409 with the current settings.
+    """
     try:
         data = request.get_json() or {}
         settings = data.get("settings", {})
+        error = validate_settings(settings)
+        if error:
+            return jsonify({"message": error}), 400
+        expected_revision, error = _expected_revision(data)
+        if error:
+            return jsonify({"message": error}), 400
         pantry_id = ObjectId(pantry_id)
         model = pantry_model(current_app.mongo)
-        success = model.save_schedule_settings(pantry_id, settings)
-        if success:
-            return jsonify({"message": "Settings saved successfully"}), 200
+        status, result = model.save_schedule_settings(pantry_id, settings, expected_revision)
+        if status == "ok":
+            response = jsonify({"message": "Settings saved successfully", "revision": result})
+            response.set_etag(str(result))
+            return response, 200
+        elif status == "conflict":
+            current_settings, revision = result
+            return jsonify({
+                "message": "Settings were changed by someone else",
+                "settings": current_settings,
+                "revision": revision,
+            }), 409
         else:
             return jsonify({"message": "Failed to save settings"}), 404
     except Exception as e:
         return jsonify({"message": "Error saving schedule settings", "error": str(e)}), 400
 
 @pantry_routes.route("/", methods=["GET"], strict_slashes=False)
+@cached_response("public, no-cache")
 def get_pantries():
     try:
         pantry = pantry_model(current_app.mongo)
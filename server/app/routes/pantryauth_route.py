@@ -3,10 +3,9 @@ from flask_bcrypt import Bcrypt
 from app.models.pantry import pantry_model
 from flask_jwt_extended import (
     create_access_token,
-    jwt_required,
-    get_jwt_identity,
     create_refresh_token
 )
+from app.services.auth_cache import cached_jwt_required, get_current_claims
 #used to convert string to ObjectId
 pantryauth_route = Blueprint("pantryauth_route", __name__)
 
@@ -36,8 +35,9 @@ def log_in():
                 "username": pantry_database.get("username"),
             }
             #Generate a token
-            access_token = create_access_token(identity=username)
-            refresh_token = create_refresh_token(identity=username)
+            claims = {"pantry_id": safe_user["_id"], "role": "pantry"}
+            access_token = create_access_token(identity=username, additional_claims=claims)
+            refresh_token = create_refresh_token(identity=username, additional_claims=claims)
             return jsonify({
                 "user": safe_user,
                 "access_token": access_token,
@@ -53,14 +53,18 @@ def log_out():
     return jsonify({"message": "List will be here"}) #what does this mean?
 
 @pantryauth_route.route("/refresh/", methods=["POST"])
-@jwt_required(refresh=True) #ensures only refresh tokens can be used
+@cached_jwt_required(refresh=True) #ensures only refresh tokens can be used
 def refresh():
     try: 
         # Get the identity from the refresh token
-        user_id = get_jwt_identity()
+        claims = get_current_claims()
+        # User refresh tokens belong to /auth/refresh; tokens from before pantry claims have no role
+        if claims.get("role", "pantry") != "pantry":
+            return jsonify({"error": "Refresh token was not issued by pantry login"}), 401
+        extra_claims = {"pantry_id": claims["pantry_id"], "role": "pantry"} if claims.get("pantry_id") else {}
 
         #Create a new access token
-        new_access_token = create_access_token(identity=user_id)   
+        new_access_token = create_access_token(identity=claims["sub"], additional_claims=extra_claims)   
         
         return jsonify({"access_token": new_access_token}), 200
     
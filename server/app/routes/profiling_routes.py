@@ -0,0 +1,30 @@
+"""
+Admin routes for viewing request profiles captured by the profiling hook.
+"""
+
+from flask import Blueprint, jsonify
+from app.services.admin_auth import admin_token_required
+from app.services.profiling import get_profile_store
+
+profiling_routes = Blueprint("profiling_routes", __name__)
+
+
+@profiling_routes.route("/", methods=["GET"], strict_slashes=False)
+@admin_token_required
+def get_profiles():
+    """
+    List the most recent request profiles, newest first.
+    
+    Returns:
+        200: {"profiles": [...]}
+        403: Missing or invalid admin token
+    """
+    return jsonify({"profiles": get_profile_store().list()}), 200
+
+
+@profiling_routes.route("/", methods=["DELETE"], strict_slashes=False)
+@admin_token_required
+def clear_profiles():
+    """Empty the profile ring buffer."""
+    get_profile_store().clear()
+    return jsonify({"message": "Profiles cleared"}), 200
@@ -0,0 +1,71 @@
+"""
+Volunteer hours and pantry staffing reports.
+"""
+
+from flask import Blueprint, jsonify, current_app, request
+from bson import ObjectId
+from pymongo.errors import ExecutionTimeout
+from app.services.admin_auth import admin_token_required
+from app.services.http_cache import cached_response
+from app.services.reports import StaffingReports, parse_report_range
+
+report_routes = Blueprint("report_routes", __name__)
+
+
+def _report_args():
+    """Parse from/to and the optional pantry_id. Returns (from_date, to_date, pantry_id, error)."""
+    from_date, to_date, error = parse_report_range(request.args.get("from"), request.args.get("to"))
+    if error:
+        return None, None, None, error
+    pantry_id = request.args.get("pantry_id")
+    if pantry_id:
+        if not ObjectId.is_valid(pantry_id):
+            return None, None, None, "Invalid pantry_id"
+        pantry_id = ObjectId(pantry_id)
+    return from_date, to_date, pantry_id or None, None
+
+
+@report_routes.route("/pantries", methods=["GET"])
+@admin_token_required
+@cached_response("private, no-cache")
+def pantry_staffing_report():
+    """
+    Per-pantry shifts, fill rate and volunteer hours.
+    Query: from, to (YYYY-MM-DD, required), pantry_id (optional)
+    """
+    from_date, to_date, pantry_id, error = _report_args()
+    if error:
+        return jsonify({"message": error}), 400
+    try:
+        pantries = StaffingReports(current_app.mongo).pantry_staffing(from_date, to_date, pantry_id)
+    except ExecutionTimeout:
+        return jsonify({"message": "Report exceeded its time budget; try a shorter range"}), 503
+    except Exception as e:
+        return jsonify({"message": "Error building staffing report", "error": str(e)}), 400
+    return jsonify({"from": from_date, "to": to_date, "pantries": pantries}), 200
+
+
+@report_routes.route("/volunteers", methods=["GET"])
+@admin_token_required
+@cached_response("private, no-cache")
+def volunteer_hours_report():
+    """
+    Per-volunteer shifts and hours, most hours first.
+    Query: from, to (YYYY-MM-DD, required), pantry_id, username, limit (default 100, max 1000)
+    """
+    from_date, to_date, pantry_id, error = _report_args()
+    if error:
+        return jsonify({"message": error}), 400
+    try:
+        limit = min(max(int(request.args.get("limit", 100)), 1), 1000)
+    except ValueError:
+        return jsonify({"message": "limit must be an integer"}), 400
+    try:
+        volunteers, total = StaffingReports(current_app.mongo).volunteer_hours(
+            from_date, to_date, pantry_id, request.args.get("username"), limit
+        )
+    except ExecutionTimeout:
+        return jsonify({"message": "Report exceeded its time budget; try a shorter range"}), 503
+    except Exception as e:
+        return jsonify({"message": "Error building volunteer report", "error": str(e)}), 400
+    return jsonify({"from": from_date, "to": to_date, "volunteers": volunteers, "total_volunteers": total}), 200
@@ -1,6 +1,11 @@
-from flask import Blueprint, jsonify, current_app, request
-from app.models.volunteer import volunteer_model
+from flask import Blueprint, jsonify, current_app, request, Response, stream_with_context
+from app.models.volunteer import volunteer_model, ALLOWED_LIST_FIELDS, DAY_ALIASES
+from app.models.schedule_archive import ScheduleArchiveModel
+from app.services.http_cache import cached_response
+from app.services.admin_auth import admin_token_required
+from app.services.volunteer_bulk import import_volunteers, iter_records, iter_csv_export, iter_ndjson_export
 from bson import ObjectId
+from datetime import datetime
 
 volunteer_routes = Blueprint("volunteer_routes", __name__)
 
@@ -65,6 +70,7 @@ def update_volunteer(volunteer_id):
     return jsonify({"_id": volunteer_id}), 200
 
 @volunteer_routes.route("/get", methods=["GET"])
+@cached_response("private, no-cache")
 def get_volunteers():
     try:
         volunteer_instance = volunteer_model(current_app.mongo)
@@ -75,6 +81,66 @@ def get_volunteers():
     
     return jsonify(volunteers)
 
+@volunteer_routes.route("/list", methods=["GET"])
+@cached_response("private, no-cache")
+def list_volunteers():
+    """
+    Paginated, filtered volunteer listing.
+    Query params: limit (default 50, max 200), cursor (from next_cursor), zipcode, role,
+    verified (true/false), day (weekday name or 0-6 with 0=Sunday), fields (comma separated)
+    Returns: { volunteers: [...], next_cursor: str or null }
+    """
+    try:
+        args = request.args
+        limit = min(max(int(args.get("limit", 50)), 1), 200)
+        cursor = args.get("cursor")
+        after_id = ObjectId(cursor) if cursor else None
+
+        verified = args.get("verified")
+        if verified is not None:
+            verified = verified.lower() in ("true", "1", "yes")
+
+        day = args.get("day")
+        if day is not None:
+            day = int(day) if day.isdigit() else DAY_ALIASES.get(day.lower())
+            if day is None or not 0 <= day <= 6:
+                return jsonify({"message": "Invalid 'day' parameter"}), 400
+
+        fields = None
+        if args.get("fields"):
+            fields = [f.strip() for f in args["fields"].split(",") if f.strip()]
+            unknown = [f for f in fields if f not in ALLOWED_LIST_FIELDS]
+            if unknown:
+                return jsonify({"message": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+        volunteer_instance = volunteer_model(current_app.mongo)
+        volunteers, next_cursor = volunteer_instance.list_volunteers(
+            limit=limit,
+            after_id=after_id,
+            zipcode=args.get("zipcode"),
+            role=args.get("role"),
+            verified=verified,
+            day=day,
+            fields=fields,
+        )
+
+    except Exception as e:
+        return jsonify({"message": "Error listing volunteers", "error": str(e)}), 400
+
+    return jsonify({"volunteers": volunteers, "next_cursor": next_cursor}), 200
+
+@volunteer_routes.route("/reindex", methods=["POST"])
+@admin_token_required
+def reindex_volunteers():
+    """Backfill the derived filter fields on volunteers created before they existed"""
+    try:
+        volunteer_instance = volunteer_model(current_app.mongo)
+        updated = volunteer_instance.backfill_search_fields()
+    except Exception as e:
+        return jsonify({"message": "Error reindexing volunteers", "error": str(e)}), 400
+
+    return jsonify({"updated": updated}), 200
+
 @volunteer_routes.route("/delete/<string:volunteer_id>", methods=["DELETE"])
 def delete_volunteer(volunteer_id):
     try:
@@ -105,4 +171,86 @@ def check_volunteer_exists(username):
             }), 200
 
     except Exception as e:
-        return jsonify({"message": "Error checking volunteer", "error": str(e)}), 400
\ No newline at end of file
+        return jsonify({"message": "Error checking volunteer", "error": str(e)}), 400
+
+@volunteer_routes.route("/hours/<string:username>", methods=["GET"])
+@admin_token_required
+@cached_response("private, no-cache")
+def get_volunteer_hours(username):
+    """
+    Archived volunteer hours, read from the monthly rollup.
+    Query: year=YYYY, or from_month/to_month=YYYY-MM (defaults to the current year)
+    """
+    try:
+        year = request.args.get("year") or datetime.utcnow().strftime("%Y")
+        from_month = request.args.get("from_month") or f"{int(year):04d}-01"
+        to_month = request.args.get("to_month") or f"{int(year):04d}-12"
+        for month in (from_month, to_month):
+            datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        return jsonify({"message": "year must be YYYY and from_month/to_month YYYY-MM"}), 400
+
+    try:
+        rows = ScheduleArchiveModel(current_app.mongo).get_volunteer_hours(username, from_month, to_month)
+    except Exception as e:
+        return jsonify({"message": "Error getting volunteer hours", "error": str(e)}), 400
+
+    by_pantry = {}
+    for row in rows:
+        pantry = by_pantry.setdefault(str(row["pantry_id"]), {"pantry_id": row["pantry_id"], "hours": 0.0, "shifts": 0, "general_days": 0})
+        for field in ("hours", "shifts", "general_days"):
+            pantry[field] += row.get(field, 0)
+    return jsonify({
+        "username": username,
+        "from_month": from_month,
+        "to_month": to_month,
+        "hours": round(sum(row.get("hours", 0) for row in rows), 2),
+        "shifts": sum(row.get("shifts", 0) for row in rows),
+        "general_days": sum(row.get("general_days", 0) for row in rows),
+        "by_pantry": list(by_pantry.values()),
+        "by_month": rows,
+    }), 200
+
+@volunteer_routes.route("/import", methods=["POST"])
+@admin_token_required
+def import_volunteers_route():
+    """
+    Bulk import volunteers from a CSV or NDJSON request body.
+    The body is parsed as it streams in; format comes from ?format=csv|ndjson or the Content-Type.
+    Returns: { inserted, duplicates, failed, errors: [{row, error}], errors_truncated }
+    """
+    try:
+        fmt = request.args.get("format")
+        if not fmt:
+            fmt = "csv" if request.mimetype == "text/csv" else "ndjson"
+        if fmt not in ("csv", "ndjson"):
+            return jsonify({"message": "format must be 'csv' or 'ndjson'"}), 400
+        batch_size = min(max(int(request.args.get("batch_size", 500)), 1), 5000)
+
+        volunteer_instance = volunteer_model(current_app.mongo)
+        report = import_volunteers(volunteer_instance, iter_records(request.stream, fmt), batch_size)
+
+    except Exception as e:
+        return jsonify({"message": "Error importing volunteers", "error": str(e)}), 400
+
+    return jsonify(report), 200
+
+@volunteer_routes.route("/export", methods=["GET"])
+@admin_token_required
+def export_volunteers():
+    """Stream every volunteer as CSV or NDJSON (?format=csv|ndjson, default csv) without loading them all"""
+    fmt = request.args.get("format", "csv")
+    if fmt not in ("csv", "ndjson"):
+        return jsonify({"message": "format must be 'csv' or 'ndjson'"}), 400
+
+    cursor = volunteer_model(current_app.mongo).export_cursor()
+    if fmt == "csv":
+        rows = iter_csv_export(cursor)
+        mimetype = "text/csv"
+    else:
+        rows = iter_ndjson_export(cursor, current_app.json.dumps)
+        mimetype = "application/x-ndjson"
+
+    response = Response(stream_with_context(rows), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=volunteers.{fmt}"
+    return response
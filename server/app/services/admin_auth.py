@@ -0,0 +1,31 @@
+"""
+Shared admin token check for operational endpoints (profiling, diagnostics).
+The token is read from the ADMIN_TOKEN environment variable; when it is unset
+every admin endpoint is disabled.
+"""
+
+import hmac
+import os
+from functools import wraps
+
+from flask import jsonify, request
+
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token):
+    """Return True if token matches the configured admin token."""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected or not token:
+        return False
+    return hmac.compare_digest(str(token), expected)
+
+
+def admin_token_required(fn):
+    """Decorator rejecting requests that do not carry the admin token header."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_admin_token(request.headers.get(ADMIN_TOKEN_HEADER)):
+            return jsonify({"message": "Admin token required"}), 403
+        return fn(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,108 @@
+"""
+In-memory cache of verified JWT claims.
+Protected endpoints use cached_jwt_required so that a token which has already
+been verified is not decoded again, and no database lookup is needed to know
+who the caller is (the identity and user id live in the token claims).
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, jsonify, request
+from flask_jwt_extended import decode_token
+
+
+class VerifiedClaimsCache:
+    """Bounded LRU cache mapping raw token strings to their decoded claims."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        """Return cached claims for token, or None if missing or expired."""
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            if claims.get("exp", 0) <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def put(self, token, claims):
+        """Store verified claims for token, evicting the oldest entry when full."""
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Singleton instance
+_claims_cache = None
+
+
+def get_claims_cache():
+    """Get the singleton verified-claims cache."""
+    global _claims_cache
+    if _claims_cache is None:
+        _claims_cache = VerifiedClaimsCache()
+    return _claims_cache
+
+
+def _get_bearer_token():
+    header = request.headers.get("Authorization", "")
+    parts = header.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    return parts[1]
+
+
+def cached_jwt_required(refresh=False):
+    """
+    Decorator that verifies the Bearer token once and caches the claims.
+
+    Args:
+        refresh: Require a refresh token instead of an access token
+
+    The verified claims are available to the view as get_current_claims().
+    """
+    expected_type = "refresh" if refresh else "access"
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = _get_bearer_token()
+            if not token:
+                return jsonify({"error": "Missing Authorization Bearer token"}), 401
+
+            cache = get_claims_cache()
+            claims = cache.get(token)
+            if claims is None:
+                try:
+                    claims = decode_token(token)
+                except Exception as e:
+                    return jsonify({"error": f"Invalid token: {e}"}), 401
+                cache.put(token, claims)
+
+            if claims.get("type") != expected_type:
+                return jsonify({"error": f"Only {expected_type} tokens are allowed"}), 401
+
+            g.jwt_cached_claims = claims
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_current_claims():
+    """Return the claims verified by cached_jwt_required for this request."""
+    return g.get("jwt_cached_claims", {})
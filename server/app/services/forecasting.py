@@ -0,0 +1,180 @@
+"""
+Stock depletion forecasting.
+
+A pantry's recent inventory events are loaded into padded NumPy arrays (one
+row per item) and every item is estimated in one vectorized pass:
+
+- a least-squares line through the quantities since the item's last restock
+- an exponentially time-weighted average of the consumption rate between
+  decreasing readings (recent intervals weigh more, with time constant
+  FORECAST_SMOOTHING_DAYS)
+
+The smoothed rate is preferred and the linear fit is the fallback. Results are
+cached per pantry until its inventory_revision changes (any inventory write).
+Writers bump the revision after recording their event, so a forecast cached
+under a revision always includes the events that led to it.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from app.models.inventory_event import InventoryEventModel
+from app.models.inventory_forecast import InventoryForecastModel
+from app.models.pantry import pantry_model
+
+SECONDS_PER_DAY = 24 * 60 * 60
+# Shortest interval used for a rate so readings seconds apart do not explode it
+MIN_INTERVAL_DAYS = 1 / 24
+
+
+def history_days():
+    return float(os.getenv("FORECAST_HISTORY_DAYS", "60"))
+
+
+def smoothing_days():
+    return float(os.getenv("FORECAST_SMOOTHING_DAYS", "7"))
+
+
+def pad_series(series_by_item, items):
+    """
+    Pack ragged per-item series into (len(items), longest) arrays.
+
+    Returns:
+        tuple: (times, values, mask) where times are days relative to the newest reading
+    """
+    longest = max((len(series_by_item.get(item, ())) for item in items), default=0)
+    shape = (len(items), max(longest, 1))
+    times = np.zeros(shape)
+    values = np.zeros(shape)
+    mask = np.zeros(shape, dtype=bool)
+    for row, item in enumerate(items):
+        points = series_by_item.get(item, ())
+        if points:
+            times[row, :len(points)] = [t for t, _ in points]
+            values[row, :len(points)] = [v for _, v in points]
+            mask[row, :len(points)] = True
+    return times, values, mask
+
+
+def estimate_rates(times, values, mask, tau_days):
+    """
+    Consumption rates (units/day) for every row at once.
+
+    Returns:
+        tuple: (smoothed_rate, linear_rate, points_in_fit) arrays; rates are nan when unknown
+    """
+    columns = np.arange(times.shape[1])
+    pair = mask[:, 1:] & mask[:, :-1]
+    d_values = np.diff(values, axis=1)
+    d_times = np.maximum(np.diff(times, axis=1), MIN_INTERVAL_DAYS)
+
+    # Exponentially weighted mean of the rates over consuming intervals
+    consuming = pair & (d_values < 0)
+    rates = np.where(consuming, -d_values / d_times, 0.0)
+    weights = np.where(consuming, np.exp(np.minimum(times[:, 1:], 0) / tau_days), 0.0)
+    weight_sums = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        smoothed = np.where(weight_sums > 0, (weights * rates).sum(axis=1) / weight_sums, np.nan)
+
+    # Least-squares line through the readings since the last restock
+    restocked = pair & (d_values > 0)
+    last_restock = np.where(restocked, columns[1:], 0).max(axis=1, initial=0)
+    fit = mask & (columns >= last_restock[:, None])
+    n = fit.sum(axis=1)
+    x = np.where(fit, times, 0.0)
+    y = np.where(fit, values, 0.0)
+    sx, sy = x.sum(axis=1), y.sum(axis=1)
+    sxx, sxy = (x * x).sum(axis=1), (x * y).sum(axis=1)
+    denominator = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where((n >= 2) & (denominator > 1e-12), (n * sxy - sx * sy) / denominator, np.nan)
+    linear = np.where(slope < 0, -slope, np.where(np.isnan(slope), np.nan, 0.0))
+    return smoothed, linear, n
+
+
+def _number(value):
+    return None if value is None or not np.isfinite(value) else round(float(value), 3)
+
+
+def compute_forecast(stock, events, now=None, tau_days=None):
+    """
+    Forecast depletion for every stock item.
+
+    Args:
+        stock: The pantry's stock array (authoritative current/full)
+        events: (at, item, current) tuples from InventoryEventModel.series
+
+    Returns:
+        dict: {"computed_at": datetime, "items": [{name, current, full, rate_per_day, smoothed_rate,
+               linear_rate, method, points, depletion_at}, ...]}
+    """
+    now = now or datetime.utcnow()
+    tau_days = tau_days or smoothing_days()
+    items = [item.get("name") for item in stock]
+    wanted = set(items)
+
+    series_by_item = {}
+    for at, item, current in events:
+        if item in wanted and isinstance(current, (int, float)):
+            series_by_item.setdefault(item, []).append(((at - now).total_seconds() / SECONDS_PER_DAY, float(current)))
+
+    times, values, mask = pad_series(series_by_item, items)
+    smoothed, linear, points = estimate_rates(times, values, mask, tau_days)
+    rate = np.where(np.isfinite(smoothed), smoothed, linear)
+
+    results = []
+    for row, item in enumerate(stock):
+        current = item.get("current")
+        rate_per_day = rate[row]
+        depletion_at = None
+        if isinstance(current, (int, float)) and np.isfinite(rate_per_day) and rate_per_day > 0:
+            # Count from the latest reading; the stock has not changed since then
+            last_reading = times[row][mask[row]].max() if mask[row].any() else 0.0
+            depletion_at = now + timedelta(days=float(last_reading + max(current, 0) / rate_per_day))
+        results.append({
+            "name": item.get("name"),
+            "current": current,
+            "full": item.get("full"),
+            "rate_per_day": _number(rate_per_day),
+            "smoothed_rate": _number(smoothed[row]),
+            "linear_rate": _number(linear[row]),
+            "method": "smoothed" if np.isfinite(smoothed[row]) else ("linear" if np.isfinite(linear[row]) else None),
+            "points": int(points[row]),
+            "depletion_at": depletion_at,
+        })
+    return {"computed_at": now, "items": results}
+
+
+def with_days_until_empty(forecast, now=None):
+    """Add days_until_empty (from depletion_at) to each item, as of now."""
+    now = now or datetime.utcnow()
+    for item in forecast["items"]:
+        depletion_at = item.get("depletion_at")
+        item["days_until_empty"] = (
+            None if depletion_at is None else round(max((depletion_at - now).total_seconds(), 0) / SECONDS_PER_DAY, 1)
+        )
+    return forecast
+
+
+def get_pantry_forecast(mongo, pantry_id):
+    """
+    Cached depletion forecast for a pantry, recomputed only after an inventory write.
+
+    Returns:
+        dict or None: Forecast with days_until_empty per item, or None if the pantry does not exist
+    """
+    stock, revision = pantry_model(mongo).get_inventory_and_revision(pantry_id)
+    if stock is None:
+        return None
+
+    cache = InventoryForecastModel(mongo)
+    forecast = cache.get(pantry_id, revision)
+    if forecast is None:
+        since = datetime.utcnow() - timedelta(days=history_days())
+        events = InventoryEventModel(mongo).series(pantry_id, since)
+        forecast = compute_forecast(stock, events)
+        cache.save(pantry_id, revision, forecast)
+        forecast["revision"] = revision
+    return with_days_until_empty(forecast)
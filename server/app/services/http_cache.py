@@ -0,0 +1,115 @@
+"""
+HTTP caching and compression helpers for the large read endpoints.
+
+cached_response adds a strong content-hash ETag and a Cache-Control policy to a
+view, answering 304 Not Modified when the client already has the same body.
+init_compression registers an after_request hook that gzip/brotli-encodes
+responses above a size threshold when the client accepts it.
+"""
+
+import gzip
+import hashlib
+import os
+from functools import wraps
+
+from flask import make_response, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/html"}
+# Compressed variants get their own strong ETag by suffixing the encoding
+ENCODING_ETAG_SUFFIXES = ("-br", "-gzip")
+
+
+def compute_etag(body):
+    """Strong ETag value for a response body."""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _client_has_etag(etag):
+    if not request.if_none_match:
+        return False
+    if request.if_none_match.star_tag:
+        return True
+    return any(request.if_none_match.contains(etag + suffix) for suffix in ("",) + ENCODING_ETAG_SUFFIXES)
+
+
+def cached_response(cache_control):
+    """
+    Decorator adding ETag / Cache-Control / 304 handling to a GET view.
+
+    Args:
+        cache_control: Cache-Control header value, e.g. "public, no-cache" (revalidate with the ETag)
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+
+            etag = compute_etag(response.get_data())
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = cache_control
+
+            if _client_has_etag(etag):
+                response.status_code = 304
+                response.set_data(b"")
+                # A 304 carries no body, so drop the entity headers
+                response.headers.pop("Content-Type", None)
+                response.headers.pop("Content-Length", None)
+            return response
+        return wrapper
+    return decorator
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app):
+    """Register the response compression hook on the app."""
+    min_size = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+    gzip_level = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    brotli_quality = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    @app.after_request
+    def _compress_response(response):
+        if (
+            response.status_code < 200
+            or response.status_code >= 300
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        body = response.get_data()
+        if len(body) < min_size:
+            return response
+
+        encoding = _choose_encoding()
+        response.vary.add("Accept-Encoding")
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=gzip_level)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, is_weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=is_weak)
+        return response
@@ -0,0 +1,182 @@
+"""
+Low-stock alert consumer.
+
+Reads the inventory event stream in time order from a checkpoint, keeps a
+per-item state (latest quantities and an exponentially time-weighted
+consumption rate in units per day) and raises an alert when an item's
+current/full ratio drops below the threshold. An alert posts a message to the
+pantry's stream, which also notifies the pantry's subscribers; it re-arms once
+the item is restocked above threshold + margin, so one dip sends one alert.
+
+Event times are set by the API process that wrote them, so an event can land
+behind the checkpoint (a slow insert or a skewed clock). Each tick re-reads the
+last INVENTORY_ALERT_OVERLAP_SECONDS before the checkpoint and skips the events
+it already processed, whose ids are kept with the checkpoint.
+"""
+
+import math
+import os
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.models.inventory_event import InventoryEventModel
+from app.models.inventory_stats import InventoryStatsModel, item_key
+from app.models.pantry import pantry_model
+from app.services.notification_batching import queue_stream_notification
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def low_stock_ratio():
+    return float(os.getenv("INVENTORY_LOW_STOCK_RATIO", "0.2"))
+
+
+def rearm_margin():
+    return float(os.getenv("INVENTORY_ALERT_REARM_MARGIN", "0.1"))
+
+
+def rate_window_days():
+    return float(os.getenv("INVENTORY_RATE_WINDOW_DAYS", "7"))
+
+
+def overlap_seconds():
+    return float(os.getenv("INVENTORY_ALERT_OVERLAP_SECONDS", "300"))
+
+
+def stock_ratio(current, full):
+    if not isinstance(current, (int, float)) or not isinstance(full, (int, float)) or full <= 0:
+        return None
+    return current / full
+
+
+def apply_event(state, event, window_days):
+    """
+    Fold one event into an item state (mutated in place).
+    Decreases update the consumption rate with weight 1 - exp(-dt / window), so the
+    rate is a moving average over roughly the last window_days; restocks do not count.
+    An event older than the state (it reached the stream late) only contributes its
+    decrease to the rate; the quantities and last_at already reflect newer events.
+    """
+    at = event["at"]
+    previous_at = state.get("last_at")
+    delta = event.get("delta")
+    if previous_at is not None and delta is not None and delta < 0:
+        days = max(abs((at - previous_at).total_seconds()) / SECONDS_PER_DAY, 1 / 24)
+        sample = -delta / days
+        weight = 1 - math.exp(-days / window_days)
+        rate = state.get("consumption_rate")
+        state["consumption_rate"] = sample if rate is None else rate + weight * (sample - rate)
+    if previous_at is not None and at < previous_at:
+        return
+    state["current"] = event.get("current")
+    state["full"] = event.get("full")
+    state["ratio"] = stock_ratio(state["current"], state["full"])
+    state["last_at"] = at
+
+
+def days_until_empty(state):
+    rate = state.get("consumption_rate")
+    current = state.get("current")
+    if not rate or not isinstance(current, (int, float)):
+        return None
+    return round(current / rate, 1)
+
+
+def alert_message(state):
+    percent = round((state["ratio"] or 0) * 100)
+    message = f"Low stock: {state['item']} is at {state['current']}/{state['full']} ({percent}%)"
+    remaining = days_until_empty(state)
+    if remaining is not None:
+        message += f", about {remaining:g} days left at the current rate"
+    return message
+
+
+class LowStockConsumer:
+    """Consumes inventory events and raises low-stock alerts."""
+
+    def __init__(self, mongo, batch_size=5000, lag_seconds=2):
+        self.mongo = mongo
+        self.batch_size = batch_size
+        # Events newer than this are left for the next tick so concurrent writes are not skipped
+        self.lag = timedelta(seconds=lag_seconds)
+        # How far behind the checkpoint late events are still picked up
+        self.overlap = timedelta(seconds=overlap_seconds())
+        self.threshold = low_stock_ratio()
+        self.margin = rearm_margin()
+        self.window_days = rate_window_days()
+
+    def run_tick(self, now=None):
+        """
+        Process the events since the checkpoint.
+
+        Returns:
+            dict: {"events": int, "items": int, "alerts": int}
+        """
+        now = now or datetime.utcnow()
+        stats_model = InventoryStatsModel(self.mongo)
+        last_at, recent = stats_model.get_checkpoint()
+        seen = {entry["id"] for entry in recent}
+        after = last_at - self.overlap if last_at is not None else None
+        # Already-processed events in the overlap come back too; read past them
+        events = InventoryEventModel(self.mongo).read_after(after, now - self.lag, self.batch_size + len(seen))
+        events = [e for e in events if e["_id"] not in seen]
+        if not events:
+            return {"events": 0, "items": 0, "alerts": 0}
+
+        keys = {item_key(e["meta"]["pantry_id"], e["meta"]["item"]) for e in events}
+        states = stats_model.get_states(keys)
+        alerts = []
+        for event in events:
+            pantry_id, item = event["meta"]["pantry_id"], event["meta"]["item"]
+            key = item_key(pantry_id, item)
+            if event.get("kind") == "delete":
+                states.pop(key, None)
+                stats_model.delete_state(key)
+                continue
+            state = states.setdefault(key, {"pantry_id": pantry_id, "item": item, "alert_active": False})
+            apply_event(state, event, self.window_days)
+
+            ratio = state["ratio"]
+            if ratio is None:
+                continue
+            if not state.get("alert_active") and ratio <= self.threshold:
+                state["alert_active"] = True
+                state["last_alert_at"] = event["at"]
+                alerts.append(dict(state))
+            elif state.get("alert_active") and ratio > self.threshold + self.margin:
+                state["alert_active"] = False
+
+        stats_model.save_states(states)
+        last_at = max(events[-1]["at"], last_at) if last_at is not None else events[-1]["at"]
+        recent = [entry for entry in recent if entry["at"] > last_at - self.overlap]
+        recent += [{"id": e["_id"], "at": e["at"]} for e in events if e["at"] > last_at - self.overlap]
+        stats_model.set_checkpoint(last_at, recent)
+        for state in alerts:
+            self.send_alert(state)
+        return {"events": len(events), "items": len(states), "alerts": len(alerts)}
+
+    def send_alert(self, state):
+        """Post the alert to the pantry's stream and notify its subscribers."""
+        try:
+            pantry_id = ObjectId(state["pantry_id"])
+            pantries = pantry_model(self.mongo)
+            info = pantries.get_pantry_info(pantry_id) or {}
+            message = alert_message(state)
+            pantries.post_stream_message(pantry_id, message)
+            queue_stream_notification(self.mongo, state["pantry_id"], info.get("name", "Pantry"), message)
+        except Exception as e:
+            print(f"Error sending low-stock alert for {state.get('item')}: {e}")
+
+    def run_forever(self, interval_seconds=30):
+        """Run a tick every interval_seconds until interrupted."""
+        while True:
+            started = time.monotonic()
+            try:
+                stats = self.run_tick()
+                if stats["events"]:
+                    print(f"Inventory events: {stats['events']} processed, {stats['alerts']} low-stock alerts")
+            except Exception as e:
+                print(f"Error processing inventory events: {e}")
+            time.sleep(max(0, interval_seconds - (time.monotonic() - started)))
@@ -0,0 +1,89 @@
+"""
+JSON provider that understands MongoDB types.
+Responses are encoded with orjson when it is installed and with the standard
+library otherwise. ObjectId, datetime and the other BSON types are converted
+during encoding, so models can return documents straight from pymongo.
+"""
+
+import base64
+import json
+import uuid
+from datetime import date, datetime
+
+from bson import Binary, Decimal128, ObjectId, Regex, Timestamp
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def bson_default(obj):
+    """Convert BSON and other non-JSON types into JSON-friendly values."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, Decimal128):
+        return str(obj.to_decimal())
+    if isinstance(obj, Timestamp):
+        return obj.as_datetime().isoformat()
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, (Binary, bytes)):
+        return base64.b64encode(bytes(obj)).decode("ascii")
+    if isinstance(obj, Regex):
+        return obj.pattern
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (if available) with BSON-aware encoding."""
+
+    default = staticmethod(bson_default)
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj, indent=False):
+        """Encode obj to UTF-8 JSON bytes using the fastest available encoder."""
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=bson_default, option=self._orjson_options(indent))
+            except TypeError:
+                # e.g. integers wider than 64 bits; let the stdlib handle it
+                pass
+        separators = None if indent else (",", ":")
+        return json.dumps(
+            obj,
+            default=bson_default,
+            sort_keys=self.sort_keys,
+            ensure_ascii=self.ensure_ascii,
+            indent=2 if indent else None,
+            separators=separators,
+        ).encode("utf-8")
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode("utf-8")
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,178 @@
+"""
+Request latency and MongoDB command instrumentation.
+Route timings and Mongo command timings are aggregated into histograms that
+GET /metrics exposes in the Prometheus text format. Metrics are kept per
+process, so each gunicorn worker reports its own series.
+"""
+
+import threading
+import time
+
+from flask import g, request
+from pymongo import monitoring
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the returned/affected document count buckets
+DOCUMENT_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class Histogram:
+    """Cumulative histogram of observations, split by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._series[label_values] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    def _format_labels(self, label_values, extra=None):
+        pairs = list(zip(self.label_names, label_values))
+        if extra:
+            pairs.append(extra)
+        escaped = [(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs]
+        return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted(self._series.items())
+            for label_values, series in series_items:
+                cumulative = 0
+                for bound, count in zip(self.buckets, series["counts"]):
+                    cumulative += count
+                    labels = self._format_labels(label_values, ("le", bound))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = self._format_labels(label_values, ("le", "+Inf"))
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                labels = self._format_labels(label_values)
+                lines.append(f"{self.name}_sum{labels} {series['sum']}")
+                lines.append(f"{self.name}_count{labels} {series['count']}")
+        return "\n".join(lines)
+
+
+REQUEST_LATENCY = Histogram(
+    "pantrylink_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+MONGO_LATENCY = Histogram(
+    "pantrylink_mongo_command_duration_seconds",
+    "MongoDB command latency by command and collection",
+    ("command", "collection", "outcome"),
+    LATENCY_BUCKETS,
+)
+MONGO_DOCUMENTS = Histogram(
+    "pantrylink_mongo_command_documents",
+    "Documents returned or affected per MongoDB command",
+    ("command", "collection"),
+    DOCUMENT_BUCKETS,
+)
+
+ALL_METRICS = (REQUEST_LATENCY, MONGO_LATENCY, MONGO_DOCUMENTS)
+
+
+def render_metrics():
+    """Render every registered metric in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in ALL_METRICS) + "\n"
+
+
+def _count_documents(command_name, reply):
+    """Best-effort count of documents a command returned or affected."""
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        if batch is not None:
+            return len(batch)
+    if command_name == "count":
+        return reply.get("n", 0)
+    if "nModified" in reply:
+        return reply["nModified"]
+    if "n" in reply:
+        return reply["n"]
+    return 0
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo CommandListener that records timing and document counts per command."""
+
+    # Commands issued by the driver itself that would only add noise
+    IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions"}
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def _key(self, event):
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name in self.IGNORED_COMMANDS:
+            return
+        if event.command_name == "getMore":
+            collection = event.command.get("collection")
+        else:
+            collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def _pop_collection(self, event):
+        with self._lock:
+            return self._collections.pop(self._key(event), None)
+
+    def succeeded(self, event):
+        collection = self._pop_collection(event)
+        if collection is None:
+            return
+        duration = event.duration_micros / 1_000_000
+        MONGO_LATENCY.observe((event.command_name, collection, "success"), duration)
+        MONGO_DOCUMENTS.observe((event.command_name, collection), _count_documents(event.command_name, event.reply))
+
+    def failed(self, event):
+        collection = self._pop_collection(event)
+        if collection is None:
+            return
+        duration = event.duration_micros / 1_000_000
+        MONGO_LATENCY.observe((event.command_name, collection, "failure"), duration)
+
+
+# Singleton listener shared by every Mongo client in the process
+mongo_command_listener = MongoCommandMetrics()
+
+
+def init_metrics(app):
+    """Register the per-route timing hooks on the app."""
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started_at = time.perf_counter()
+
+    @app.after_request
+    def _record_request_latency(response):
+        started_at = g.pop("request_started_at", None)
+        if started_at is not None:
+            # Use the route pattern, not the raw path, to keep label cardinality bounded
+            route = request.url_rule.rule if request.url_rule else "<unmatched>"
+            REQUEST_LATENCY.observe(
+                (request.method, route, str(response.status_code)),
+                time.perf_counter() - started_at,
+            )
+        return response
@@ -0,0 +1,96 @@
+"""
+Coalesced stream notifications.
+Stream posts are queued into a per-pantry batch (NotificationBatchModel). The
+worker that opens a batch schedules a flush when the coalescing window closes,
+so a burst of posts becomes one push whose badge is each device's unread count.
+A timer dies with the process that started it, so overdue batches are swept
+again by the next stream post (from any worker) and by the shift reminder
+worker, which must run alongside the API for batches of quiet pantries.
+"""
+
+import os
+import threading
+
+from app.models.delivery_stats import DeliveryStatsModel
+from app.models.device_token import DeviceTokenModel
+from app.models.notification_batch import NotificationBatchModel
+from app.services.push_notifications import send_stream_notification
+
+
+def coalesce_window_seconds():
+    return float(os.getenv("NOTIFY_COALESCE_SECONDS", "30"))
+
+
+def send_batch(mongo, batch):
+    """Send one notification covering every message in a popped batch."""
+    messages = batch.get("messages", [])
+    if not messages:
+        return None
+
+    device_model = DeviceTokenModel(mongo)
+    badges = device_model.increment_unread_for_pantry(batch["pantry_id"], len(messages))
+    if not badges:
+        return None
+
+    results = send_stream_notification(
+        pantry_name=batch.get("pantry_name", "Pantry"),
+        message=messages[-1]["message"],
+        device_tokens=list(badges.keys()),
+        badges=badges,
+        message_count=len(messages),
+    )
+    print(f"Push notifications sent: {results['success_count']} success, {results['failure_count']} failed")
+    try:
+        DeliveryStatsModel(mongo).record_fanout(batch["pantry_id"], batch.get("_id"), "stream", results)
+    except Exception as e:
+        print(f"Error recording delivery stats: {e}")
+    return results
+
+
+def flush_pantry_batch(mongo, pantry_id):
+    """Send the pantry's batch if its window has closed."""
+    try:
+        batch = NotificationBatchModel(mongo).pop_batch(pantry_id)
+        if batch:
+            send_batch(mongo, batch)
+    except Exception as e:
+        print(f"Error sending push notifications: {e}")
+
+
+def flush_due_batches(mongo):
+    """Send every batch whose window has closed. Returns the number of batches sent."""
+    batches = NotificationBatchModel(mongo).pop_due_batches()
+    for batch in batches:
+        try:
+            send_batch(mongo, batch)
+        except Exception as e:
+            print(f"Error sending push notifications: {e}")
+    return len(batches)
+
+
+def _sweep_overdue_batches(mongo):
+    try:
+        flush_due_batches(mongo)
+    except Exception as e:
+        print(f"Error sweeping notification batches: {e}")
+
+
+def queue_stream_notification(mongo, pantry_id, pantry_name, message):
+    """
+    Queue a stream message for notification.
+    With a zero window the notification is sent immediately on the calling thread.
+    """
+    window = coalesce_window_seconds()
+    model = NotificationBatchModel(mongo)
+    opened, _ = model.add_message(pantry_id, pantry_name, message, window)
+    if window <= 0:
+        flush_pantry_batch(mongo, pantry_id)
+        return
+    if opened:
+        # Small margin so the flush never runs before the batch's flush_at
+        timer = threading.Timer(window + 0.5, flush_pantry_batch, args=(mongo, pantry_id))
+        timer.daemon = True
+        timer.start()
+    # Send batches whose timer was lost with an exited worker, off the request thread
+    sweeper = threading.Thread(target=_sweep_overdue_batches, args=(mongo,), daemon=True)
+    sweeper.start()
@@ -0,0 +1,122 @@
+"""
+Opt-in per-request profiling.
+A request is run under cProfile when it carries the admin token in the
+X-Profile header, or when it is picked by the PROFILING_SAMPLE_RATE random
+sample. The token is only read from the header; query strings end up in the
+access log. The top functions of each profiled request are kept in a bounded
+ring buffer that GET /profiling lists.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from collections import deque
+
+from flask import g, request
+
+from app.services.admin_auth import is_admin_token
+
+PROFILE_HEADER = "X-Profile"
+
+
+class ProfileStore:
+    """Thread-safe ring buffer holding the most recent request profiles."""
+
+    def __init__(self, max_entries=50):
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def list(self):
+        """Return stored profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Singleton store
+_profile_store = None
+
+
+def get_profile_store():
+    """Get the singleton profile ring buffer."""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore(int(os.getenv("PROFILING_BUFFER_SIZE", "50")))
+    return _profile_store
+
+
+def summarize_profile(profiler, top_n, sort_by="cumulative"):
+    """
+    Convert a finished profiler into a JSON-friendly list of the top functions.
+
+    Returns:
+        list: [{function, calls, total_time_ms, cumulative_time_ms}, ...]
+    """
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(sort_by)
+    rows = []
+    for func in stats.fcn_list[:top_n]:
+        primitive_calls, total_calls, total_time, cumulative_time, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": total_calls,
+            "total_time_ms": round(total_time * 1000, 3),
+            "cumulative_time_ms": round(cumulative_time * 1000, 3),
+        })
+    return rows
+
+
+def _should_profile():
+    token = request.headers.get(PROFILE_HEADER)
+    if token:
+        return is_admin_token(token)
+    sample_rate = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def init_profiling(app):
+    """Register the before/after request hooks that run opted-in requests under cProfile."""
+    top_n = int(os.getenv("PROFILING_TOP_N", "30"))
+
+    @app.before_request
+    def _start_profiler():
+        if not _should_profile():
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g.request_profiler = profiler
+        g.request_profile_started_at = time.perf_counter()
+
+    @app.after_request
+    def _stop_profiler(response):
+        profiler = g.pop("request_profiler", None)
+        if profiler is None:
+            return response
+        profiler.disable()
+        duration = time.perf_counter() - g.pop("request_profile_started_at")
+        get_profile_store().add({
+            "method": request.method,
+            "path": request.path,
+            "route": request.url_rule.rule if request.url_rule else None,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "profiled_at": time.time(),
+            "top_functions": summarize_profile(profiler, top_n),
+        })
+        return response
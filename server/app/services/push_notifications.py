@@ -8,6 +8,116 @@ import time
 import json
 import httpx
 import os
+import tempfile
+import threading
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# Tokens are valid for 1 hour; refresh at 50 minutes. APNs rejects refreshes more
+# often than every 20 minutes with TooManyProviderTokenUpdates.
+TOKEN_REFRESH_SECONDS = 50 * 60
+
+
+def failure_reason(error):
+    """
+    Short reason code for a send_notification error message, used to group failures.
+    APNs errors carry a JSON body with a "reason" (e.g. BadDeviceToken, Unregistered).
+    """
+    if not error:
+        return "Unknown"
+    if error.startswith("APNs error"):
+        status, _, body = error[len("APNs error "):].partition(": ")
+        try:
+            reason = json.loads(body).get("reason")
+        except (ValueError, AttributeError):
+            reason = None
+        return reason or f"HTTP{status}"
+    if error == "APNs credentials not configured":
+        return "NotConfigured"
+    return "SendError"
+
+
+class SharedTokenFile:
+    """
+    Provider token cache shared by every process on the host.
+    The token is stored in a small JSON file and regenerated under an exclusive
+    file lock, so a fleet of gunicorn workers produces one token per refresh period.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+    
+    def read(self, key_id, team_id):
+        """Return (token, issued_at) from the file if it belongs to these credentials."""
+        try:
+            with open(self.path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        if cached.get("key_id") != key_id or cached.get("team_id") != team_id:
+            return None, 0
+        return cached.get("token"), cached.get("issued_at", 0)
+    
+    def write(self, token, issued_at, key_id, team_id):
+        # Write to a temp file and rename so readers never see a partial file
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".apns-token-")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"token": token, "issued_at": issued_at, "key_id": key_id, "team_id": team_id}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+    
+    def locked(self):
+        """Context manager holding the cross-process refresh lock."""
+        return _FileLock(self.lock_path)
+
+
+class _FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self):
+        self._file = open(self.path, "a")
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+    
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+
+
+class RateLimiter:
+    """Thread-safe token bucket capping how many pushes per second this process sends."""
+    
+    def __init__(self, rate_per_second, burst=None):
+        self.rate = float(rate_per_second)
+        self.capacity = float(burst or rate_per_second)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a send is allowed."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
 
 
 class APNsService:
@@ -25,9 +135,19 @@ class APNsService:
         self.bundle_id = os.environ.get("APNS_BUNDLE_ID", "com.tcsm.pantrylink")
         self.use_sandbox = os.environ.get("APNS_USE_SANDBOX", "true").lower() == "true"
         
-        # Cache for the JWT token
+        # Cache for the JWT token and the parsed signing key
         self._token = None
         self._token_expires_at = 0
+        self._signing_key = None
+        self._rejected_token = None
+        self._token_lock = threading.Lock()
+        self._shared_tokens = SharedTokenFile(
+            os.environ.get("APNS_TOKEN_CACHE_PATH", os.path.join(tempfile.gettempdir(), "pantrylink-apns-token.json"))
+        )
+        
+        # Send-rate governor for this process (0 disables it); each gunicorn worker and
+        # background worker has its own bucket, so the fleet-wide cap is processes x this rate
+        self.rate_limiter = RateLimiter(float(os.environ.get("APNS_MAX_SENDS_PER_SECOND", "300")))
     
     def is_configured(self):
         """Check if APNs credentials are configured."""
@@ -35,25 +155,62 @@ class APNsService:
     
     def _get_token(self):
         """Generate or return cached JWT token for APNs authentication."""
-        current_time = time.time()
+        # Fast path without the lock while the in-memory token is fresh
+        token = self._token
+        if token is not None and time.time() < self._token_expires_at:
+            return token
         
-        # Refresh token if expired (tokens are valid for 1 hour, refresh at 50 mins)
-        if self._token is None or current_time >= self._token_expires_at:
-            self._token = self._generate_token()
-            self._token_expires_at = current_time + (50 * 60)  # 50 minutes
-        
-        return self._token
+        with self._token_lock:
+            # Another thread may have refreshed while we waited
+            if self._token is not None and time.time() < self._token_expires_at:
+                return self._token
+            
+            # Reuse a token another worker process already generated
+            token, issued_at = self._shared_tokens.read(self.key_id, self.team_id)
+            if self._needs_refresh(token, issued_at):
+                with self._shared_tokens.locked():
+                    token, issued_at = self._shared_tokens.read(self.key_id, self.team_id)
+                    if self._needs_refresh(token, issued_at):
+                        issued_at = int(time.time())
+                        token = self._generate_token(issued_at)
+                        try:
+                            self._shared_tokens.write(token, issued_at, self.key_id, self.team_id)
+                        except OSError as e:
+                            print(f"Could not share APNs token: {e}")
+            
+            self._token = token
+            self._token_expires_at = issued_at + TOKEN_REFRESH_SECONDS
+            return token
+    
+    def _needs_refresh(self, token, issued_at):
+        if token is None or token == self._rejected_token:
+            return True
+        return time.time() >= issued_at + TOKEN_REFRESH_SECONDS
+    
+    def _invalidate_token(self, token):
+        """Drop a token APNs reported as expired so the next send regenerates it."""
+        with self._token_lock:
+            # Remember it so a copy still in the shared file is not reused
+            self._rejected_token = token
+            if self._token == token:
+                self._token = None
+                self._token_expires_at = 0
+    
+    def _get_signing_key(self):
+        """Parse the PEM private key once and keep the key object."""
+        if self._signing_key is None:
+            # Handle private key - it may come with escaped newlines from env var
+            private_key = self.private_key
+            if "\\n" in private_key:
+                private_key = private_key.replace("\\n", "\n")
+            self._signing_key = load_pem_private_key(private_key.encode("utf-8"), password=None)
+        return self._signing_key
     
-    def _generate_token(self):
+    def _generate_token(self, issued_at=None):
         """Generate a new JWT token for APNs authentication."""
         if not self.is_configured():
             raise ValueError("APNs credentials not configured")
         
-        # Handle private key - it may come with escaped newlines from env var
-        private_key = self.private_key
-        if "\\n" in private_key:
-            private_key = private_key.replace("\\n", "\n")
-        
         headers = {
             "alg": "ES256",
             "kid": self.key_id,
@@ -61,13 +218,13 @@ class APNsService:
         
         payload = {
             "iss": self.team_id,
-            "iat": int(time.time()),
+            "iat": issued_at or int(time.time()),
         }
         
-        token = jwt.encode(payload, private_key, algorithm="ES256", headers=headers)
+        token = jwt.encode(payload, self._get_signing_key(), algorithm="ES256", headers=headers)
         return token
     
-    def send_notification(self, device_token, title, body, data=None):
+    def send_notification(self, device_token, title, body, data=None, badge=1):
         """
         Send a push notification to a single device.
         
@@ -76,6 +233,7 @@ class APNsService:
             title: Notification title
             body: Notification body text
             data: Optional custom data dictionary
+            badge: App icon badge count
             
         Returns:
             tuple: (success: bool, error_message: str or None)
@@ -93,7 +251,7 @@ class APNsService:
                         "body": body,
                     },
                     "sound": "default",
-                    "badge": 1,
+                    "badge": badge,
                 },
             }
             
@@ -106,13 +264,17 @@ class APNsService:
             url = f"{server}/3/device/{device_token}"
             
             # Set up headers
+            provider_token = self._get_token()
             headers = {
-                "authorization": f"bearer {self._get_token()}",
+                "authorization": f"bearer {provider_token}",
                 "apns-topic": self.bundle_id,
                 "apns-push-type": "alert",
                 "apns-priority": "10",
             }
             
+            # Stay within this process's send rate
+            self.rate_limiter.acquire()
+            
             # Send the request using HTTP/2
             with httpx.Client(http2=True) as client:
                 response = client.post(
@@ -126,6 +288,8 @@ class APNsService:
                 print(f"Push notification sent successfully to {device_token[:20]}...")
                 return True, None
             else:
+                if response.status_code == 403 and "ExpiredProviderToken" in response.text:
+                    self._invalidate_token(provider_token)
                 error_msg = f"APNs error {response.status_code}: {response.text}"
                 print(error_msg)
                 return False, error_msg
@@ -135,7 +299,7 @@ class APNsService:
             print(error_msg)
             return False, error_msg
     
-    def send_bulk_notifications(self, device_tokens, title, body, data=None):
+    def send_bulk_notifications(self, device_tokens, title, body, data=None, badges=None):
         """
         Send push notifications to multiple devices.
         
@@ -144,54 +308,69 @@ class APNsService:
             title: Notification title
             body: Notification body text
             data: Optional custom data dictionary
+            badges: Optional {device_token: badge count}; defaults to 1
             
         Returns:
-            dict: {"success_count": int, "failure_count": int, "failures": list}
+            dict: {"success_count": int, "failure_count": int, "failures": list,
+                   "reasons": {reason: count}, "duration_ms": float}
         """
         results = {
             "success_count": 0,
             "failure_count": 0,
             "failures": [],
+            "reasons": {},
+            "duration_ms": 0.0,
         }
         
         if not device_tokens:
             return results
         
+        started = time.perf_counter()
         for token in device_tokens:
-            success, error = self.send_notification(token, title, body, data)
+            badge = badges.get(token, 1) if badges else 1
+            success, error = self.send_notification(token, title, body, data, badge)
             if success:
                 results["success_count"] += 1
             else:
+                reason = failure_reason(error)
                 results["failure_count"] += 1
+                results["reasons"][reason] = results["reasons"].get(reason, 0) + 1
                 results["failures"].append({
                     "token": token[:20] + "..." if len(token) > 20 else token,
                     "error": error,
+                    "reason": reason,
                 })
         
+        results["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
         print(f"Bulk notification results: {results['success_count']} sent, {results['failure_count']} failed")
         return results
 
 
 # Singleton instance
 _apns_service = None
+_apns_service_lock = threading.Lock()
 
 
 def get_apns_service():
     """Get the singleton APNs service instance."""
     global _apns_service
     if _apns_service is None:
-        _apns_service = APNsService()
+        with _apns_service_lock:
+            if _apns_service is None:
+                _apns_service = APNsService()
     return _apns_service
 
 
-def send_stream_notification(pantry_name, message, device_tokens):
+def send_stream_notification(pantry_name, message, device_tokens, badges=None, message_count=1):
     """
     Convenience function to send a stream notification to all devices.
     
     Args:
         pantry_name: Name of the pantry making the announcement
-        message: The stream message content
+        message: The stream message content (the latest one when coalesced)
         device_tokens: List of device tokens to notify
+        badges: Optional {device_token: unread count} for the app icon badge
+        message_count: How many announcements this notification covers
         
     Returns:
         dict: Results of the bulk notification
@@ -199,7 +378,7 @@ def send_stream_notification(pantry_name, message, device_tokens):
     service = get_apns_service()
     
     title = f"{pantry_name}"
-    body = message
+    body = message if message_count <= 1 else f"{message_count} new announcements. Latest: {message}"
     
     # Truncate body if too long (APNs has payload size limits)
     if len(body) > 200:
@@ -208,6 +387,35 @@ def send_stream_notification(pantry_name, message, device_tokens):
     data = {
         "type": "stream_update",
         "pantry_name": pantry_name,
+        "message_count": message_count,
+    }
+    
+    return service.send_bulk_notifications(device_tokens, title, body, data, badges)
+
+
+def send_shift_reminder(pantry_name, shift_name, shift_time, date_key, device_tokens):
+    """
+    Send a reminder about an upcoming shift to one volunteer's devices.
+    
+    Args:
+        pantry_name: Name of the pantry the shift is at
+        shift_name: Name of the shift
+        shift_time: Display time of the shift (e.g. "8:00 AM - 11:00 AM")
+        date_key: Date of the shift (YYYY-MM-DD)
+        device_tokens: The volunteer's device tokens
+        
+    Returns:
+        dict: Results of the bulk notification
+    """
+    service = get_apns_service()
+    
+    title = f"Upcoming shift at {pantry_name}"
+    body = f"{shift_name} on {date_key}, {shift_time}".strip(", ")
+    
+    data = {
+        "type": "shift_reminder",
+        "pantry_name": pantry_name,
+        "date": date_key,
     }
     
     return service.send_bulk_notifications(device_tokens, title, body, data)
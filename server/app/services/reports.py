@@ -0,0 +1,258 @@
+"""
+Volunteer hours and pantry staffing reports.
+
+Reports cover any date range by running the same aggregation over the monthly
+schedule archive (past days) and the live pantry schedules (days not archived
+yet). The pipelines group shifts down to one row per (pantry, shift time) or
+(volunteer, pantry, shift time), so only a handful of rows come back to Python,
+where shift hours are derived from the display time. The volunteer report reads
+the months a range covers whole from the volunteer hours rollup and only
+unpacks archived days for the partial months at its edges. Every aggregation
+runs with maxTimeMS so a report either answers within the budget or fails fast.
+"""
+
+import calendar
+import os
+from datetime import datetime
+
+from app.models.schedule_archive import ScheduleArchiveModel
+from app.services.shift_times import shift_duration_hours
+
+# Longest range a single report may cover
+MAX_REPORT_DAYS = 731
+
+
+def report_max_time_ms():
+    return int(os.getenv("REPORT_MAX_TIME_MS", "5000"))
+
+
+def parse_report_range(from_date, to_date):
+    """Validate a YYYY-MM-DD range. Returns (from_date, to_date, error)."""
+    try:
+        start = datetime.strptime(from_date or "", "%Y-%m-%d")
+        end = datetime.strptime(to_date or "", "%Y-%m-%d")
+    except ValueError:
+        return None, None, "from and to must be YYYY-MM-DD dates"
+    if end < start:
+        return None, None, "to must not be before from"
+    if (end - start).days + 1 > MAX_REPORT_DAYS:
+        return None, None, f"Reports cover at most {MAX_REPORT_DAYS} days"
+    return from_date, to_date, None
+
+
+def split_months(from_date, to_date):
+    """Months of a YYYY-MM-DD range as (months covered whole, partial months at the edges)."""
+    whole, partial = [], []
+    month = from_date[:7]
+    while month <= to_date[:7]:
+        year, number = int(month[:4]), int(month[5:])
+        last_day = calendar.monthrange(year, number)[1]
+        if from_date <= f"{month}-01" and f"{month}-{last_day:02d}" <= to_date:
+            whole.append(month)
+        else:
+            partial.append(month)
+        month = f"{year + number // 12:04d}-{number % 12 + 1:02d}"
+    return whole, partial
+
+
+def _days_stages(days_field, pantry_field, from_date, to_date, match):
+    """Stages turning schedule maps into one document per day in range: {pantry_id, day: {k, v}}."""
+    return [
+        {"$match": match},
+        {"$project": {
+            "_id": 0,
+            "pantry_id": f"${pantry_field}",
+            "day": {"$filter": {
+                "input": {"$objectToArray": {"$ifNull": [f"${days_field}", {}]}},
+                "as": "d",
+                "cond": {"$and": [{"$gte": ["$$d.k", from_date]}, {"$lte": ["$$d.k", to_date]}]},
+            }},
+        }},
+        {"$unwind": "$day"},
+    ]
+
+
+# Live days keep volunteer objects, archived days keep usernames; $ifNull reads both
+_USERNAME = {"$toLower": {"$ifNull": ["$volunteer.username", "$volunteer"]}}
+
+
+def _pantry_facets():
+    volunteers = {"$size": {"$ifNull": ["$shift.volunteers", []]}}
+    capacity = "$shift.capacity"
+    return {"$facet": {
+        "shifts": [
+            {"$unwind": "$day.v.shifts"},
+            {"$project": {"pantry_id": 1, "shift": "$day.v.shifts"}},
+            {"$group": {
+                "_id": {"pantry_id": "$pantry_id", "time": "$shift.time"},
+                "shifts": {"$sum": 1},
+                "staffed_shifts": {"$sum": {"$cond": [{"$gt": [volunteers, 0]}, 1, 0]}},
+                "volunteer_slots": {"$sum": volunteers},
+                "capacity_slots": {"$sum": {"$cond": [{"$isNumber": capacity}, capacity, 0]}},
+                "filled_capacity_slots": {"$sum": {"$cond": [{"$isNumber": capacity}, {"$min": [volunteers, capacity]}, 0]}},
+            }},
+        ],
+        "days": [
+            {"$group": {
+                "_id": "$pantry_id",
+                "days": {"$sum": 1},
+                "general_volunteers": {"$sum": {"$size": {"$ifNull": ["$day.v.general_volunteers", {"$ifNull": ["$day.v.general", []]}]}}},
+            }},
+        ],
+    }}
+
+
+def _volunteer_facets(username=None):
+    match_username = [{"$match": {"username": username.lower()}}] if username else []
+    return {"$facet": {
+        "shifts": [
+            {"$unwind": "$day.v.shifts"},
+            {"$unwind": "$day.v.shifts.volunteers"},
+            {"$project": {"pantry_id": 1, "time": "$day.v.shifts.time", "volunteer": "$day.v.shifts.volunteers"}},
+            {"$project": {"pantry_id": 1, "time": 1, "username": _USERNAME}},
+            {"$match": {"username": {"$ne": ""}}},
+            *match_username,
+            {"$group": {"_id": {"username": "$username", "pantry_id": "$pantry_id", "time": "$time"}, "shifts": {"$sum": 1}}},
+        ],
+        "general": [
+            {"$project": {"pantry_id": 1, "volunteer": {"$ifNull": ["$day.v.general_volunteers", {"$ifNull": ["$day.v.general", []]}]}}},
+            {"$unwind": "$volunteer"},
+            {"$project": {"pantry_id": 1, "username": _USERNAME}},
+            {"$match": {"username": {"$ne": ""}}},
+            *match_username,
+            {"$group": {"_id": {"username": "$username", "pantry_id": "$pantry_id"}, "days": {"$sum": 1}}},
+        ],
+    }}
+
+
+class StaffingReports:
+    """Runs the report pipelines against the archive and the live pantry documents."""
+
+    def __init__(self, mongo):
+        self.pantries = mongo.cx["test"]["pantries"]
+        self.rollup = ScheduleArchiveModel(mongo)
+        self.archive = self.rollup.archive
+        self.max_time_ms = report_max_time_ms()
+
+    def _run(self, facet, from_date, to_date, pantry_id=None, archive_months=None):
+        """
+        Run a facet over archived and live days; yields each facet result document.
+        archive_months limits the archive leg to those months (an empty list skips it).
+        """
+        if archive_months is None:
+            archive_match = {"month": {"$gte": from_date[:7], "$lte": to_date[:7]}}
+        else:
+            archive_match = {"month": {"$in": archive_months}}
+        live_match = {"schedules": {"$type": "object"}}
+        if pantry_id is not None:
+            archive_match["pantry_id"] = pantry_id
+            live_match["_id"] = pantry_id
+        sources = [(self.pantries, _days_stages("schedules", "_id", from_date, to_date, live_match))]
+        if archive_months is None or archive_months:
+            sources.insert(0, (self.archive, _days_stages("days", "pantry_id", from_date, to_date, archive_match)))
+        for collection, stages in sources:
+            for result in collection.aggregate(stages + [facet], maxTimeMS=self.max_time_ms):
+                yield result
+
+    def _pantry_names(self, pantry_ids):
+        return {
+            p["_id"]: p.get("name", "Unknown Pantry")
+            for p in self.pantries.find({"_id": {"$in": list(pantry_ids)}}, {"name": 1})
+        }
+
+    def pantry_staffing(self, from_date, to_date, pantry_id=None):
+        """
+        Per-pantry staffing over a date range.
+
+        Returns:
+            list: [{pantry_id, name, days, shifts, staffed_shifts, volunteer_slots, capacity_slots,
+                    filled_capacity_slots, fill_rate, volunteer_hours, general_volunteers}, ...]
+        """
+        rows = {}
+
+        def row(pid):
+            return rows.setdefault(pid, {
+                "pantry_id": pid, "days": 0, "shifts": 0, "staffed_shifts": 0, "volunteer_slots": 0,
+                "capacity_slots": 0, "filled_capacity_slots": 0, "volunteer_hours": 0.0, "general_volunteers": 0,
+            })
+
+        for result in self._run(_pantry_facets(), from_date, to_date, pantry_id):
+            for group in result["shifts"]:
+                entry = row(group["_id"]["pantry_id"])
+                for field in ("shifts", "staffed_shifts", "volunteer_slots", "capacity_slots", "filled_capacity_slots"):
+                    entry[field] += group[field]
+                entry["volunteer_hours"] += group["volunteer_slots"] * shift_duration_hours(group["_id"].get("time"))
+            for group in result["days"]:
+                entry = row(group["_id"])
+                entry["days"] += group["days"]
+                entry["general_volunteers"] += group["general_volunteers"]
+
+        names = self._pantry_names(rows)
+        for pid, entry in rows.items():
+            entry["name"] = names.get(pid, "Unknown Pantry")
+            entry["volunteer_hours"] = round(entry["volunteer_hours"], 2)
+            # Against capacity where shifts have one, otherwise the share of shifts with anyone signed up
+            if entry["capacity_slots"]:
+                entry["fill_rate"] = round(entry["filled_capacity_slots"] / entry["capacity_slots"], 4)
+            elif entry["shifts"]:
+                entry["fill_rate"] = round(entry["staffed_shifts"] / entry["shifts"], 4)
+            else:
+                entry["fill_rate"] = None
+        return sorted(rows.values(), key=lambda r: r["name"])
+
+    def volunteer_hours(self, from_date, to_date, pantry_id=None, username=None, limit=100):
+        """
+        Per-volunteer shifts and hours over a date range, most hours first.
+
+        Returns:
+            tuple: ([{username, shifts, hours, general_days, pantries, slot_share, by_pantry}, ...], total_volunteers)
+        """
+        rows = {}
+
+        def row(name):
+            return rows.setdefault(name, {"username": name, "shifts": 0, "hours": 0.0, "general_days": 0, "by_pantry": {}})
+
+        def pantry_row(entry, pid):
+            return entry["by_pantry"].setdefault(pid, {"pantry_id": pid, "shifts": 0, "hours": 0.0, "general_days": 0})
+
+        whole_months, partial_months = split_months(from_date, to_date)
+        if whole_months:
+            totals = self.rollup.sum_hours(
+                whole_months[0], whole_months[-1], pantry_id, username, self.max_time_ms
+            )
+            for group in totals:
+                key = group["_id"]
+                entry = row(key["username"])
+                per_pantry = pantry_row(entry, key["pantry_id"])
+                for field in ("shifts", "hours", "general_days"):
+                    entry[field] += group[field]
+                    per_pantry[field] += group[field]
+
+        facet = _volunteer_facets(username)
+        for result in self._run(facet, from_date, to_date, pantry_id, archive_months=partial_months):
+            for group in result["shifts"]:
+                key = group["_id"]
+                hours = group["shifts"] * shift_duration_hours(key.get("time"))
+                entry = row(key["username"])
+                entry["shifts"] += group["shifts"]
+                entry["hours"] += hours
+                per_pantry = pantry_row(entry, key["pantry_id"])
+                per_pantry["shifts"] += group["shifts"]
+                per_pantry["hours"] += hours
+            for group in result["general"]:
+                key = group["_id"]
+                entry = row(key["username"])
+                entry["general_days"] += group["days"]
+                pantry_row(entry, key["pantry_id"])["general_days"] += group["days"]
+
+        total_slots = sum(entry["shifts"] for entry in rows.values())
+        volunteers = sorted(rows.values(), key=lambda r: (-r["hours"], -r["shifts"], r["username"]))
+        for entry in volunteers:
+            entry["hours"] = round(entry["hours"], 2)
+            # Share of all filled shift slots in the report taken by this volunteer
+            entry["slot_share"] = round(entry["shifts"] / total_slots, 4) if total_slots else None
+            entry["pantries"] = len(entry["by_pantry"])
+            entry["by_pantry"] = [
+                dict(p, hours=round(p["hours"], 2)) for p in entry["by_pantry"].values()
+            ]
+        return volunteers[:limit], len(volunteers)
@@ -0,0 +1,114 @@
+"""
+Schedule history archiving.
+
+Days before today are copied into the monthly schedule archive in a compact
+form (shift name, time, hours and volunteer usernames), the per-volunteer hours
+rollup of every touched month is rebuilt from the archive, and only then are the
+days removed from the pantry document. A day is only removed if it has not been
+edited since it was read; an edited day stays and its new content is archived
+on the next run. Each step is idempotent, so a pantry that fails halfway is
+simply archived again on the next run. This runs from the horizon worker rather
+than on the request path.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from app.models.pantry import pantry_model
+from app.models.schedule_archive import ScheduleArchiveModel
+from app.services.shift_times import shift_duration_hours
+
+def compact_day(day_schedule):
+    """Archive form of a day: shifts with hours and usernames, and general volunteers."""
+    if isinstance(day_schedule, list):
+        day_schedule = {"shifts": day_schedule, "general_volunteers": []}
+    if not isinstance(day_schedule, dict):
+        return None
+    shifts = []
+    for shift in day_schedule.get("shifts", []):
+        compact = {
+            "id": shift.get("id"),
+            "shift": shift.get("shift", ""),
+            "time": shift.get("time", ""),
+            "hours": shift_duration_hours(shift.get("time")),
+            "volunteers": [v.get("username", "") for v in shift.get("volunteers", []) if v.get("username")],
+        }
+        if shift.get("capacity") is not None:
+            compact["capacity"] = shift["capacity"]
+        shifts.append(compact)
+    general = [v.get("username", "") for v in day_schedule.get("general_volunteers", []) if v.get("username")]
+    return {"shifts": shifts, "general": general}
+
+
+def volunteer_totals(month_doc):
+    """{username: {"hours", "shifts", "general_days"}} over every archived day of a month document."""
+    totals = {}
+    for day in (month_doc.get("days") or {}).values():
+        for shift in day.get("shifts", []):
+            for username in shift.get("volunteers", []):
+                entry = totals.setdefault(username.lower(), {"hours": 0.0, "shifts": 0, "general_days": 0})
+                entry["hours"] += shift.get("hours", 0.0)
+                entry["shifts"] += 1
+        for username in day.get("general", []):
+            entry = totals.setdefault(username.lower(), {"hours": 0.0, "shifts": 0, "general_days": 0})
+            entry["general_days"] += 1
+    for entry in totals.values():
+        entry["hours"] = round(entry["hours"], 2)
+    return totals
+
+
+class ScheduleArchiver:
+    """Moves past schedule days of every pantry into the archive."""
+
+    def __init__(self, mongo, workers=8):
+        self.mongo = mongo
+        self.workers = max(1, workers)
+
+    def archive_pantry(self, pantry_id, today_key):
+        """
+        Archive one pantry's days before today_key.
+        Returns the number of days removed from the pantry; days edited meanwhile are retried next run.
+        """
+        pantries = pantry_model(self.mongo)
+        past = pantries.get_past_schedules(pantry_id, today_key)
+        if not past:
+            return 0
+
+        days_by_month = {}
+        for date_key, day_schedule in past.items():
+            compact = compact_day(day_schedule)
+            if compact is not None:
+                days_by_month.setdefault(date_key[:7], {})[date_key] = compact
+
+        archive = ScheduleArchiveModel(self.mongo)
+        archive.archive_days(pantry_id, days_by_month)
+        for month, month_doc in archive.get_months(pantry_id, days_by_month).items():
+            archive.replace_month_hours(pantry_id, month, volunteer_totals(month_doc))
+
+        return pantries.unset_schedules(pantry_id, past)
+
+    def run(self, today_key=None):
+        """
+        Archive past days for every pantry.
+
+        Returns:
+            dict: {"pantries": int, "archived_days": int, "failed": int}
+        """
+        today_key = today_key or datetime.utcnow().strftime("%Y-%m-%d")
+        pantry_ids = pantry_model(self.mongo).get_pantry_ids_with_schedules()
+        stats = {"pantries": len(pantry_ids), "archived_days": 0, "failed": 0}
+
+        def archive_safely(pantry_id):
+            try:
+                return self.archive_pantry(pantry_id, today_key)
+            except Exception as e:
+                print(f"Error archiving schedules for pantry {pantry_id}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for archived in pool.map(archive_safely, pantry_ids):
+                if archived is None:
+                    stats["failed"] += 1
+                else:
+                    stats["archived_days"] += archived
+        return stats
@@ -0,0 +1,111 @@
+"""
+Fleet-wide schedule horizon generation.
+
+Generates the next days of schedules for every pantry that uses templates, so
+volunteers browsing upcoming shifts see days nobody has opened yet. Pantries are
+read in _id order and processed in chunks on a bounded thread pool; each pantry
+costs one read of its existing days plus one bulk write. After each chunk the
+last pantry id is checkpointed, so an interrupted run resumes from there
+(generation is idempotent, so redoing part of a chunk is harmless).
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app.models.horizon_run import HorizonRunModel
+from app.models.pantry import pantry_model
+from app.services.schedule_rules import compile_plan
+
+
+class HorizonGenerator:
+    """Generates schedule horizons for all template-driven pantries."""
+
+    def __init__(self, mongo, days=60, workers=8, chunk_size=None, archiver=None):
+        self.mongo = mongo
+        # Optional ScheduleArchiver run before each generation in run_forever
+        self.archiver = archiver
+        self.days = days
+        self.workers = max(1, workers)
+        # A few pantries per worker per chunk keeps the pool busy between checkpoints
+        self.chunk_size = chunk_size or self.workers * 4
+
+    def date_range(self, today=None):
+        today = today or datetime.utcnow().date()
+        return today.isoformat(), (today + timedelta(days=self.days - 1)).isoformat()
+
+    def generate_pantry(self, pantry, from_date, to_date):
+        """Generate one pantry's missing days. Returns the number of days written."""
+        plan = compile_plan(pantry.get("schedule_settings", {}))
+        if not plan.enabled:
+            return 0
+        return pantry_model(self.mongo).generate_schedules(pantry["_id"], plan.expand(from_date, to_date))
+
+    def _generate_safely(self, pantry, from_date, to_date):
+        try:
+            return self.generate_pantry(pantry, from_date, to_date), None
+        except Exception as e:
+            return 0, f"{pantry['_id']}: {e}"
+
+    def run(self, today=None, run_id=None, restart=False):
+        """
+        Generate the horizon for every pantry, resuming from the run's checkpoint.
+
+        Returns:
+            dict: {"run_id", "from_date", "to_date", "pantries", "generated", "failed",
+                   "elapsed_seconds", "pantries_per_second", "days_per_second", "resumed"}
+        """
+        from_date, to_date = self.date_range(today)
+        run_id = run_id or f"horizon:{from_date}:{to_date}"
+        runs = HorizonRunModel(self.mongo)
+        run = runs.start(run_id, from_date, to_date, restart)
+        stats = {"run_id": run_id, "from_date": from_date, "to_date": to_date,
+                 "pantries": 0, "generated": 0, "failed": 0, "resumed": run["last_pantry_id"] is not None}
+        started = time.monotonic()
+
+        if run.get("completed_at") is None:
+            pantries = pantry_model(self.mongo).iter_auto_schedule_pantries(run["last_pantry_id"])
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                chunk = []
+                for pantry in pantries:
+                    chunk.append(pantry)
+                    if len(chunk) >= self.chunk_size:
+                        self._run_chunk(pool, runs, run_id, chunk, from_date, to_date, stats, started)
+                        chunk = []
+                if chunk:
+                    self._run_chunk(pool, runs, run_id, chunk, from_date, to_date, stats, started)
+            runs.complete(run_id)
+
+        elapsed = time.monotonic() - started
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["pantries_per_second"] = round(stats["pantries"] / elapsed, 1) if elapsed else None
+        stats["days_per_second"] = round(stats["generated"] / elapsed, 1) if elapsed else None
+        return stats
+
+    def _run_chunk(self, pool, runs, run_id, chunk, from_date, to_date, stats, started):
+        generated = failed = 0
+        for written, error in pool.map(lambda p: self._generate_safely(p, from_date, to_date), chunk):
+            generated += written
+            if error:
+                failed += 1
+                print(f"Error generating schedule horizon for pantry {error}")
+        runs.checkpoint(run_id, chunk[-1]["_id"], len(chunk), generated, failed)
+
+        stats["pantries"] += len(chunk)
+        stats["generated"] += generated
+        stats["failed"] += failed
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"Schedule horizon: {stats['pantries']} pantries, {stats['generated']} days generated "
+              f"({stats['pantries'] / elapsed:.1f} pantries/s)")
+
+    def run_forever(self, interval_seconds=3600):
+        """Run every interval_seconds; a run that already completed for today's range is skipped."""
+        while True:
+            started = time.monotonic()
+            try:
+                if self.archiver is not None:
+                    print(self.archiver.run())
+                print(self.run())
+            except Exception as e:
+                print(f"Error generating schedule horizon: {e}")
+            time.sleep(max(0, interval_seconds - (time.monotonic() - started)))
@@ -0,0 +1,270 @@
+"""
+Schedule template rule engine.
+
+A pantry's schedule_settings are compiled once into a SchedulePlan: a template
+per weekday (0=Sunday, the JS convention used by openDays), recurring rules
+(every Nth week, monthly by day or by nth weekday), and exclusions held as a set
+of dates, merged date intervals and holiday sets. Expanding a date range is a
+single pass over the days that walks the exclusion intervals alongside it.
+
+Settings understood (all optional except what the old format already had):
+
+    openDays:          [1, 2, 3, 4, 5]
+    defaultSchedule:   [{"id", "time", "shift", "capacity"?}, ...]
+    weekdayTemplates:  {"6": [shifts...]}            per-weekday override of defaultSchedule
+    rules:             [{"type": "everyNthWeek", "weekday": 6, "interval": 2, "startDate": "2026-01-03"},
+                        {"type": "monthly", "weekday": 3, "week": -1},     last Wednesday
+                        {"type": "monthly", "dayOfMonth": 15, "template": [shifts...]}]
+    excludedDates:     ["2026-12-24", ...]
+    excludedRanges:    [{"from": "2026-12-24", "to": "2027-01-02"}, ...]
+    holidays:          ["us-federal", "12-31"]       holiday set names or annual MM-DD dates
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
+
+DEFAULT_OPEN_DAYS = [1, 2, 3, 4, 5]
+RULE_TYPES = ("everyNthWeek", "monthly")
+
+
+def js_weekday_of(ordinal):
+    """JS weekday (0=Sunday) of a proleptic Gregorian ordinal; ordinal 1 is a Monday."""
+    return ordinal % 7
+
+
+def parse_date_key(date_key):
+    return datetime.strptime(date_key, "%Y-%m-%d").date()
+
+
+def nth_weekday(year, month, js_day, week):
+    """Date of the week-th js_day of a month (week -1 = last), or None if it does not exist."""
+    if week > 0:
+        first = date(year, month, 1)
+        offset = (js_day - js_weekday_of(first.toordinal())) % 7
+        day = first + timedelta(days=offset + 7 * (week - 1))
+        return day if day.month == month else None
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    last = next_month - timedelta(days=1)
+    return last - timedelta(days=(js_weekday_of(last.toordinal()) - js_day) % 7)
+
+
+def us_federal_holidays(year):
+    return {
+        date(year, 1, 1),
+        nth_weekday(year, 1, 1, 3),    # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 1, 3),    # Presidents' Day
+        nth_weekday(year, 5, 1, -1),   # Memorial Day
+        date(year, 6, 19),
+        date(year, 7, 4),
+        nth_weekday(year, 9, 1, 1),    # Labor Day
+        nth_weekday(year, 10, 1, 2),   # Columbus Day
+        date(year, 11, 11),
+        nth_weekday(year, 11, 4, 4),   # Thanksgiving
+        date(year, 12, 25),
+    }
+
+
+HOLIDAY_SETS = {
+    "us-federal": us_federal_holidays,
+}
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def build_schedule(template):
+    """A fresh day schedule from a shift template, with no volunteers."""
+    shifts = []
+    for i, shift in enumerate(template):
+        new_shift = {
+            "id": shift.get("id", i + 1),
+            "time": shift.get("time", ""),
+            "shift": shift.get("shift", ""),
+            "volunteers": [],
+        }
+        if shift.get("capacity") is not None:
+            new_shift["capacity"] = shift["capacity"]
+        shifts.append(new_shift)
+    return {"shifts": shifts, "general_volunteers": []}
+
+
+def validate_settings(settings):
+    """Return an error message for malformed rule settings, or None if they compile."""
+    if not isinstance(settings, dict):
+        return "settings must be an object"
+    try:
+        for day in settings.get("openDays", DEFAULT_OPEN_DAYS):
+            if day not in range(7):
+                return f"Invalid weekday in openDays: {day}"
+        for day, template in (settings.get("weekdayTemplates") or {}).items():
+            if int(day) not in range(7) or not isinstance(template, list):
+                return f"Invalid weekdayTemplates entry: {day}"
+        for rule in settings.get("rules") or []:
+            if rule.get("type") not in RULE_TYPES:
+                return f"Unknown rule type: {rule.get('type')}"
+            if rule["type"] == "everyNthWeek":
+                if rule.get("weekday") not in range(7) or int(rule.get("interval", 0)) < 1:
+                    return "everyNthWeek rules need a weekday (0-6) and an interval >= 1"
+                parse_date_key(rule["startDate"])
+            elif "dayOfMonth" in rule:
+                if int(rule["dayOfMonth"]) not in range(1, 32):
+                    return "dayOfMonth must be between 1 and 31"
+            elif rule.get("weekday") not in range(7) or rule.get("week") not in (1, 2, 3, 4, 5, -1):
+                return "monthly rules need dayOfMonth, or a weekday (0-6) and a week (1-5 or -1)"
+            if "template" in rule and not isinstance(rule["template"], list):
+                return "rule template must be a list of shifts"
+        for date_key in settings.get("excludedDates") or []:
+            parse_date_key(date_key)
+        for excluded in settings.get("excludedRanges") or []:
+            if parse_date_key(excluded["from"]) > parse_date_key(excluded["to"]):
+                return "excludedRanges entries need from <= to"
+        for holiday in settings.get("holidays") or []:
+            if holiday not in HOLIDAY_SETS:
+                datetime.strptime(f"2000-{holiday}", "%Y-%m-%d")
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        return f"Invalid schedule rules: {e}"
+    return None
+
+
+class SchedulePlan:
+    """Compiled form of a pantry's schedule settings."""
+
+    def __init__(self, settings):
+        settings = settings or {}
+        self.enabled = bool(settings.get("schedulingEnabled", True) and settings.get("useDefaultSchedule", False))
+
+        default_template = settings.get("defaultSchedule") or []
+        overrides = {int(day): template for day, template in (settings.get("weekdayTemplates") or {}).items()}
+        open_days = set(settings.get("openDays", DEFAULT_OPEN_DAYS))
+        # Template per JS weekday, None when the pantry is closed that day
+        self.weekday_templates = [
+            (overrides.get(day) or default_template) if day in open_days else None
+            for day in range(7)
+        ]
+
+        self.nth_week_rules = []
+        self.monthly_day_rules = {}
+        self.monthly_weekday_rules = []
+        for rule in settings.get("rules") or []:
+            if rule.get("type") not in RULE_TYPES:
+                continue
+            weekday = rule.get("weekday")
+            template = rule.get("template") or (overrides.get(weekday) if weekday is not None else None) or default_template
+            if rule["type"] == "everyNthWeek":
+                start = parse_date_key(rule["startDate"]).toordinal()
+                # Weeks are counted from the Sunday on or before startDate
+                week_origin = start - js_weekday_of(start)
+                self.nth_week_rules.append((weekday, int(rule["interval"]), start, week_origin, template))
+            elif "dayOfMonth" in rule:
+                self.monthly_day_rules[int(rule["dayOfMonth"])] = template
+            else:
+                self.monthly_weekday_rules.append((weekday, rule["week"], template))
+        self._needs_calendar = bool(self.monthly_day_rules or self.monthly_weekday_rules)
+
+        self.excluded = {parse_date_key(d).toordinal() for d in settings.get("excludedDates") or []}
+        self.excluded_intervals = _merge_intervals(
+            (parse_date_key(r["from"]).toordinal(), parse_date_key(r["to"]).toordinal())
+            for r in settings.get("excludedRanges") or []
+        )
+        self._interval_starts = [start for start, _ in self.excluded_intervals]
+        self.holiday_sets = [HOLIDAY_SETS[h] for h in settings.get("holidays") or [] if h in HOLIDAY_SETS]
+        self.annual_holidays = {
+            tuple(int(part) for part in h.split("-")) for h in settings.get("holidays") or [] if h not in HOLIDAY_SETS
+        }
+        self._holidays_by_year = {}
+        self._monthly_by_month = {}
+
+    def _holidays(self, year):
+        holidays = self._holidays_by_year.get(year)
+        if holidays is None:
+            holidays = set()
+            for holiday_set in self.holiday_sets:
+                holidays.update(d.toordinal() for d in holiday_set(year) if d)
+            for month, day in self.annual_holidays:
+                try:
+                    holidays.add(date(year, month, day).toordinal())
+                except ValueError:
+                    pass
+            self._holidays_by_year[year] = holidays
+        return holidays
+
+    def _monthly(self, year, month):
+        """{ordinal: template} for the monthly nth-weekday rules of one month."""
+        matches = self._monthly_by_month.get((year, month))
+        if matches is None:
+            matches = {}
+            for weekday, week, template in self.monthly_weekday_rules:
+                day = nth_weekday(year, month, weekday, week)
+                if day is not None:
+                    matches[day.toordinal()] = template
+            self._monthly_by_month[(year, month)] = matches
+        return matches
+
+    def _template(self, ordinal, day):
+        """Template for a day that is not excluded; rules take precedence over the weekly template."""
+        if self._needs_calendar:
+            template = self._monthly(day.year, day.month).get(ordinal) or self.monthly_day_rules.get(day.day)
+            if template is not None:
+                return template
+        weekday = js_weekday_of(ordinal)
+        for rule_weekday, interval, start, week_origin, template in self.nth_week_rules:
+            if weekday == rule_weekday and ordinal >= start and ((ordinal - week_origin) // 7) % interval == 0:
+                return template
+        return self.weekday_templates[weekday]
+
+    def _excluded(self, ordinal, day):
+        if ordinal in self.excluded:
+            return True
+        return bool(self.holiday_sets or self.annual_holidays) and ordinal in self._holidays(day.year)
+
+    def template_for(self, date_key):
+        """Shift template for one date, or None if no schedule should be generated."""
+        if not self.enabled:
+            return None
+        day = parse_date_key(date_key)
+        ordinal = day.toordinal()
+        i = bisect_right(self._interval_starts, ordinal) - 1
+        if i >= 0 and ordinal <= self.excluded_intervals[i][1]:
+            return None
+        if self._excluded(ordinal, day):
+            return None
+        return self._template(ordinal, day) or None
+
+    def expand(self, from_date, to_date):
+        """
+        Yield (date_key, template) for every day in the range that gets a schedule.
+        One pass over the days; exclusion intervals are walked with a moving pointer.
+        """
+        if not self.enabled:
+            return
+        start = parse_date_key(from_date).toordinal()
+        end = parse_date_key(to_date).toordinal()
+        intervals = self.excluded_intervals
+        i = max(bisect_right(self._interval_starts, start) - 1, 0)
+
+        ordinal = start
+        while ordinal <= end:
+            while i < len(intervals) and intervals[i][1] < ordinal:
+                i += 1
+            if i < len(intervals) and intervals[i][0] <= ordinal:
+                # Jump over the whole excluded interval
+                ordinal = intervals[i][1] + 1
+                continue
+            day = date.fromordinal(ordinal)
+            if not self._excluded(ordinal, day):
+                template = self._template(ordinal, day)
+                if template:
+                    yield day.isoformat(), template
+            ordinal += 1
+
+
+def compile_plan(settings):
+    """Compile schedule settings into a SchedulePlan."""
+    return SchedulePlan(settings)
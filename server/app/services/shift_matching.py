@@ -0,0 +1,171 @@
+"""
+Volunteer-to-shift matching engine.
+
+Volunteers are indexed once into bitsets (one Python int per weekday, bit i set
+when volunteer i is available) and every date in the range gets a bitset of
+volunteers already scheduled anywhere. Candidates for a shift are then
+available[weekday] & ~busy[date], computed in one pass over the range instead
+of one conflict check per volunteer.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+from app.models.volunteer import availability_mask, parse_availability_days, parse_roles
+
+# Score weights for ranking candidates
+ROLE_MATCH_SCORE = 3.0
+ZIPCODE_MATCH_SCORE = 2.0
+# Penalty per shift the volunteer is already assigned in the range, to spread work fairly
+ASSIGNMENT_PENALTY = 0.5
+
+ZIPCODE_PATTERN = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+
+def iter_bits(bitset):
+    """Yield the index of every set bit, lowest first."""
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+def date_range(from_date, to_date):
+    """Return YYYY-MM-DD keys from from_date to to_date inclusive."""
+    current = datetime.strptime(from_date, "%Y-%m-%d")
+    end = datetime.strptime(to_date, "%Y-%m-%d")
+    keys = []
+    while current <= end:
+        keys.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return keys
+
+
+def js_weekday(date_key):
+    """Weekday of a date key in the JS convention (0=Sunday)."""
+    return (datetime.strptime(date_key, "%Y-%m-%d").weekday() + 1) % 7
+
+
+class VolunteerIndex:
+    """Volunteers packed into per-weekday availability bitsets."""
+
+    def __init__(self, profiles):
+        self.profiles = profiles
+        self.usernames = [p["username"].lower() for p in profiles]
+        self.position = {username: i for i, username in enumerate(self.usernames)}
+        self.role_tags = []
+        self.by_weekday = [0] * 7
+
+        for i, profile in enumerate(profiles):
+            mask = profile.get("availability_mask")
+            if mask is None:
+                # Volunteer created before the mask was stored
+                mask = availability_mask(profile.get("availability_days") or parse_availability_days(profile.get("availability")))
+            for day in range(7):
+                if mask & (1 << day):
+                    self.by_weekday[day] |= 1 << i
+            self.role_tags.append(set(profile.get("role_tags") or parse_roles(profile.get("roles"))))
+
+    def bitset_for(self, usernames):
+        bitset = 0
+        for username in usernames:
+            i = self.position.get(username)
+            if i is not None:
+                bitset |= 1 << i
+        return bitset
+
+
+def _shift_words(shift):
+    return set(re.findall(r"[a-z]+", str(shift.get("shift", "")).lower()))
+
+
+def _shift_capacity(shift):
+    """Capacity as an int (schedule PUTs may store it as a string); None when missing or invalid."""
+    try:
+        return int(shift.get("capacity"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _pantry_zipcode(address):
+    match = ZIPCODE_PATTERN.search(address or "")
+    return match.group(1) if match else None
+
+
+def match_volunteers(profiles, schedules, scheduled_by_date, date_keys, pantry_address=None, limit=10):
+    """
+    Rank candidate volunteers for every open shift in the range.
+
+    Args:
+        profiles: Volunteer documents from volunteer_model.get_matching_profiles
+        schedules: {date_key: schedule} for the pantry being staffed
+        scheduled_by_date: {date_key: set of usernames scheduled at any pantry}
+        date_keys: Dates to consider
+        pantry_address: Used to prefer volunteers in the pantry's zipcode
+        limit: Candidates returned per shift
+
+    Returns:
+        list: [{date, shift_id, shift, time, assigned, capacity, candidates: [...]}, ...]
+    """
+    index = VolunteerIndex(profiles)
+    zipcode = _pantry_zipcode(pantry_address)
+    local_bitset = index.bitset_for(
+        p["username"].lower() for p in profiles if zipcode and str(p.get("zipcode", "")).strip() == zipcode
+    )
+
+    assignment_counts = [0] * len(profiles)
+    busy_by_date = {}
+    for date_key in date_keys:
+        busy = index.bitset_for(scheduled_by_date.get(date_key, ()))
+        busy_by_date[date_key] = busy
+        for i in iter_bits(busy):
+            assignment_counts[i] += 1
+
+    results = []
+    for date_key in date_keys:
+        day_schedule = schedules.get(date_key)
+        if not day_schedule:
+            continue
+        candidates_bitset = index.by_weekday[js_weekday(date_key)] & ~busy_by_date[date_key]
+
+        for shift in day_schedule.get("shifts", []):
+            assigned = len(shift.get("volunteers", []))
+            capacity = _shift_capacity(shift)
+            if capacity is not None and assigned >= capacity:
+                continue
+
+            words = _shift_words(shift)
+            ranked = []
+            for i in iter_bits(candidates_bitset):
+                reasons = []
+                score = 0.0
+                if index.role_tags[i] and any(words & set(tag.split()) for tag in index.role_tags[i]):
+                    score += ROLE_MATCH_SCORE
+                    reasons.append("role")
+                if local_bitset & (1 << i):
+                    score += ZIPCODE_MATCH_SCORE
+                    reasons.append("zipcode")
+                score -= ASSIGNMENT_PENALTY * assignment_counts[i]
+                ranked.append((score, index.usernames[i], i, reasons))
+
+            ranked.sort(key=lambda r: (-r[0], r[1]))
+            candidates = []
+            for score, _, i, reasons in ranked[:limit]:
+                profile = index.profiles[i]
+                candidates.append({
+                    "username": profile["username"],
+                    "name": f"{profile.get('first_name', '')} {profile.get('last_name', '')}".strip(),
+                    "score": score,
+                    "reasons": reasons,
+                })
+
+            results.append({
+                "date": date_key,
+                "shift_id": shift.get("id"),
+                "shift": shift.get("shift", ""),
+                "time": shift.get("time", ""),
+                "assigned": assigned,
+                "capacity": capacity,
+                "candidates": candidates,
+            })
+    return results
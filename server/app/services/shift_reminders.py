@@ -0,0 +1,122 @@
+"""
+Shift reminder scheduler.
+Each tick scans the schedules of every pantry for shifts starting inside the
+reminder window and sends one APNs reminder per assigned volunteer. A unique
+sent-marker per assignment (see ShiftReminderModel) keeps ticks idempotent, so
+overlapping ticks or several worker processes never send duplicates.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.models.delivery_stats import DeliveryStatsModel
+from app.models.device_token import DeviceTokenModel
+from app.models.pantry import pantry_model
+from app.models.shift_reminder import ShiftReminderModel
+from app.services.push_notifications import send_shift_reminder
+from app.services.notification_batching import flush_due_batches
+from app.services.shift_times import shift_start_minutes
+
+def parse_shift_start(date_key, shift_time, tz):
+    """
+    Turn a date key and a display time such as "8:00 AM - 11:00 AM" into an aware start datetime.
+    A start without AM/PM takes the end's ("1:00 - 4:00 PM" starts at 13:00).
+    Returns None when the time cannot be parsed.
+    """
+    start = shift_start_minutes(shift_time)
+    if start is None:
+        return None
+    day = datetime.strptime(date_key, "%Y-%m-%d")
+    return day.replace(hour=start // 60, minute=start % 60, tzinfo=tz)
+
+
+class ShiftReminderScheduler:
+    """Finds upcoming assignments and sends their reminders in bounded batches."""
+
+    def __init__(self, mongo, window_minutes=120, batch_size=200, tz_name="America/New_York"):
+        self.mongo = mongo
+        self.window = timedelta(minutes=window_minutes)
+        self.batch_size = batch_size
+        self.tz = ZoneInfo(tz_name)
+
+    def find_due_assignments(self, now):
+        """
+        Return assignments whose shift starts between now and now + window.
+        Each is (assignment_key, start, pantry_name, shift, date_key, username).
+        """
+        local_now = now.astimezone(self.tz)
+        window_end = local_now + self.window
+        date_keys = sorted({local_now.strftime("%Y-%m-%d"), window_end.strftime("%Y-%m-%d")})
+
+        due = []
+        pantries = pantry_model(self.mongo)
+        for pantry_id, pantry_name, days in pantries.iter_schedules_for_dates(date_keys):
+            for date_key, day_schedule in days.items():
+                for shift in day_schedule.get("shifts", []):
+                    start = parse_shift_start(date_key, shift.get("time"), self.tz)
+                    if start is None or not (local_now <= start <= window_end):
+                        continue
+                    for vol in shift.get("volunteers", []):
+                        username = vol.get("username")
+                        if not username:
+                            continue
+                        key = ShiftReminderModel.assignment_key(pantry_id, date_key, shift.get("id"), username)
+                        due.append((key, start, pantry_name, shift, date_key, username))
+        due.sort(key=lambda a: a[1])
+        return due
+
+    def run_tick(self, now=None):
+        """
+        Send reminders for up to batch_size due assignments.
+        
+        Returns:
+            dict: {"due": int, "sent": int, "skipped": int, "failed": int, "batches_flushed": int}
+        """
+        now = now or datetime.now(timezone.utc)
+        markers = ShiftReminderModel(self.mongo)
+        devices = DeviceTokenModel(self.mongo)
+        delivery_stats = DeliveryStatsModel(self.mongo)
+        stats = {"due": 0, "sent": 0, "skipped": 0, "failed": 0}
+
+        # Safety net for stream notification batches whose API worker exited before flushing
+        stats["batches_flushed"] = flush_due_batches(self.mongo)
+
+        due = self.find_due_assignments(now)
+        stats["due"] = len(due)
+        processed = 0
+        for key, start, pantry_name, shift, date_key, username in due:
+            if processed >= self.batch_size:
+                break
+            # Keep the marker until a day after the shift so later ticks still see it
+            if not markers.claim(key, (start + timedelta(days=1)).astimezone(timezone.utc).replace(tzinfo=None)):
+                stats["skipped"] += 1
+                continue
+            processed += 1
+
+            tokens = devices.get_tokens_for_user(username)
+            if not tokens:
+                markers.mark_result(key, False, "No registered devices")
+                stats["failed"] += 1
+                continue
+
+            results = send_shift_reminder(pantry_name, shift.get("shift", "Shift"), shift.get("time", ""), date_key, tokens)
+            sent = results["success_count"] > 0
+            try:
+                delivery_stats.record_fanout(key.split(":", 1)[0], key, "shift_reminder", results)
+            except Exception as e:
+                print(f"Error recording delivery stats: {e}")
+            markers.mark_result(key, sent, None if sent else "All devices failed")
+            stats["sent" if sent else "failed"] += 1
+        return stats
+
+    def run_forever(self, interval_seconds=60):
+        """Run a tick every interval_seconds until interrupted."""
+        while True:
+            started = time.monotonic()
+            try:
+                stats = self.run_tick()
+                print(f"Shift reminders: {stats['sent']} sent, {stats['failed']} failed, {stats['skipped']} already sent, {stats['due']} due")
+            except Exception as e:
+                print(f"Error running shift reminder tick: {e}")
+            time.sleep(max(0, interval_seconds - (time.monotonic() - started)))
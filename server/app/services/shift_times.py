@@ -0,0 +1,70 @@
+"""
+Parsing of shift display times such as "8:00 AM - 11:00 AM", "1:00 - 4:00 PM"
+or "11-2 pm". Shared by the reminder scheduler (start times) and the schedule
+archive and reports (shift hours), so both read a time the same way.
+"""
+
+import re
+
+CLOCK_PATTERN = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([AaPp][Mm])?")
+
+
+def _clock_minutes(hour, minute, meridiem):
+    hour = int(hour)
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    return hour * 60 + int(minute or 0)
+
+
+def shift_minutes(shift_time):
+    """
+    Start and end of a display time in minutes after midnight.
+    A start without AM/PM takes the end's meridiem when that keeps it before the end
+    ("1:00 - 4:00 PM" starts at 13:00). The end may pass midnight (end > 24 * 60).
+
+    Returns:
+        tuple: (start, end) where end is None for a single time, or None when unparseable
+    """
+    times = CLOCK_PATTERN.findall(shift_time or "")
+    if not times:
+        return None
+    start_hour, start_minute, start_meridiem = times[0]
+    start_meridiem = start_meridiem.lower()
+    if int(start_hour) > 23 or int(start_minute or 0) > 59:
+        return None
+    if len(times) < 2:
+        return _clock_minutes(start_hour, start_minute, start_meridiem), None
+
+    end_hour, end_minute, end_meridiem = times[1]
+    end_meridiem = end_meridiem.lower()
+    end = _clock_minutes(end_hour, end_minute, end_meridiem)
+    if start_meridiem or not end_meridiem:
+        start = _clock_minutes(start_hour, start_minute, start_meridiem)
+    else:
+        start = _clock_minutes(start_hour, start_minute, end_meridiem)
+        if start >= end:
+            start = _clock_minutes(start_hour, start_minute, "am" if end_meridiem == "pm" else "pm")
+    if not end_meridiem and end <= start:
+        # "9-1" without AM/PM: the end is in the afternoon
+        end += 12 * 60
+    if end <= start:
+        end += 24 * 60
+    return start, end
+
+
+def shift_start_minutes(shift_time):
+    """Start of a display time in minutes after midnight, or None when unparseable."""
+    minutes = shift_minutes(shift_time)
+    return None if minutes is None else minutes[0]
+
+
+def shift_duration_hours(shift_time):
+    """
+    Length in hours of a display time such as "8:00 AM - 11:00 AM" or "11-2 pm".
+    Returns 0.0 when unparseable or when there is no end time.
+    """
+    minutes = shift_minutes(shift_time)
+    if minutes is None or minutes[1] is None:
+        return 0.0
+    start, end = minutes
+    return round((end - start) / 60, 2)
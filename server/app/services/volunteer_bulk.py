@@ -0,0 +1,170 @@
+"""
+Streaming bulk import and export of volunteers.
+
+Imports read CSV or NDJSON incrementally from the request stream, validate each
+row, skip usernames that already exist (in the file or the database) and write
+with unordered insert_many batches. Exports stream rows straight from a cursor.
+"""
+
+import csv
+import io
+import json
+
+from app.models.volunteer import with_search_fields
+
+REQUIRED_FIELDS = [
+    "username", "first_name", "last_name", "date_of_birth", "email", "phone_number",
+    "zipcode", "roles", "availability", "emergency_name", "emergency_number",
+]
+EXPORT_FIELDS = ["_id"] + REQUIRED_FIELDS + ["verified"]
+
+# Only the first errors are returned in full so the report stays small
+MAX_REPORTED_ERRORS = 1000
+
+
+def iter_records(stream, fmt):
+    """
+    Yield (row_number, record or None, parse_error or None) from a byte stream.
+
+    Args:
+        stream: File-like object of bytes (e.g. request.stream)
+        fmt: "csv" or "ndjson"
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, start=1):
+            yield row_number, row, None
+        return
+
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, record, None
+
+
+def build_volunteer(record):
+    """Validate a raw record and return (document, error)."""
+    missing = [field for field in REQUIRED_FIELDS if not str(record.get(field) or "").strip()]
+    if missing:
+        return None, f"Missing required fields: {', '.join(missing)}"
+    document = {field: record[field] for field in REQUIRED_FIELDS}
+    document["username"] = str(document["username"]).strip()
+    # Imported volunteers still need to be verified by pantry staff
+    document["verified"] = "False"
+    return with_search_fields(document), None
+
+
+class ImportReport:
+    """Running totals for an import."""
+
+    def __init__(self):
+        self.inserted = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def to_dict(self):
+        return {
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def import_volunteers(model, records, batch_size=500):
+    """
+    Validate, dedupe and insert records in batches.
+
+    Args:
+        model: volunteer_model instance
+        records: Iterable from iter_records
+        batch_size: Documents per insert_many call
+
+    Returns:
+        dict: ImportReport summary
+    """
+    report = ImportReport()
+    seen_usernames = set()
+    batch = []
+
+    def flush():
+        if not batch:
+            return
+        existing = model.existing_usernames([doc["username"] for _, doc in batch])
+        to_insert = []
+        for row_number, doc in batch:
+            if doc["username"].lower() in existing:
+                report.duplicates += 1
+            else:
+                to_insert.append((row_number, doc))
+        if to_insert:
+            inserted, duplicates, write_errors = model.insert_volunteers([doc for _, doc in to_insert])
+            report.inserted += inserted
+            report.duplicates += duplicates
+            for index, message in write_errors:
+                report.add_error(to_insert[index][0], message)
+        batch.clear()
+
+    for row_number, record, parse_error in records:
+        if parse_error:
+            report.add_error(row_number, parse_error)
+            continue
+        document, error = build_volunteer(record)
+        if error:
+            report.add_error(row_number, error)
+            continue
+        key = document["username"].lower()
+        if key in seen_usernames:
+            report.duplicates += 1
+            continue
+        seen_usernames.add(key)
+        batch.append((row_number, document))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    return report.to_dict()
+
+
+def _export_value(value):
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def iter_csv_export(cursor):
+    """Yield CSV text chunks (header first) for each volunteer from a cursor."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for volunteer in cursor:
+        writer.writerow([_export_value(volunteer.get(field)) for field in EXPORT_FIELDS])
+        # Emit in chunks of a few KB rather than one tiny write per row
+        if buffer.tell() >= 8192:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_ndjson_export(cursor, dumps):
+    """Yield one JSON line per volunteer from a cursor, encoded with dumps."""
+    for volunteer in cursor:
+        yield dumps({field: volunteer.get(field) for field in EXPORT_FIELDS}) + "\n"
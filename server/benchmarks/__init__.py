@@ -0,0 +1,7 @@
+"""
+Reproducible benchmark suite for the PantryLink API.
+Seeds synthetic data into mongomock (or a local mongod), drives the Flask test
+client through the hot endpoints and reports latency percentiles and throughput.
+
+    python -m benchmarks --pantries 50 --items 40 --days 14 --volunteers 500
+"""
@@ -0,0 +1,88 @@
+"""
+Command line entry point: python -m benchmarks --help
+"""
+
+import argparse
+import sys
+
+from benchmarks.fake_apns import install_fake_apns
+from benchmarks.runner import (
+    build_app,
+    compare_to_baseline,
+    load_baseline,
+    run_benchmarks,
+    write_baseline,
+)
+from benchmarks.seed import seed_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the PantryLink API hot endpoints")
+    parser.add_argument("--pantries", type=int, default=20)
+    parser.add_argument("--items", type=int, default=30, help="Stock items per pantry")
+    parser.add_argument("--days", type=int, default=14, help="Days of schedules per pantry")
+    parser.add_argument("--volunteers", type=int, default=200)
+    parser.add_argument("--device-tokens", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    parser.add_argument("--mongo-uri", help="Local mongod to use instead of mongomock")
+    parser.add_argument("--output", help="Write results to this JSON baseline file")
+    parser.add_argument("--compare", help="Compare p95 latency against this baseline file")
+    args = parser.parse_args()
+    if args.pantries < 1:
+        parser.error("--pantries must be at least 1; every scenario targets a pantry")
+
+    app = build_app(args.mongo_uri)
+    install_fake_apns()
+
+    params = {
+        "pantries": args.pantries,
+        "items": args.items,
+        "days": args.days,
+        "volunteers": args.volunteers,
+        "device_tokens": args.device_tokens,
+        "seed": args.seed,
+        "iterations": args.iterations,
+        "backend": "mongod" if args.mongo_uri else "mongomock",
+    }
+    ctx = seed_database(
+        app.mongo.cx["test"],
+        pantries=args.pantries,
+        items=args.items,
+        days=args.days,
+        volunteers=args.volunteers,
+        device_tokens=args.device_tokens,
+        seed=args.seed,
+    )
+
+    results = run_benchmarks(app, ctx, iterations=args.iterations, warmup=args.warmup, only=args.only)
+
+    failed = [name for name, r in results.items() if r["errors"]]
+    print(f"{'scenario':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'errors':>8}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['requests_per_sec']:>10}{r['errors']:>8}")
+
+    if args.output:
+        write_baseline(args.output, params, results)
+        print(f"Baseline written to {args.output}")
+
+    if args.compare:
+        regressions = 0
+        print(f"\nComparison with {args.compare} (p95):")
+        for name, before, after, change, is_regression in compare_to_baseline(results, load_baseline(args.compare)):
+            marker = "  REGRESSION" if is_regression else ""
+            print(f"  {name:<22}{before:>10} -> {after:<10}{change:+.1%}{marker}")
+            regressions += is_regression
+        if regressions:
+            sys.exit(1)
+
+    if failed:
+        # Timings of failing requests measure the error path, not the endpoint
+        print(f"\nScenarios with errors: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Stand-in for APNsService so stream posts can be benchmarked without network calls.
+"""
+
+from app.services import push_notifications
+
+
+class FakeAPNsService:
+    """Records notifications instead of sending them to Apple."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def is_configured(self):
+        return True
+
+    def send_notification(self, device_token, title, body, data=None, badge=1):
+        self.sent += 1
+        return True, None
+
+    def send_bulk_notifications(self, device_tokens, title, body, data=None, badges=None):
+        self.sent += len(device_tokens)
+        return {"success_count": len(device_tokens), "failure_count": 0, "failures": []}
+
+
+def install_fake_apns():
+    """Replace the APNs singleton with a FakeAPNsService and return it."""
+    fake = FakeAPNsService()
+    push_notifications._apns_service = fake
+    return fake
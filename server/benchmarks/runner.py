@@ -0,0 +1,191 @@
+"""
+Benchmark scenarios, timing and baseline comparison.
+"""
+
+import json
+import os
+import statistics
+import time
+from urllib.parse import urlparse
+
+# Scenarios whose p95 grows by more than this fraction are reported as regressions
+REGRESSION_THRESHOLD = 0.10
+
+
+def _sort_value(value):
+    # Missing and null values sort first, as in MongoDB
+    return (value is not None, value)
+
+
+def install_mongomock_shims():
+    """
+    Teach mongomock's aggregation parser the expressions the app uses but mongomock lacks
+    ($round and $sortArray), so the real pipelines run unchanged against it.
+    """
+    from mongomock import aggregate
+
+    parser = aggregate._Parser
+    if getattr(parser, "_benchmark_shims", False):
+        return
+    original_parse = parser.parse
+
+    def parse(self, expression):
+        if isinstance(expression, dict) and len(expression) == 1:
+            operator, args = next(iter(expression.items()))
+            if operator == "$round":
+                value, places = (list(args) + [0])[:2] if isinstance(args, list) else (args, 0)
+                number, places = self.parse(value), self.parse(places)
+                return None if number is None else round(number, int(places))
+            if operator == "$sortArray":
+                items = self.parse(args["input"])
+                if items is None:
+                    return None
+                sort_by = args["sortBy"]
+                if not isinstance(sort_by, dict):
+                    return sorted(items, key=_sort_value, reverse=sort_by < 0)
+                items = list(items)
+                # Stable sorts applied from the least significant key
+                for field, direction in reversed(list(sort_by.items())):
+                    items.sort(key=lambda item: _sort_value(item.get(field)), reverse=direction < 0)
+                return items
+        return original_parse(self, expression)
+
+    parser.parse = parse
+    parser._benchmark_shims = True
+
+
+class MongomockStandIn:
+    """Minimal PyMongo replacement exposing .cx like flask_pymongo does."""
+
+    def __init__(self):
+        import mongomock
+        install_mongomock_shims()
+        self.cx = mongomock.MongoClient()
+
+
+def build_app(mongo_uri=None):
+    """
+    Create the Flask app backed by mongomock, or by a local mongod when mongo_uri is given.
+    The models always use the "test" database, so only local servers are accepted.
+    """
+    if mongo_uri:
+        host = urlparse(mongo_uri).hostname
+        if host not in ("localhost", "127.0.0.1", "::1"):
+            raise ValueError("Benchmarks drop collections in the 'test' database; use a local mongod")
+        os.environ["URI"] = mongo_uri
+    else:
+        # Never contacted: the client is created lazily and swapped for mongomock below
+        os.environ.setdefault("URI", "mongodb://localhost:27017/test")
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret")
+    # Send stream notifications inline so post_stream includes the fan-out cost
+    os.environ.setdefault("NOTIFY_COALESCE_SECONDS", "0")
+
+    from app import create_app
+    app = create_app()
+    if not mongo_uri:
+        app.mongo = MongomockStandIn()
+        app.db = app.mongo.cx["test"]
+    return app
+
+
+def build_scenarios(ctx):
+    """
+    Return (name, request function) pairs for the hot endpoints.
+    Each request function takes (client, iteration) and returns a response.
+    """
+    pantry_ids = ctx["pantry_ids"]
+    usernames = ctx["usernames"] or ["nobody"]
+    item_names = ctx["item_names"] or ["Item 0"]
+    date_keys = ctx["date_keys"]
+
+    def pick(values, i):
+        return values[i % len(values)]
+
+    return [
+        ("get_pantries", lambda c, i: c.get("/pantry/")),
+        ("get_schedule", lambda c, i: c.get(
+            f"/pantry/{pick(pantry_ids, i)}/schedule?date={pick(date_keys, i)}")),
+        ("put_schedule", lambda c, i: c.put(
+            f"/pantry/{pick(pantry_ids, i)}/schedule/{pick(date_keys, i)}",
+            json={"schedule": {"shifts": [], "general_volunteers": [{"username": pick(usernames, i)}]}})),
+        ("user_schedule", lambda c, i: c.get(f"/pantry/user-schedule/{pick(usernames, i)}")),
+        ("check_user_conflict", lambda c, i: c.get(
+            f"/pantry/check-user-conflict?username={pick(usernames, i)}&date={pick(date_keys, i)}")),
+        ("update_inventory", lambda c, i: c.put(
+            f"/pantry/{pick(pantry_ids, i)}/inventory/{pick(item_names, i)}",
+            json={"current": i % 50, "full": 50})),
+        ("post_stream", lambda c, i: c.post(
+            f"/pantry/{pick(pantry_ids, i)}/stream", json={"message": f"Benchmark message {i}"})),
+    ]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_scenario(client, request_fn, iterations, warmup):
+    for i in range(warmup):
+        request_fn(client, i)
+
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        response = request_fn(client, i)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "requests_per_sec": round(iterations / duration, 1) if duration else 0.0,
+    }
+
+
+def run_benchmarks(app, ctx, iterations=200, warmup=10, only=None):
+    """Run every scenario (or the ones named in only) and return their results keyed by name."""
+    results = {}
+    with app.test_client() as client:
+        for name, request_fn in build_scenarios(ctx):
+            if only and name not in only:
+                continue
+            results[name] = run_scenario(client, request_fn, iterations, warmup)
+    return results
+
+
+def compare_to_baseline(results, baseline):
+    """
+    Compare p95 latency against a previous run.
+
+    Returns:
+        list: [(scenario, baseline_p95, current_p95, change_fraction, is_regression), ...]
+    """
+    rows = []
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("p95_ms"):
+            continue
+        change = (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"]
+        rows.append((name, previous["p95_ms"], current["p95_ms"], change, change > REGRESSION_THRESHOLD))
+    return rows
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_baseline(path, params, results):
+    with open(path, "w") as f:
+        json.dump({"params": params, "results": results}, f, indent=2, sort_keys=True)
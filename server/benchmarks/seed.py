@@ -0,0 +1,142 @@
+"""
+Deterministic synthetic data for benchmarks.
+All generation goes through a seeded random.Random so two runs with the same
+arguments produce identical databases.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+ITEM_TYPES = ["Canned", "Produce", "Dairy", "Grain", "Protein", "Hygiene"]
+SHIFT_TEMPLATES = [
+    {"id": 1, "shift": "Morning Sort", "time": "8:00 AM - 11:00 AM"},
+    {"id": 2, "shift": "Distribution", "time": "11:00 AM - 2:00 PM"},
+    {"id": 3, "shift": "Restock", "time": "2:00 PM - 5:00 PM"},
+]
+DAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+ROLES = ["Sorting", "Distribution", "Driving", "Intake", "Cleanup"]
+
+
+def volunteer_username(index):
+    return f"volunteer{index:05d}"
+
+
+def build_volunteers(rng, count):
+    volunteers = []
+    for i in range(count):
+        volunteers.append({
+            "username": volunteer_username(i),
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "date_of_birth": f"{rng.randint(1950, 2008)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}",
+            "email": f"{volunteer_username(i)}@example.com",
+            "phone_number": f"555{rng.randint(1000000, 9999999)}",
+            "zipcode": f"08{rng.randint(500, 560)}",
+            "roles": rng.sample(ROLES, rng.randint(1, 3)),
+            "availability": rng.sample(DAYS, rng.randint(1, 5)),
+            "emergency_name": f"Contact{i}",
+            "emergency_number": f"555{rng.randint(1000000, 9999999)}",
+            "verified": rng.choice(["True", "False"]),
+        })
+    return volunteers
+
+
+def build_schedule_day(rng, volunteer_count, per_shift):
+    shifts = []
+    for template in SHIFT_TEMPLATES:
+        assigned = rng.sample(range(volunteer_count), min(per_shift, volunteer_count))
+        shifts.append({
+            **template,
+            "volunteers": [{"username": volunteer_username(v), "name": f"First{v} Last{v}"} for v in assigned],
+        })
+    general = rng.sample(range(volunteer_count), min(2, volunteer_count))
+    return {
+        "shifts": shifts,
+        "general_volunteers": [{"username": volunteer_username(v), "name": f"First{v} Last{v}"} for v in general],
+    }
+
+
+def build_pantries(rng, count, items, days, volunteer_count, start_date, per_shift=3):
+    pantries = []
+    for p in range(count):
+        stock = []
+        for i in range(items):
+            full = rng.randint(20, 500)
+            stock.append({
+                "name": f"Item {i}",
+                "current": rng.randint(0, full),
+                "full": full,
+                "type": rng.choice(ITEM_TYPES),
+            })
+        schedules = {}
+        for d in range(days):
+            date_key = (start_date + timedelta(days=d)).strftime("%Y-%m-%d")
+            schedules[date_key] = build_schedule_day(rng, volunteer_count, per_shift)
+        pantries.append({
+            "name": f"Pantry {p}",
+            "address": f"{p} Main St",
+            "email": f"pantry{p}@example.com",
+            "phone_number": f"555{rng.randint(1000000, 9999999)}",
+            "password": "$2b$12$benchmarkbenchmarkbenchmarkbenchmarkbenchmarkbench",
+            "username": f"pantry{p}",
+            "website": None,
+            "stream": [{"date": "01/01/2026 09:00 AM", "message": f"Welcome to pantry {p}"}],
+            "stock": stock,
+            "schedule_settings": {
+                "schedulingEnabled": True,
+                "schedulingMode": "shifts",
+                "openDays": [1, 2, 3, 4, 5],
+                "excludedDates": [],
+                "useDefaultSchedule": True,
+                "defaultSchedule": [{**t} for t in SHIFT_TEMPLATES],
+            },
+            "schedules": schedules,
+        })
+    return pantries
+
+
+def build_device_tokens(rng, count, volunteer_count, pantry_ids):
+    now = datetime.utcnow()
+    tokens = []
+    for i in range(count):
+        tokens.append({
+            "device_token": f"{rng.getrandbits(256):064x}",
+            "username": volunteer_username(rng.randrange(volunteer_count)) if volunteer_count else None,
+            "active": True,
+            "subscriptions": rng.sample(pantry_ids, min(len(pantry_ids), rng.randint(1, 3))),
+            "created_at": now,
+            "updated_at": now,
+        })
+    return tokens
+
+
+def seed_database(db, pantries=20, items=30, days=14, volunteers=200, device_tokens=500, seed=42):
+    """
+    Drop and re-populate the benchmark collections.
+
+    Returns:
+        dict: ids and usernames the benchmark scenarios need
+    """
+    rng = random.Random(seed)
+    start_date = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    for name in ("pantries", "volunteers", "device_tokens"):
+        db[name].drop()
+
+    volunteer_docs = build_volunteers(rng, volunteers)
+    if volunteer_docs:
+        db["volunteers"].insert_many(volunteer_docs)
+
+    pantry_docs = build_pantries(rng, pantries, items, days, max(volunteers, 1), start_date)
+    pantry_ids = db["pantries"].insert_many(pantry_docs).inserted_ids if pantry_docs else []
+
+    token_docs = build_device_tokens(rng, device_tokens, volunteers, [str(pid) for pid in pantry_ids])
+    if token_docs:
+        db["device_tokens"].insert_many(token_docs)
+
+    return {
+        "pantry_ids": [str(pid) for pid in pantry_ids],
+        "usernames": [v["username"] for v in volunteer_docs],
+        "item_names": [item["name"] for item in pantry_docs[0]["stock"]] if pantry_docs else [],
+        "date_keys": sorted(pantry_docs[0]["schedules"].keys()) if pantry_docs else [],
+    }
@@ -0,0 +1,72 @@
+"""
+Gunicorn configuration for serving the PantryLink API in production.
+
+Pick a serving profile with the GUNICORN_PROFILE environment variable:
+    gthread (default) - threaded sync workers, good for blocking Mongo/APNs calls
+    gevent            - cooperative greenlets for many concurrent slow clients (pip install gevent)
+    sync              - one request per worker, simplest and easiest to debug
+
+Any individual setting can be overridden with the GUNICORN_* variables below.
+
+Run reminder_worker.py next to gunicorn: besides shift reminders it sends
+coalesced stream notifications whose API worker exited or was recycled before
+the batch's timer fired.
+"""
+
+import multiprocessing
+import os
+
+PROFILES = {
+    "gthread": {"worker_class": "gthread", "threads": 4, "worker_connections": None},
+    "gevent": {"worker_class": "gevent", "threads": 1, "worker_connections": 1000},
+    "sync": {"worker_class": "sync", "threads": 1, "worker_connections": None},
+}
+
+profile_name = os.getenv("GUNICORN_PROFILE", "gthread").lower()
+if profile_name not in PROFILES:
+    raise ValueError(f"Unknown GUNICORN_PROFILE '{profile_name}', expected one of {sorted(PROFILES)}")
+profile = PROFILES[profile_name]
+
+cpu_count = multiprocessing.cpu_count()
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '3000')}")
+worker_class = profile["worker_class"]
+
+# Async workers multiplex connections, so they need fewer processes
+if worker_class == "gevent":
+    default_workers = cpu_count + 1
+else:
+    default_workers = cpu_count * 2 + 1
+workers = int(os.getenv("GUNICORN_WORKERS", default_workers))
+threads = int(os.getenv("GUNICORN_THREADS", profile["threads"]))
+if profile["worker_connections"]:
+    worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", profile["worker_connections"]))
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers periodically to bound memory growth; jitter avoids restarting them all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.getenv("GUNICORN_ERROR_LOG", "-")
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    server.log.info(
+        f"Serving profile '{profile_name}': {workers} x {worker_class} workers, {threads} threads each"
+    )
+
+
+def post_fork(server, worker):
+    # MongoClient is not fork-safe; give each worker its own client and pool
+    if preload_app:
+        from app.config import init_mongo
+        from wsgi import app
+        init_mongo(app)
@@ -0,0 +1,44 @@
+"""
+Schedule horizon worker.
+Archives past schedule days of every pantry, then generates the upcoming days
+for every pantry that uses schedule templates. Runs outside the API workers:
+
+    python horizon_worker.py             # run every SCHEDULE_HORIZON_INTERVAL_SECONDS
+    python horizon_worker.py --once      # single run, e.g. from cron
+    python horizon_worker.py --once --restart   # ignore the checkpoint of today's run
+"""
+
+import argparse
+import os
+
+from app import create_app
+from app.services.schedule_archive import ScheduleArchiver
+from app.services.schedule_horizon import HorizonGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate schedule horizons for all pantries")
+    parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint of this run and start over")
+    parser.add_argument("--days", type=int, default=int(os.getenv("SCHEDULE_HORIZON_DAYS", "60")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("SCHEDULE_HORIZON_WORKERS", "8")))
+    parser.add_argument("--chunk-size", type=int, default=None, help="Pantries per checkpoint (default 4 x workers)")
+    parser.add_argument("--skip-archive", action="store_true", help="Do not archive past days")
+    parser.add_argument("--interval", type=int, default=int(os.getenv("SCHEDULE_HORIZON_INTERVAL_SECONDS", "3600")))
+    args = parser.parse_args()
+
+    app = create_app()
+    archiver = None if args.skip_archive else ScheduleArchiver(app.mongo, workers=args.workers)
+    generator = HorizonGenerator(app.mongo, days=args.days, workers=args.workers, chunk_size=args.chunk_size, archiver=archiver)
+
+    with app.app_context():
+        if args.once:
+            if archiver is not None:
+                print(archiver.run())
+            print(generator.run(restart=args.restart))
+        else:
+            generator.run_forever(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""
+Inventory event worker.
+Consumes the inventory change log, keeps per-item consumption rates and posts
+low-stock alerts to pantry streams. Run one instance outside the API workers:
+
+    python inventory_worker.py            # tick every INVENTORY_ALERT_INTERVAL_SECONDS
+    python inventory_worker.py --once     # single tick, e.g. from cron
+"""
+
+import argparse
+import os
+
+from app import create_app
+from app.services.inventory_alerts import LowStockConsumer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process inventory events and send low-stock alerts")
+    parser.add_argument("--once", action="store_true", help="Run a single tick and exit")
+    parser.add_argument("--interval", type=int, default=int(os.getenv("INVENTORY_ALERT_INTERVAL_SECONDS", "30")))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("INVENTORY_ALERT_BATCH_SIZE", "5000")))
+    args = parser.parse_args()
+
+    app = create_app()
+    consumer = LowStockConsumer(app.mongo, batch_size=args.batch_size)
+
+    with app.app_context():
+        if args.once:
+            print(consumer.run_tick())
+        else:
+            consumer.run_forever(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Simple HTTP load test for comparing gunicorn serving profiles.
+
+Start the server with a profile, then point this script at it:
+
+    GUNICORN_PROFILE=gthread gunicorn wsgi:app
+    python loadtest.py --url http://localhost:3000/pantry/ --requests 2000 --concurrency 50
+
+Prints requests/sec and latency percentiles so runs can be compared per profile.
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+
+def run_load_test(url, total_requests, concurrency, timeout=30.0):
+    """
+    Fire total_requests GET requests at url using concurrency worker threads.
+
+    Returns:
+        dict: throughput, latency percentiles (ms) and error count
+    """
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    local = threading.local()
+
+    def get_client():
+        # One keep-alive client per thread so connection setup is not measured
+        if not hasattr(local, "client"):
+            local.client = httpx.Client(timeout=timeout)
+        return local.client
+
+    def one_request(_):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = get_client().get(url)
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one_request, range(total_requests)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "requests_per_sec": round(total_requests / duration, 1) if duration else 0.0,
+        "p50_ms": round(quantiles[49], 2),
+        "p95_ms": round(quantiles[94], 2),
+        "p99_ms": round(quantiles[98], 2),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test a running PantryLink server")
+    parser.add_argument("--url", default="http://localhost:3000/pantry/")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--label", default="", help="Name of the serving profile under test")
+    args = parser.parse_args()
+
+    results = run_load_test(args.url, args.requests, args.concurrency)
+    label = f"[{args.label}] " if args.label else ""
+    print(
+        f"{label}{results['requests_per_sec']} req/s | "
+        f"p50 {results['p50_ms']}ms p95 {results['p95_ms']}ms p99 {results['p99_ms']}ms | "
+        f"{results['errors']} errors over {results['requests']} requests ({results['concurrency']} concurrent)"
+    )
+
+
+if __name__ == "__main__":
+    main()
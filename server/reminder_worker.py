@@ -0,0 +1,41 @@
+"""
+Shift reminder worker.
+Runs outside the API workers; start one (or more, reminders are idempotent) with:
+
+    python reminder_worker.py            # loop forever
+    python reminder_worker.py --once     # single tick, e.g. from cron
+"""
+
+import argparse
+import os
+
+from app import create_app
+from app.services.shift_reminders import ShiftReminderScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send reminders for upcoming volunteer shifts")
+    parser.add_argument("--once", action="store_true", help="Run a single tick and exit")
+    parser.add_argument("--interval", type=int, default=int(os.getenv("REMINDER_INTERVAL_SECONDS", "60")))
+    parser.add_argument("--window-minutes", type=int, default=int(os.getenv("REMINDER_WINDOW_MINUTES", "120")))
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("REMINDER_BATCH_SIZE", "200")))
+    parser.add_argument("--timezone", default=os.getenv("REMINDER_TIMEZONE", "America/New_York"))
+    args = parser.parse_args()
+
+    app = create_app()
+    scheduler = ShiftReminderScheduler(
+        app.mongo,
+        window_minutes=args.window_minutes,
+        batch_size=args.batch_size,
+        tz_name=args.timezone,
+    )
+
+    with app.app_context():
+        if args.once:
+            print(scheduler.run_tick())
+        else:
+            scheduler.run_forever(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
+import os
 from flask import Flask
 from app import create_app
 
 
 if __name__ == "__main__": 
     print("Starting the server...")
+    # The development server may fall back to a dev JWT secret; gunicorn (wsgi.py) may not
+    os.environ.setdefault("FLASK_DEBUG", "1")
     app = create_app()
     @app.route("/")
     def hello_world():
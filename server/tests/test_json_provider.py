@@ -0,0 +1,47 @@
+import os
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+os.environ.setdefault("URI", "mongodb://localhost:27017/test")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+from app import create_app
+from app.config import init_mongo
+from app.services.json_provider import MongoJSONProvider
+
+
+def test_object_id_serializes_as_plain_string():
+    app = create_app()
+    pantry_id = ObjectId()
+    created_at = datetime(2026, 1, 2, 3, 4, 5)
+
+    with app.app_context():
+        body = app.json.response({"_id": pantry_id, "created_at": created_at}).get_json()
+
+    assert body == {"_id": str(pantry_id), "created_at": "2026-01-02T03:04:05"}
+
+
+def test_provider_survives_mongo_reinit():
+    app = create_app()
+    # gunicorn's post_fork hook re-creates the client in each worker
+    init_mongo(app)
+
+    assert isinstance(app.json, MongoJSONProvider)
+    with app.app_context():
+        assert app.json.dumps({"_id": ObjectId("64b7f0c2a1b2c3d4e5f60718")}) == '{"_id":"64b7f0c2a1b2c3d4e5f60718"}'
+
+
+def test_pantry_listing_returns_string_ids():
+    pytest.importorskip("mongomock")
+    from benchmarks.runner import MongomockStandIn
+
+    app = create_app()
+    app.mongo = MongomockStandIn()
+    pantry_id = app.mongo.cx["test"]["pantries"].insert_one({"name": "Pantry", "stock": []}).inserted_id
+
+    response = app.test_client().get("/pantry/")
+
+    assert response.status_code == 200
+    assert response.get_json()["pantries"][0]["_id"] == str(pantry_id)
@@ -0,0 +1,10 @@
+"""
+Production WSGI entry point.
+Run with gunicorn, which picks up gunicorn.conf.py from this directory:
+
+    gunicorn wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()